@@ -908,6 +908,7 @@ function App() {
       const response = await fetch(config.apiEndpoint, {
         method: "POST",
         body: formData,
+        credentials: "include",
       });
 
       if (!response.ok) throw new Error("Network error");
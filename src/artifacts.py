@@ -0,0 +1,206 @@
+import os
+import json
+import shutil
+import hashlib
+import datetime
+import uuid
+from .config import INDEX_ROOT, INDEX_PATH, CHUNKS_PATH, INDEX_PATH_EMBEDDINGS, INDEX_KEEP_VERSIONS
+
+# Layout under INDEX_ROOT:
+#   CURRENT                      -> text file holding the published version id
+#   versions/<version_id>/       -> one immutable build (index, chunks, manifest)
+CURRENT_POINTER = "CURRENT"
+VERSIONS_DIR = "versions"
+MANIFEST_NAME = "manifest.json"
+INDEX_FILE = "faiss_index.bin"
+CHUNKS_FILE = "chunks.json"            # legacy JSON list, read only for older versions
+CHUNK_STORE_FILE = "chunks.bin"        # memory-mapped chunk store (see chunk_store.py)
+EMBEDDINGS_FILE = "chunks_embeddings.npy"
+BM25_FILE = "bm25.npz"                 # lexical inverted index (see lexical.py)
+
+# Callables returning version ids still in use (resident corpora, live sessions);
+# prune_versions() never removes those
+_version_pins = []
+
+
+def new_version_id() -> str:
+    """Sortable, unique id for a new build"""
+    return f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:6]}"
+
+
+def version_dir(version_id: str, root: str = INDEX_ROOT) -> str:
+    return os.path.join(root, VERSIONS_DIR, version_id)
+
+
+def create_staging_dir(version_id: str, root: str = INDEX_ROOT) -> str:
+    """Create the private directory a build is written into before publishing"""
+    staging = os.path.join(root, VERSIONS_DIR, f".staging-{version_id}")
+    os.makedirs(staging, exist_ok=True)
+    return staging
+
+
+def file_checksum(path: str) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: str, data: str):
+    """Write a small text file so readers see either the old or the new content"""
+    tmp_path = f"{path}.tmp-{uuid.uuid4().hex[:6]}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def publish_version(staging: str, version_id: str, manifest: dict, root: str = INDEX_ROOT) -> str:
+    """
+    Finalize a staged build and make it the current version.
+
+    Checksums of every staged file are added to the manifest, the staging
+    directory is renamed into place, and the CURRENT pointer is swapped
+    atomically. Readers never observe a half-written build.
+
+    Args:
+        staging (str): Directory returned by create_staging_dir()
+        version_id (str): Id of the build
+        manifest (dict): Build metadata (model name, dimension, chunk count, ...)
+        root (str): Index root directory
+
+    Returns:
+        str: Path of the published version directory
+    """
+    files = {}
+    for name in sorted(os.listdir(staging)):
+        if name != MANIFEST_NAME:
+            files[name] = file_checksum(os.path.join(staging, name))
+
+    manifest = dict(manifest)
+    manifest.update({
+        "version": version_id,
+        "created_at": datetime.datetime.now().isoformat(),
+        "files": files
+    })
+    with open(os.path.join(staging, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    final_dir = version_dir(version_id, root)
+    os.replace(staging, final_dir)
+    _write_atomic(os.path.join(root, CURRENT_POINTER), version_id)
+    print(f"📌 Published index version {version_id}")
+
+    prune_versions(keep=INDEX_KEEP_VERSIONS, root=root)
+    return final_dir
+
+
+def current_version(root: str = INDEX_ROOT) -> str:
+    """Id of the published version, or None if nothing has been published yet"""
+    pointer = os.path.join(root, CURRENT_POINTER)
+    try:
+        with open(pointer, "r", encoding="utf-8") as f:
+            version_id = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return version_id or None
+
+
+def read_manifest(version_id: str, root: str = INDEX_ROOT) -> dict:
+    with open(os.path.join(version_dir(version_id, root), MANIFEST_NAME), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_version(version_id: str, root: str = INDEX_ROOT) -> bool:
+    """Check every file of a version against the checksums in its manifest"""
+    manifest = read_manifest(version_id, root)
+    directory = version_dir(version_id, root)
+    for name, checksum in manifest.get("files", {}).items():
+        path = os.path.join(directory, name)
+        if not os.path.exists(path) or file_checksum(path) != checksum:
+            print(f"⚠️  Checksum mismatch for {name} in version {version_id}")
+            return False
+    return True
+
+
+def resolve_paths(version_id: str = None, root: str = INDEX_ROOT) -> dict:
+    """
+    Resolve the index, chunks and embeddings files to read.
+
+    Args:
+        version_id (str): Specific version, defaults to the published one
+        root (str): Index root directory
+
+    Returns:
+        dict: "index", "chunks", "embeddings", "lexical" paths and "version". Falls back
+              to the legacy INDEX_PATH/CHUNKS_PATH/INDEX_PATH_EMBEDDINGS with version None
+              (and no lexical index) when nothing is published.
+    """
+    version_id = version_id or current_version(root)
+    if version_id is None:
+        return {
+            "index": INDEX_PATH,
+            "chunks": CHUNKS_PATH,
+            "embeddings": INDEX_PATH_EMBEDDINGS,
+            "lexical": None,
+            "version": None
+        }
+
+    directory = version_dir(version_id, root)
+    chunks_path = os.path.join(directory, CHUNK_STORE_FILE)
+    if not os.path.exists(chunks_path):
+        chunks_path = os.path.join(directory, CHUNKS_FILE)
+    return {
+        "index": os.path.join(directory, INDEX_FILE),
+        "chunks": chunks_path,
+        "embeddings": os.path.join(directory, EMBEDDINGS_FILE),
+        "lexical": os.path.join(directory, BM25_FILE),
+        "version": version_id
+    }
+
+
+def list_versions(root: str = INDEX_ROOT) -> list[str]:
+    """Published version ids, oldest first"""
+    versions_root = os.path.join(root, VERSIONS_DIR)
+    if not os.path.isdir(versions_root):
+        return []
+    return sorted(
+        name for name in os.listdir(versions_root)
+        if not name.startswith(".") and os.path.isdir(os.path.join(versions_root, name))
+    )
+
+
+def register_version_pins(provider):
+    """Register a callable returning version ids that must survive pruning"""
+    _version_pins.append(provider)
+
+
+def _pinned_versions() -> set:
+    pinned = set()
+    for provider in list(_version_pins):
+        try:
+            pinned.update(v for v in provider() if v)
+        except Exception as e:
+            print(f"⚠️  Could not list index versions in use: {e}")
+    return pinned
+
+
+def prune_versions(keep: int = INDEX_KEEP_VERSIONS, root: str = INDEX_ROOT):
+    """
+    Delete all but the newest `keep` versions. The current version and the
+    versions pinned by register_version_pins() providers are never removed.
+    """
+    current = current_version(root)
+    old_versions = [v for v in list_versions(root) if v != current]
+    excess = len(old_versions) - max(keep - 1, 0)
+    if excess <= 0:
+        return
+    pinned = _pinned_versions()
+    for version_id in old_versions[:excess]:
+        if version_id in pinned:
+            continue
+        shutil.rmtree(version_dir(version_id, root), ignore_errors=True)
+        print(f"🧹 Removed old index version {version_id}")
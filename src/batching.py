@@ -0,0 +1,142 @@
+import bisect
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from .retrieval import retrieve, retrieve_many
+from .config import TOP_K, RETRIEVAL_BATCH_MAX, RETRIEVAL_BATCH_WAIT_MS
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64]
+QUEUE_WAIT_MS_BUCKETS = [0.1, 0.5, 1, 2, 5, 10, 25, 50, 100]
+
+
+class Histogram:
+    """Thread-safe histogram over fixed upper bounds (the last bucket is +inf)."""
+
+    def __init__(self, bounds: list):
+        self.bounds = list(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.bounds, value)] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"le_{b}" for b in self.bounds] + ["inf"]
+            return {
+                "buckets": dict(zip(labels, self._counts)),
+                "count": self._count,
+                "avg": (self._sum / self._count) if self._count else 0.0
+            }
+
+
+class _Pending:
+    def __init__(self, query: str, k: int, corpus_id: str, mode: str):
+        self.query = query
+        self.group = (k, corpus_id, mode)
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class RetrievalBatcher:
+    """
+    Gathers concurrent retrieve() calls into retrieve_many() batches.
+
+    A worker thread takes the first waiting query, keeps collecting for up to
+    `max_wait_ms` or until `max_batch` queries, then runs one batched encode
+    and search per (k, corpus, mode) group and resolves each caller's future.
+    """
+
+    def __init__(self, max_batch: int = RETRIEVAL_BATCH_MAX, max_wait_ms: float = RETRIEVAL_BATCH_WAIT_MS):
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(QUEUE_WAIT_MS_BUCKETS)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="retrieval-batcher", daemon=True)
+                    self._thread.start()
+
+    def submit(self, query: str, k: int = TOP_K, corpus_id: str = None, mode: str = None) -> Future:
+        """Queue a query; the future resolves to its list of (chunk_text, score) tuples"""
+        self._ensure_worker()
+        pending = _Pending(query, k, corpus_id, mode)
+        self._queue.put(pending)
+        return pending.future
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            self.batch_sizes.observe(len(batch))
+            for pending in batch:
+                self.queue_wait_ms.observe((started - pending.enqueued_at) * 1000)
+
+            groups = {}
+            for pending in batch:
+                groups.setdefault(pending.group, []).append(pending)
+            for (k, corpus_id, mode), members in groups.items():
+                try:
+                    results = retrieve_many([p.query for p in members], k, corpus_id, mode)
+                except Exception as e:
+                    for p in members:
+                        p.future.set_exception(e)
+                    continue
+                for p, result in zip(members, results):
+                    p.future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "queued": self._queue.qsize(),
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot()
+        }
+
+
+_batcher = RetrievalBatcher()
+
+
+def batched_retrieve(query: str, k: int = TOP_K, corpus_id: str = None, mode: str = None) -> list[tuple[str, float]]:
+    """
+    Drop-in for retrieval.retrieve() that shares encode and search work with
+    concurrent callers. Blocks the calling thread; with RETRIEVAL_BATCH_MAX <= 1
+    it is a plain retrieve().
+    """
+    if _batcher.max_batch <= 1:
+        return retrieve(query, k, corpus_id, mode)
+    return _batcher.submit(query, k, corpus_id, mode).result()
+
+
+def get_batcher_stats() -> dict:
+    """
+    Get batch-size and queue-wait histograms of the retrieval batcher.
+
+    Returns:
+        dict: limits, current queue length and the two histograms
+    """
+    return _batcher.stats()
@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import numpy as np
+
+
+class LRUCache:
+    """
+    Bounded, thread-safe LRU cache with an optional time-to-live per entry.
+
+    Entries beyond `max_size` are evicted least-recently-used first, and
+    entries older than `ttl` seconds are treated as misses and dropped.
+    """
+
+    def __init__(self, max_size: int = 512, ttl: Optional[float] = None):
+        self.max_size = max(0, int(max_size))
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """
+        Get hit/miss counters and occupancy of the cache.
+
+        Returns:
+            dict: size, max_size, ttl, hits, misses, evictions and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0
+            }
+
+
+class SemanticCache:
+    """
+    Answer cache matched by cosine similarity of normalized query embeddings.
+
+    Entries live in separate scopes (one per corpus), each bounded to
+    `max_entries` with least-recently-used eviction; at most `max_scopes`
+    scopes are kept. A lookup is one matrix-vector product per scope.
+    """
+
+    def __init__(self, threshold: float = 0.92, max_entries: int = 256, max_scopes: int = 16):
+        self.threshold = threshold
+        self.max_entries = max(1, int(max_entries))
+        self.max_scopes = max(1, int(max_scopes))
+        self._scopes = OrderedDict()  # scope -> {"matrix", "values", "last_used"}
+        self._lock = threading.Lock()
+        self._clock = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def get(self, scope: Hashable, embedding: np.ndarray) -> Any:
+        """
+        Find the value stored for the most similar query in `scope`.
+
+        Returns:
+            The cached value if its similarity reaches the threshold, else None
+        """
+        with self._lock:
+            entry = self._scopes.get(scope)
+            if entry is None or not entry["values"]:
+                self.misses += 1
+                return None
+
+            similarities = entry["matrix"] @ embedding
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            self._scopes.move_to_end(scope)
+            self._clock += 1
+            entry["last_used"][best] = self._clock
+            self.hits += 1
+            return entry["values"][best]
+
+    def put(self, scope: Hashable, embedding: np.ndarray, value: Any):
+        with self._lock:
+            entry = self._scopes.get(scope)
+            if entry is None:
+                entry = {"matrix": np.empty((0, embedding.shape[0]), dtype=np.float32),
+                         "values": [], "last_used": []}
+                self._scopes[scope] = entry
+                while len(self._scopes) > self.max_scopes:
+                    self._scopes.popitem(last=False)
+            self._scopes.move_to_end(scope)
+
+            if len(entry["values"]) >= self.max_entries:
+                victim = int(np.argmin(entry["last_used"]))
+                entry["matrix"] = np.delete(entry["matrix"], victim, axis=0)
+                del entry["values"][victim]
+                del entry["last_used"][victim]
+                self.evictions += 1
+
+            self._clock += 1
+            entry["matrix"] = np.vstack([entry["matrix"], embedding.astype(np.float32)[None, :]])
+            entry["values"].append(value)
+            entry["last_used"].append(self._clock)
+            self.stores += 1
+
+    def clear(self, scope: Hashable = None):
+        with self._lock:
+            if scope is None:
+                self._scopes.clear()
+            else:
+                self._scopes.pop(scope, None)
+
+    def stats(self) -> dict:
+        """
+        Get hit/miss counters and occupancy of the cache.
+
+        Returns:
+            dict: threshold, scopes, entries, hits, misses, stores, evictions and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "threshold": self.threshold,
+                "scopes": len(self._scopes),
+                "entries": sum(len(e["values"]) for e in self._scopes.values()),
+                "max_entries_per_scope": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0
+            }
@@ -1,73 +1,95 @@
-from .retrieval import retrieve
-from .prompt_gen import build_prompt
-from .config import GEMINI_API_KEY, MODEL, TOP_K
-from .formatter import create_professional_summary
-from google import genai
+from .retrieval import encode_query, get_corpus_key, get_corpus_version, load_corpus
+from .batching import batched_retrieve
+from .prompt_gen import build_prompt, estimate_tokens, truncate_to_tokens, MIN_TRUNCATED_CHUNK_TOKENS
+from .cache import SemanticCache
+from .config import (
+    TOP_K, PROMPT_TOKEN_BUDGET, PROMPT_HISTORY_SHARE, ANSWER_CACHE_ENABLED, ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_SIZE, ANSWER_CACHE_MAX_CORPORA
+)
+from .formatter import create_professional_summary, StreamingFormatter
+from . import llm
+from . import conversation_store
+from . import ingest_cache
+from .summaries import submit_summary
+from .singleflight import SingleFlight, CoalescedCallCancelled
+from .memory import prompt_history, schedule_update
+import asyncio
 import datetime
+import hashlib
+import json
+import os
+import tempfile
+import uuid
 
-# Initialize the GenAI client
-client = genai.Client(api_key=GEMINI_API_KEY)
+# First-turn answers per corpus, matched on paraphrased questions
+_answer_cache = SemanticCache(
+    threshold=ANSWER_CACHE_THRESHOLD,
+    max_entries=ANSWER_CACHE_SIZE,
+    max_scopes=ANSWER_CACHE_MAX_CORPORA
+)
 
-# Session state management
-conversation_state = {
-    "file_name": None,
-    "conversation_history": [],
-    "session_id": None,
-    "start_time": None,
-    "status": "inactive"  # inactive, active, finalized
-}
+# Identical questions in flight at the same time share one retrieval + generation
+_inflight = SingleFlight()
 
+NO_RESULTS_REPLY = "No relevant information found in the portfolio."
 
-def start_new_conversation(file_name: str):
+
+def start_new_conversation(session: dict, file_name: str, file_hash: str = None, version: str = None):
     """
-    Start a BRAND NEW conversation for a new file.
-    This is called AFTER the previous conversation has been finalized.
+    Start a BRAND NEW conversation for a new file in a client session.
+    This is called AFTER the session's previous conversation has been finalized.
     
     Args:
+        session (dict): Client session (see sessions.new_session)
         file_name (str): Name of the newly uploaded file
+        file_hash (str): Content hash of the file = corpus id the conversation is bound to
+        version (str): Index version of that corpus, used to reload it if evicted
     """
-    global conversation_state
-    
-    # Create new session
-    session_id = f"{file_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    # Random suffix: file name and time alone collide across sessions and are guessable
+    conversation_id = f"{file_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex}"
     
-    conversation_state = {
+    session.update({
         "file_name": file_name,
+        "file_hash": file_hash,
+        "corpus_version": version,
+        "conversation_id": conversation_id,
         "conversation_history": [],
-        "session_id": session_id,
         "start_time": datetime.datetime.now().isoformat(),
-        "status": "active"
-    }
+        "status": "active",
+        "memory_summary": None,
+        "memory_covered_until": None
+    })
+    conversation_store.save_session(session)
     
     print(f"✨ NEW CONVERSATION STARTED")
     print(f"   File: {file_name}")
-    print(f"   Session ID: {session_id}")
+    print(f"   Session ID: {session['session_id']}")
+    print(f"   Conversation ID: {conversation_id}")
     print(f"   Status: ACTIVE")
     print(f"   History: EMPTY (fresh start)")
 
 
-def finalize_conversation(file_name: str) -> str:
+def finalize_conversation(session: dict) -> str:
     """
-    Gracefully finalize the current conversation with Gemini.
-    Creates a summary and properly closes the session.
+    Gracefully finalize the session's current conversation.
+    Closes it and archives it at once; the AI summary is generated in the
+    background and added to the archive (and to the returned dict) when ready.
     
     Args:
-        file_name (str): Name of the file being finalized
+        session (dict): Client session
         
     Returns:
-        str: Summary message of the finalized conversation
+        dict: Finalization summary, with "summary_status" pending until the AI summary is in
     """
-    global conversation_state
-    
-    if conversation_state["status"] != "active":
+    if session["status"] != "active":
         print("ℹ️  No active conversation to finalize")
         return "No active conversation"
     
-    history_count = len(conversation_state["conversation_history"])
+    file_name = session["file_name"]
+    history_count = len(session["conversation_history"])
     duration = "unknown"
     
-    if conversation_state.get("start_time"):
-        start = datetime.datetime.fromisoformat(conversation_state["start_time"])
+    if session.get("start_time"):
+        start = datetime.datetime.fromisoformat(session["start_time"])
         end = datetime.datetime.now()
         duration_seconds = (end - start).total_seconds()
         duration = f"{int(duration_seconds // 60)} minutes"
@@ -75,175 +97,506 @@ def finalize_conversation(file_name: str) -> str:
     # Create finalization summary
     summary = {
         "file_name": file_name,
-        "session_id": conversation_state["session_id"],
+        "session_id": session["session_id"],
+        "conversation_id": session["conversation_id"],
         "total_exchanges": history_count,
         "duration": duration,
         "status": "finalized",
-        "finalized_at": datetime.datetime.now().isoformat()
+        "finalized_at": datetime.datetime.now().isoformat(),
+        "ai_summary": None,
+        "summary_status": "pending"  # pending, ready, failed, skipped
     }
-    
-    # Optional: Generate AI summary of the conversation
-    if history_count > 0:
-        try:
-            summary_prompt = f"""This conversation about {file_name} is ending. 
-It had {history_count} exchanges over {duration}. 
-Provide a brief 1-sentence summary of what was discussed."""
-            
-            response = client.models.generate_content(model=MODEL, contents=summary_prompt)
-            summary["ai_summary"] = response.text.strip() if response.text else "Summary unavailable"
-        except Exception as e:
-            print(f"⚠️  Could not generate AI summary: {e}")
-            summary["ai_summary"] = "Summary generation failed"
-    else:
+    if history_count == 0:
         summary["ai_summary"] = "No exchanges in this conversation"
+        summary["summary_status"] = "ready"
     
-    # Mark as finalized
-    conversation_state["status"] = "finalized"
+    # Mark as finalized and archive it
+    session["status"] = "finalized"
+    conversation_store.save_session(session)
+    _archive_conversation(session, summary)
+
+    # The AI summary is generated off the request path, batched with other finalizations
+    if summary["summary_status"] == "pending":
+        submit_summary(summary, file_name, [ex["user"] for ex in session["conversation_history"]])
     
     print(f"🔚 CONVERSATION FINALIZED")
     print(f"   File: {file_name}")
     print(f"   Exchanges: {history_count}")
     print(f"   Duration: {duration}")
-    print(f"   Summary: {summary['ai_summary']}")
+    print(f"   Summary: {summary['ai_summary'] or 'queued'}")
     
     return summary
 
 
-def query_portfolio(user_query: str, top_k: int = TOP_K, is_new_session: bool = False) -> str:
+def _archive_conversation(session: dict, summary: dict):
+    """Store the archive record of a finalized conversation (see /history)."""
+    conversation_store.archive_conversation({
+        "session_id": session["session_id"],
+        "conversation_id": session["conversation_id"],
+        "file_name": session["file_name"],
+        "file_hash": session["file_hash"],
+        "start_time": session["upload_timestamp"] or session["start_time"],
+        "end_time": summary["finalized_at"],
+        "status": "finalized",
+        "total_exchanges": summary["total_exchanges"],
+        "duration": summary["duration"],
+        "ai_summary": summary["ai_summary"]
+    })
+    print(f"📦 Archived conversation for: {session['file_name']}")
+
+
+def _answer_cache_key(session: dict, user_query: str):
     """
-    Query portfolio using RAG with conversation management.
-    
-    - Each file has its own isolated conversation
-    - History is ONLY from current active session
-    - When new file uploaded, previous conversation is finalized first
+    (corpus key, query embedding) for the answer cache, or None when it
+    does not apply: disabled, the session's corpus is not loaded, or a
+    follow-up turn whose answer depends on the conversation history.
+    """
+    if not ANSWER_CACHE_ENABLED or session["conversation_history"]:
+        return None
+    corpus_key = get_corpus_key(session["file_hash"])
+    if corpus_key is None:
+        return None
+    return corpus_key, encode_query(user_query)
+
+
+def _rebind_pruned_corpus(session: dict):
+    """
+    Load the session's corpus when its index version no longer exists (pruned
+    while the session was stored): republish it from the ingestion cache, or
+    fall back to the published version, and bind the session to what was loaded.
+    """
+    corpus_id = session["file_hash"]
+    fd, resume_path = tempfile.mkstemp(suffix=".txt")
+    os.close(fd)
+    try:
+        version = ingest_cache.restore(corpus_id, resume_path)
+    finally:
+        if os.path.exists(resume_path):
+            os.remove(resume_path)
+    if version is None:
+        print(f"⚠️  Index version {session['corpus_version']} of {session['file_name']} is gone and not cached, "
+              f"falling back to the published version")
+    load_corpus(corpus_id, version, activate=False)
+    session["corpus_version"] = get_corpus_version(corpus_id)
+    conversation_store.save_session(session)
+
+
+def _retrieve_for_session(session: dict, user_query: str, top_k: int) -> list:
+    """
+    Retrieve from the corpus the session is bound to (batched with concurrent
+    requests). A corpus dropped from memory since the upload is reloaded.
+    """
+    corpus_id = session["file_hash"]
+    try:
+        return batched_retrieve(user_query, top_k, corpus_id=corpus_id)
+    except KeyError:
+        if corpus_id is None or session["corpus_version"] is None:
+            raise
+    print(f"📥 Corpus for {session['file_name']} was evicted, reloading version {session['corpus_version']}")
+    try:
+        load_corpus(corpus_id, session["corpus_version"], activate=False)
+    except FileNotFoundError:
+        _rebind_pruned_corpus(session)
+    return batched_retrieve(user_query, top_k, corpus_id=corpus_id)
+
+
+def _precheck_query(session: dict, user_query: str, is_new_session: bool) -> str:
+    """
+    Per-session part of answering a query: session state and the answer cache.
     
-    Args:
-        user_query (str): User question
-        top_k (int): Number of chunks to retrieve
-        is_new_session (bool): True if this is first query after new file upload
-        
     Returns:
-        str: AI-generated answer
+        str: Reply when the query is answered without retrieval and the LLM, else None
     """
-    global conversation_state
-    
     # Ensure we have an active session
-    if conversation_state["status"] != "active":
+    if session["status"] != "active":
         print("⚠️  No active session - cannot process query")
         return "Error: No active conversation session. Please upload a file first."
     
     # Log session info for new sessions
     if is_new_session:
         print(f"\n🆕 FIRST QUERY OF NEW SESSION")
-        print(f"   File: {conversation_state['file_name']}")
-        print(f"   Session: {conversation_state['session_id']}")
-        print(f"   History: {len(conversation_state['conversation_history'])} exchanges")
-    
-    # Retrieve relevant chunks from CURRENT file
-    chunks = retrieve(user_query, top_k)
-    if not chunks:
-        return "No relevant information found in the portfolio."
+        print(f"   File: {session['file_name']}")
+        print(f"   Session: {session['session_id']}")
+        print(f"   History: {len(session['conversation_history'])} exchanges")
+
+    # First-turn questions may be paraphrases of ones already answered on this corpus
+    cache_key = _answer_cache_key(session, user_query)
+    if cache_key is not None:
+        cached_answer = _answer_cache.get(*cache_key)
+        if cached_answer is not None:
+            print("⚡ Answer served from semantic cache")
+            return _record_answer(session, user_query, cached_answer, cache=False)
+    return None
 
-    # Convert chunks to strings
-    string_chunks = [c[0] if isinstance(c, tuple) else c for c in chunks]
 
-    # Build prompt with CURRENT session history ONLY
-    prompt = build_contextual_prompt(
+def _build_query_prompt(session: dict, user_query: str, top_k: int, usage: dict) -> str:
+    """
+    Run retrieval and build the prompt for a query, or return None if nothing relevant was found.
+    The per-section token spend of the prompt is stored in usage.
+    """
+    # Retrieve relevant chunks from the session's file
+    chunks = _retrieve_for_session(session, user_query, top_k)
+    if not chunks:
+        return None
+
+    # Build prompt with CURRENT session history ONLY (chunks keep their scores for ranking):
+    # a rolling summary of older exchanges plus the newest ones verbatim
+    summary, recent = prompt_history(session)
+    return build_contextual_prompt(
         user_query, 
-        string_chunks, 
-        conversation_state["conversation_history"],
-        conversation_state["file_name"]
+        chunks, 
+        recent,
+        session["file_name"],
+        usage=usage,
+        summary=summary
     )
 
-    # Generate response
-    try:
-        response = client.models.generate_content(model=MODEL, contents=prompt)
-        answer = response.text.strip() if response.text else "No response generated."
-        
-        # Store in CURRENT session history
-        conversation_state["conversation_history"].append({
-            "user": user_query,
-            "assistant": answer,
-            "timestamp": datetime.datetime.now().isoformat()
-        })
-        
-        # Manage context window - keep last 10 exchanges
-        if len(conversation_state["conversation_history"]) > 10:
-            conversation_state["conversation_history"] = \
-                conversation_state["conversation_history"][-10:]
+
+def _prepare_query(session: dict, user_query: str, top_k: int, is_new_session: bool, metadata: dict = None):
+    """
+    Run retrieval and build the prompt for a query.
+    The per-section token spend of the prompt is stored in metadata["prompt_tokens"].
+    
+    Returns:
+        tuple: (prompt, None) when the LLM should be called,
+               or (None, reply) when the query is answered without it
+    """
+    reply = _precheck_query(session, user_query, is_new_session)
+    if reply is not None:
+        return None, reply
+
+    usage = {}
+    prompt = _build_query_prompt(session, user_query, top_k, usage)
+    if metadata is not None:
+        metadata["prompt_tokens"] = usage
+    return (prompt, None) if prompt is not None else (None, NO_RESULTS_REPLY)
+
+
+def _flight_key(session: dict, user_query: str, top_k: int) -> tuple:
+    """
+    Requests with the same key get the same prompt, so they can share an answer:
+    (corpus and version, normalized query, fingerprint of the history the prompt includes, top_k).
+    """
+    corpus_key = get_corpus_key(session["file_hash"]) or session["file_hash"]
+    summary, recent = prompt_history(session)
+    history = [(ex["user"], ex["assistant"]) for ex in recent[-5:]]
+    fingerprint = hashlib.sha1(json.dumps([session["file_name"], summary, history]).encode("utf-8")).hexdigest()
+    return corpus_key, " ".join(user_query.lower().split()), fingerprint, top_k
+
+
+def _generate_answer(session: dict, user_query: str, top_k: int) -> tuple:
+    """Retrieval, prompt and LLM call; run once per group of coalesced requests."""
+    usage = {}
+    prompt = _build_query_prompt(session, user_query, top_k, usage)
+    if prompt is None:
+        return None, usage
+    return llm.generate(prompt), usage
+
+
+async def _agenerate_answer(session: dict, user_query: str, top_k: int) -> tuple:
+    """Async version of _generate_answer()."""
+    usage = {}
+    # Retrieval runs off the event loop so concurrent requests can share a batch
+    prompt = await asyncio.to_thread(_build_query_prompt, session, user_query, top_k, usage)
+    if prompt is None:
+        return None, usage
+    return await llm.agenerate(prompt), usage
+
+
+def _finish_answer(session: dict, user_query: str, answer: str, usage: dict, shared: bool,
+                   metadata: dict = None) -> str:
+    if metadata is not None:
+        metadata["prompt_tokens"] = usage
+        metadata["coalesced"] = shared
+    if answer is None:
+        return NO_RESULTS_REPLY
+    if shared:
+        print("🔗 Answer shared with an identical in-flight request")
+    # Only the request that generated the answer adds it to the answer cache
+    return _record_answer(session, user_query, answer, cache=not shared)
+
+
+def _record_answer(session: dict, user_query: str, answer: str, cache: bool = True) -> str:
+    """
+    Store an exchange in the session history and format the answer.
+    First-turn answers are also added to the semantic answer cache.
+    """
+    if cache and answer:
+        cache_key = _answer_cache_key(session, user_query)
+        if cache_key is not None:
+            _answer_cache.put(*cache_key, answer)
+
+    answer = answer if answer else "No response generated."
+
+    # Store in CURRENT session history; the full history is kept in the conversation store
+    exchange = {
+        "user": user_query,
+        "assistant": answer,
+        "timestamp": datetime.datetime.now().isoformat()
+    }
+    # Under the session's lock, so a concurrent file switch cannot interleave
+    with session["lock"]:
+        session["conversation_history"].append(exchange)
+        conversation_store.add_exchange(session, exchange)
+
+        # Manage context window - keep last 10 exchanges in memory
+        if len(session["conversation_history"]) > 10:
+            session["conversation_history"] = session["conversation_history"][-10:]
+
+        exchange_num = len(session["conversation_history"])
+    print(f"💬 Exchange #{exchange_num} recorded in current session")
+
+    # Fold exchanges leaving the verbatim window into the rolling summary, off the request path
+    schedule_update(session)
+
+    return create_professional_summary(answer)
+
+
+def query_portfolio(user_query: str, session: dict, top_k: int = TOP_K, is_new_session: bool = False,
+                    metadata: dict = None) -> str:
+    """
+    Query portfolio using RAG with conversation management.
+    
+    - Each client session has its own isolated conversation and corpus
+    - History is ONLY from the session's active conversation
+    - When new file uploaded, previous conversation is finalized first
+    
+    Args:
+        user_query (str): User question
+        session (dict): Client session the question belongs to
+        top_k (int): Number of chunks to retrieve
+        is_new_session (bool): True if this is first query after new file upload
+        metadata (dict): If given, filled with response metadata (prompt token spend,
+                         whether the answer was shared with an identical concurrent request)
         
-        exchange_num = len(conversation_state["conversation_history"])
-        print(f"💬 Exchange #{exchange_num} recorded in current session")
+    Returns:
+        str: AI-generated answer
+    """
+    reply = _precheck_query(session, user_query, is_new_session)
+    if reply is not None:
+        return reply
+
+    # Generate response (shared with identical requests already in flight)
+    try:
+        (answer, usage), shared = _inflight.do(
+            _flight_key(session, user_query, top_k), _generate_answer, session, user_query, top_k
+        )
+    except (llm.LLMError, CoalescedCallCancelled) as e:
+        print(f"❌ Error generating response: {e}")
+        return f"Error generating response: {e}"
+    return _finish_answer(session, user_query, answer, usage, shared, metadata)
 
-        return create_professional_summary(answer)
 
-    except Exception as e:
+async def aquery_portfolio(user_query: str, session: dict, top_k: int = TOP_K, is_new_session: bool = False,
+                           metadata: dict = None) -> str:
+    """
+    Async version of query_portfolio() for FastAPI handlers.
+    The LLM call is awaited through the gateway instead of blocking the event loop.
+    """
+    reply = await asyncio.to_thread(_precheck_query, session, user_query, is_new_session)
+    if reply is not None:
+        return reply
+
+    # Generate response (shared with identical requests already in flight)
+    try:
+        (answer, usage), shared = await _inflight.ado(
+            _flight_key(session, user_query, top_k), _agenerate_answer, session, user_query, top_k
+        )
+    except (llm.LLMError, CoalescedCallCancelled) as e:
         print(f"❌ Error generating response: {e}")
         return f"Error generating response: {e}"
+    return _finish_answer(session, user_query, answer, usage, shared, metadata)
 
 
-def build_contextual_prompt(user_query: str, chunks: list, history: list, file_name: str) -> str:
+async def astream_query_portfolio(user_query: str, session: dict, top_k: int = TOP_K,
+                                  is_new_session: bool = False, metadata: dict = None):
+    """
+    Streaming version of query_portfolio().
+    Yields formatted answer text as the LLM generates it; the exchange is
+    recorded in the session history once the stream completes.
+    
+    Args:
+        user_query (str): User question
+        session (dict): Client session the question belongs to
+        top_k (int): Number of chunks to retrieve
+        is_new_session (bool): True if this is first query after new file upload
+        metadata (dict): If given, filled with response metadata (prompt token spend)
+        
+    Yields:
+        str: Pieces of the formatted answer
+    """
+    prompt, reply = await asyncio.to_thread(_prepare_query, session, user_query, top_k, is_new_session, metadata)
+    if prompt is None:
+        yield reply
+        return
+
+    formatter = StreamingFormatter()
+    raw_pieces = []
+    async for piece in llm.astream(prompt):
+        raw_pieces.append(piece)
+        formatted = formatter.feed(piece)
+        if formatted:
+            yield formatted
+
+    tail = formatter.finish()
+    if tail:
+        yield tail
+
+    _record_answer(session, user_query, "".join(raw_pieces).strip())
+
+
+def _fit_history(history: list, max_tokens: int = None) -> tuple[list, int]:
+    """
+    Keep the newest exchanges that fit in `max_tokens`, truncating the
+    assistant answer of the oldest kept one if needed.
+    
+    Returns:
+        tuple[list, int]: Kept exchanges in chronological order, and how many were dropped
+    """
+    if max_tokens is None:
+        return list(history), 0
+
+    kept = []
+    remaining = max_tokens
+    for exchange in reversed(history):
+        user_cost = estimate_tokens(f"Exchange 0:\nUser: {exchange['user']}\nYou: \n\n")
+        cost = user_cost + estimate_tokens(exchange['assistant'])
+        if cost <= remaining:
+            kept.append(exchange)
+            remaining -= cost
+        elif remaining - user_cost >= MIN_TRUNCATED_CHUNK_TOKENS:
+            kept.append({**exchange, "assistant": truncate_to_tokens(exchange['assistant'], remaining - user_cost)})
+            break
+        else:
+            break
+    kept.reverse()
+    return kept, len(history) - len(kept)
+
+
+def build_contextual_prompt(user_query: str, chunks: list, history: list, file_name: str,
+                            token_budget: int = PROMPT_TOKEN_BUDGET, usage: dict = None,
+                            summary: str = None) -> str:
     """
     Build prompt with conversation context from CURRENT session only.
     
+    The prompt is kept within `token_budget`: after the fixed instructions and
+    question, up to PROMPT_HISTORY_SHARE of what is left goes to the
+    conversation (summary first, then the newest exchanges) and the rest to
+    the best-ranked chunks.
+    
     Args:
         user_query (str): Current question
-        chunks (list): Retrieved chunks from current file
-        history (list): History from CURRENT session ONLY
+        chunks (list): Retrieved chunks from current file (tuples are ranked by score)
+        history (list): Exchanges to include verbatim, from CURRENT session ONLY
         file_name (str): Current file name for context
+        token_budget (int): Estimated token limit for the whole prompt, None for no limit
+        usage (dict): If given, filled with the estimated token spend per section
+        summary (str): Rolling summary of the exchanges before `history`, if any
         
     Returns:
         str: Formatted prompt
     """
-    # Base prompt from existing function
-    base_prompt = build_prompt(user_query, chunks)
-    
-    # Add session context if history exists
-    if history and len(history) > 0:
+    usage = {} if usage is None else usage
+
+    # Include last 5 exchanges, newest first within the history budget
+    history = history[-5:] if history else []
+    if token_budget is None:
+        history_budget = context_budget = None
+    else:
+        fixed_tokens = estimate_tokens(build_prompt(user_query, []))
+        available = max(0, token_budget - fixed_tokens)
+        history_budget = int(available * PROMPT_HISTORY_SHARE) if (history or summary) else 0
+
+    # The summary may take up to half of the history budget when exchanges follow it
+    if summary and history_budget is not None:
+        summary = truncate_to_tokens(summary, history_budget // 2 if history else history_budget)
+        history_budget = max(0, history_budget - estimate_tokens(summary))
+    history, history_dropped = _fit_history(history, history_budget)
+
+    context = ""
+    if history or summary:
         context = f"\n\n=== Conversation Context (Current File: {file_name}) ===\n"
         context += f"This is an ongoing conversation about {file_name}.\n"
-        context += f"Previous exchanges in THIS session:\n\n"
+        if summary:
+            context += f"Summary of the conversation so far:\n{summary}\n\n"
+        if history:
+            context += f"{'Most recent' if summary else 'Previous'} exchanges in THIS session:\n\n"
         
-        # Include last 5 exchanges
-        for idx, exchange in enumerate(history[-5:], 1):
+        for idx, exchange in enumerate(history, 1):
             context += f"Exchange {idx}:\n"
             context += f"User: {exchange['user']}\n"
             context += f"You: {exchange['assistant']}\n\n"
         
         context += f"=== Current Question ===\n"
-        
-        # Combine with base prompt
-        enhanced_prompt = f"{base_prompt}\n{context}\nUser: {user_query}\n\nAnswer:"
-        return enhanced_prompt
+    tail = f"\nUser: {user_query}\n\nAnswer:" if context else ""
+
+    # Retrieved context gets whatever the history left over
+    if token_budget is not None:
+        context_budget = max(0, available - estimate_tokens(context) - estimate_tokens(tail))
+
+    # Base prompt from existing function
+    base_prompt = build_prompt(user_query, chunks, max_context_tokens=context_budget, usage=usage)
+    
+    # Combine with base prompt
+    prompt = f"{base_prompt}\n{context}{tail}" if context else base_prompt
+
+    usage.update({
+        "history": estimate_tokens(context) + estimate_tokens(tail),
+        "history_summary": estimate_tokens(summary) if summary else 0,
+        "history_exchanges": len(history),
+        "history_dropped": history_dropped,
+        "total": estimate_tokens(prompt),
+        "budget": token_budget
+    })
+    return prompt
+
+
+def get_answer_cache_stats() -> dict:
+    """
+    Get semantic answer cache statistics
     
-    return base_prompt
+    Returns:
+        dict: Hit rate, occupancy and eviction counters
+    """
+    return _answer_cache.stats()
+
+
+def get_coalescing_stats() -> dict:
+    """
+    Get request coalescing statistics
+    
+    Returns:
+        dict: Calls, leaders that ran retrieval + generation, coalesced requests and in-flight count
+    """
+    return _inflight.stats()
 
 
-def get_session_status():
+def get_session_status(session: dict):
     """
-    Get current session status and statistics
+    Get a session's conversation status and statistics
     
     Returns:
         dict: Session information
     """
     return {
-        "file_name": conversation_state.get("file_name"),
-        "session_id": conversation_state.get("session_id"),
-        "status": conversation_state.get("status"),
-        "exchanges": len(conversation_state.get("conversation_history", [])),
-        "start_time": conversation_state.get("start_time"),
-        "active": conversation_state.get("status") == "active"
+        "file_name": session.get("file_name"),
+        "session_id": session.get("session_id"),
+        "conversation_id": session.get("conversation_id"),
+        "status": session.get("status"),
+        "exchanges": len(session.get("conversation_history", [])),
+        "start_time": session.get("start_time"),
+        "active": session.get("status") == "active"
     }
 
 
-def get_conversation_summary():
+def get_conversation_summary(session: dict):
     """
-    Get a summary of the current conversation
+    Get a summary of a session's current conversation
     
     Returns:
         dict: Conversation summary
     """
-    history = conversation_state.get("conversation_history", [])
+    history = session.get("conversation_history", [])
     
     if not history:
         return {"message": "No conversation history"}
@@ -251,9 +604,9 @@ def get_conversation_summary():
     topics = [ex["user"] for ex in history]
     
     return {
-        "file_name": conversation_state.get("file_name"),
+        "file_name": session.get("file_name"),
         "total_exchanges": len(history),
         "topics_discussed": topics,
-        "session_status": conversation_state.get("status")
+        "session_status": session.get("status")
     }
 
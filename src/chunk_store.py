@@ -0,0 +1,81 @@
+import os
+import mmap
+import struct
+import numpy as np
+
+# File layout (little endian):
+#   magic (8 bytes) | count (uint64) | offsets ((count + 1) x uint64) | UTF-8 blob
+# Chunk i is blob[offsets[i]:offsets[i + 1]].
+MAGIC = b"CHNKSTR1"
+HEADER = struct.Struct("<8sQ")
+
+
+def write_chunk_store(chunks: list[str], path: str):
+    """
+    Write chunks as an offsets array followed by one UTF-8 blob.
+
+    Args:
+        chunks (list[str]): Chunk texts, in index order
+        path (str): Destination file
+    """
+    encoded = [c.encode("utf-8") for c in chunks]
+    offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(encoded)))
+        f.write(offsets.tobytes())
+        for e in encoded:
+            f.write(e)
+    print(f"Saved {len(chunks)} chunks to {path}")
+
+
+class ChunkStore:
+    """
+    Read-only, memory-mapped view of a chunk store file.
+
+    Behaves like a list of strings: len(), indexing and iteration work,
+    but a chunk is only decoded when it is accessed, so opening the store
+    costs the same whatever the corpus size.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"❌ {path} is not a chunk store file")
+
+        self._count = count
+        self._offsets = np.frombuffer(self._mm, dtype="<u8", count=count + 1, offset=HEADER.size)
+        self._blob_start = HEADER.size + (count + 1) * 8
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> str:
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(f"chunk index {i} out of range")
+        start = self._blob_start + int(self._offsets[i])
+        end = self._blob_start + int(self._offsets[i + 1])
+        return self._mm[start:end].decode("utf-8")
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the mapped file (mapped pages are shared and paged in on demand)"""
+        return len(self._mm)
+
+    def close(self):
+        self._offsets = None
+        self._mm.close()
+        self._file.close()
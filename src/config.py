@@ -9,20 +9,146 @@ GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 150))
 CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 30))
 TOP_K = int(os.getenv("TOP_K", 10))
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 4000))
+PROMPT_HISTORY_SHARE = float(os.getenv("PROMPT_HISTORY_SHARE", 0.3))
+PROMPT_CHARS_PER_TOKEN = int(os.getenv("PROMPT_CHARS_PER_TOKEN", 4))
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
 MODEL = os.getenv("MODEL", "gemini-2.5-flash")
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # 'gemini' or 'local' (deterministic, offline)
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", 0.5))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", 8))
+LLM_LOCAL_LATENCY_MS = float(os.getenv("LLM_LOCAL_LATENCY_MS", 0))
 INDEX_PATH = os.getenv("INDEX_PATH", "embeddings/faiss_index.bin")
 CHUNKS_PATH = os.getenv("CHUNKS_PATH", "embeddings/chunks.json")
+INDEX_ROOT = os.getenv("INDEX_ROOT", os.path.dirname(INDEX_PATH) or "embeddings")
+INDEX_KEEP_VERSIONS = int(os.getenv("INDEX_KEEP_VERSIONS", 3))
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", os.path.join(INDEX_ROOT, "embedding_store"))
+INGEST_CACHE_DIR = os.getenv("INGEST_CACHE_DIR", os.path.join(INDEX_ROOT, "ingest_cache"))
+INGEST_CACHE_MAX_MB = float(os.getenv("INGEST_CACHE_MAX_MB", 512))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 2))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 8))
+INGEST_JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", 100))
 RESUME_PATH = os.getenv("RESUME_PATH", r"data\\john.txt")  
 INDEX_PATH_EMBEDDINGS = os.getenv("INDEX_PATH_EMBEDDINGS", "embeddings/chunks_embeddings.npy")
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", 512))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", 3600))
+BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", 100))
+BATCH_MAX_K = int(os.getenv("BATCH_MAX_K", 100))
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", 0.92))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", 256))
+ANSWER_CACHE_MAX_CORPORA = int(os.getenv("ANSWER_CACHE_MAX_CORPORA", 16))
+CORPUS_MEMORY_BUDGET_MB = float(os.getenv("CORPUS_MEMORY_BUDGET_MB", 256))
+CORPUS_MAX_COUNT = int(os.getenv("CORPUS_MAX_COUNT", 16))
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")  # 'hybrid' (BM25 + dense) or 'dense'
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", 50))
+RRF_K = int(os.getenv("RRF_K", 60))
+BM25_K1 = float(os.getenv("BM25_K1", 1.5))
+BM25_B = float(os.getenv("BM25_B", 0.75))
+ANN_INDEX_TYPE = os.getenv("ANN_INDEX_TYPE", "auto")  # 'auto', 'flat', 'hnsw' or 'ivf'
+ANN_FLAT_MAX = int(os.getenv("ANN_FLAT_MAX", 20000))
+ANN_HNSW_MAX = int(os.getenv("ANN_HNSW_MAX", 1000000))
+ANN_TARGET_RECALL = float(os.getenv("ANN_TARGET_RECALL", 0.95))
+HNSW_M = int(os.getenv("HNSW_M", 32))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", 200))
+INDEX_QUANTIZATION = os.getenv("INDEX_QUANTIZATION", "none")  # 'none', 'int8' or 'pq'
+PQ_M = int(os.getenv("PQ_M", 48))
+RERANK_FACTOR = int(os.getenv("RERANK_FACTOR", 4))
+NUMPY_BACKEND_MAX_VECTORS = int(os.getenv("NUMPY_BACKEND_MAX_VECTORS", 20000))
+EMBEDDING_SERVICE_SOCKET = os.getenv("EMBEDDING_SERVICE_SOCKET", "")  # empty = encode in-process
+EMBEDDING_SERVICE_MAX_BATCH = int(os.getenv("EMBEDDING_SERVICE_MAX_BATCH", 64))
+EMBEDDING_SERVICE_MAX_WAIT_MS = float(os.getenv("EMBEDDING_SERVICE_MAX_WAIT_MS", 5))
+EMBEDDING_SERVICE_TIMEOUT = float(os.getenv("EMBEDDING_SERVICE_TIMEOUT", 30))
+EMBEDDING_SERVICE_RETRY_S = float(os.getenv("EMBEDDING_SERVICE_RETRY_S", 30))
+RETRIEVAL_BATCH_MAX = int(os.getenv("RETRIEVAL_BATCH_MAX", 16))  # 1 disables request batching
+RETRIEVAL_BATCH_WAIT_MS = float(os.getenv("RETRIEVAL_BATCH_WAIT_MS", 2))
+SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", 1000))
+SESSION_IDLE_TIMEOUT = float(os.getenv("SESSION_IDLE_TIMEOUT", 1800))  # seconds
+CONVERSATION_DB_PATH = os.getenv("CONVERSATION_DB_PATH", os.path.join("data", "conversations.db"))
+CONVERSATION_DB_BATCH_MAX = int(os.getenv("CONVERSATION_DB_BATCH_MAX", 256))
+CONVERSATION_DB_FLUSH_MS = float(os.getenv("CONVERSATION_DB_FLUSH_MS", 50))
+CONVERSATION_DB_QUEUE_SIZE = int(os.getenv("CONVERSATION_DB_QUEUE_SIZE", 10000))
+SUMMARY_QUEUE_SIZE = int(os.getenv("SUMMARY_QUEUE_SIZE", 200))  # finalizations beyond this get no AI summary
+SUMMARY_BATCH_MAX = int(os.getenv("SUMMARY_BATCH_MAX", 8))
+SUMMARY_BATCH_WAIT_MS = float(os.getenv("SUMMARY_BATCH_WAIT_MS", 1000))
+SUMMARY_MAX_AGE_S = float(os.getenv("SUMMARY_MAX_AGE_S", 300))
+MEMORY_ENABLED = os.getenv("MEMORY_ENABLED", "true").lower() == "true"
+MEMORY_RAW_TURNS = int(os.getenv("MEMORY_RAW_TURNS", 2))  # newest exchanges always sent verbatim
+MEMORY_SUMMARY_TOKENS = int(os.getenv("MEMORY_SUMMARY_TOKENS", 200))
 if __name__ == "__main__":
     print(f"GEMINI_API_KEY: {GEMINI_API_KEY}")
     print(f"CHUNK_SIZE: {CHUNK_SIZE}")
     print(f"CHUNK_OVERLAP: {CHUNK_OVERLAP}")
     print(f"TOP_K: {TOP_K}")
+    print(f"PROMPT_TOKEN_BUDGET: {PROMPT_TOKEN_BUDGET}")
+    print(f"PROMPT_HISTORY_SHARE: {PROMPT_HISTORY_SHARE}")
+    print(f"PROMPT_CHARS_PER_TOKEN: {PROMPT_CHARS_PER_TOKEN}")
     print(f"EMBEDDING_MODEL: {EMBEDDING_MODEL}")
     print(f"MODEL: {MODEL}")
+    print(f"LLM_BACKEND: {LLM_BACKEND}")
+    print(f"LLM_TIMEOUT: {LLM_TIMEOUT}")
+    print(f"LLM_MAX_RETRIES: {LLM_MAX_RETRIES}")
+    print(f"LLM_MAX_CONCURRENCY: {LLM_MAX_CONCURRENCY}")
+    print(f"LLM_BACKOFF_BASE: {LLM_BACKOFF_BASE}")
+    print(f"LLM_BACKOFF_MAX: {LLM_BACKOFF_MAX}")
+    print(f"LLM_LOCAL_LATENCY_MS: {LLM_LOCAL_LATENCY_MS}")
     print(f"INDEX_PATH: {INDEX_PATH}")
     print(f"CHUNKS_PATH: {CHUNKS_PATH}")
+    print(f"INDEX_ROOT: {INDEX_ROOT}")
+    print(f"INDEX_KEEP_VERSIONS: {INDEX_KEEP_VERSIONS}")
+    print(f"EMBEDDING_STORE_DIR: {EMBEDDING_STORE_DIR}")
+    print(f"INGEST_CACHE_DIR: {INGEST_CACHE_DIR}")
+    print(f"INGEST_CACHE_MAX_MB: {INGEST_CACHE_MAX_MB}")
+    print(f"INGEST_WORKERS: {INGEST_WORKERS}")
+    print(f"INGEST_QUEUE_SIZE: {INGEST_QUEUE_SIZE}")
+    print(f"INGEST_JOB_HISTORY: {INGEST_JOB_HISTORY}")
     print(f"RESUME_PATH: {RESUME_PATH}")
     print(f"INDEX_PATH_EMBEDDINGS: {INDEX_PATH_EMBEDDINGS}")
+    print(f"QUERY_CACHE_SIZE: {QUERY_CACHE_SIZE}")
+    print(f"QUERY_CACHE_TTL: {QUERY_CACHE_TTL}")
+    print(f"BATCH_MAX_QUERIES: {BATCH_MAX_QUERIES}")
+    print(f"BATCH_MAX_K: {BATCH_MAX_K}")
+    print(f"ANSWER_CACHE_ENABLED: {ANSWER_CACHE_ENABLED}")
+    print(f"ANSWER_CACHE_THRESHOLD: {ANSWER_CACHE_THRESHOLD}")
+    print(f"ANSWER_CACHE_SIZE: {ANSWER_CACHE_SIZE}")
+    print(f"ANSWER_CACHE_MAX_CORPORA: {ANSWER_CACHE_MAX_CORPORA}")
+    print(f"CORPUS_MEMORY_BUDGET_MB: {CORPUS_MEMORY_BUDGET_MB}")
+    print(f"CORPUS_MAX_COUNT: {CORPUS_MAX_COUNT}")
+    print(f"RETRIEVAL_MODE: {RETRIEVAL_MODE}")
+    print(f"HYBRID_CANDIDATES: {HYBRID_CANDIDATES}")
+    print(f"RRF_K: {RRF_K}")
+    print(f"BM25_K1: {BM25_K1}")
+    print(f"BM25_B: {BM25_B}")
+    print(f"ANN_INDEX_TYPE: {ANN_INDEX_TYPE}")
+    print(f"ANN_FLAT_MAX: {ANN_FLAT_MAX}")
+    print(f"ANN_HNSW_MAX: {ANN_HNSW_MAX}")
+    print(f"ANN_TARGET_RECALL: {ANN_TARGET_RECALL}")
+    print(f"HNSW_M: {HNSW_M}")
+    print(f"HNSW_EF_CONSTRUCTION: {HNSW_EF_CONSTRUCTION}")
+    print(f"INDEX_QUANTIZATION: {INDEX_QUANTIZATION}")
+    print(f"PQ_M: {PQ_M}")
+    print(f"RERANK_FACTOR: {RERANK_FACTOR}")
+    print(f"NUMPY_BACKEND_MAX_VECTORS: {NUMPY_BACKEND_MAX_VECTORS}")
+    print(f"EMBEDDING_SERVICE_SOCKET: {EMBEDDING_SERVICE_SOCKET}")
+    print(f"EMBEDDING_SERVICE_MAX_BATCH: {EMBEDDING_SERVICE_MAX_BATCH}")
+    print(f"EMBEDDING_SERVICE_MAX_WAIT_MS: {EMBEDDING_SERVICE_MAX_WAIT_MS}")
+    print(f"EMBEDDING_SERVICE_TIMEOUT: {EMBEDDING_SERVICE_TIMEOUT}")
+    print(f"EMBEDDING_SERVICE_RETRY_S: {EMBEDDING_SERVICE_RETRY_S}")
+    print(f"RETRIEVAL_BATCH_MAX: {RETRIEVAL_BATCH_MAX}")
+    print(f"RETRIEVAL_BATCH_WAIT_MS: {RETRIEVAL_BATCH_WAIT_MS}")
+    print(f"SESSION_MAX_COUNT: {SESSION_MAX_COUNT}")
+    print(f"SESSION_IDLE_TIMEOUT: {SESSION_IDLE_TIMEOUT}")
+    print(f"CONVERSATION_DB_PATH: {CONVERSATION_DB_PATH}")
+    print(f"CONVERSATION_DB_BATCH_MAX: {CONVERSATION_DB_BATCH_MAX}")
+    print(f"CONVERSATION_DB_FLUSH_MS: {CONVERSATION_DB_FLUSH_MS}")
+    print(f"CONVERSATION_DB_QUEUE_SIZE: {CONVERSATION_DB_QUEUE_SIZE}")
+    print(f"SUMMARY_QUEUE_SIZE: {SUMMARY_QUEUE_SIZE}")
+    print(f"SUMMARY_BATCH_MAX: {SUMMARY_BATCH_MAX}")
+    print(f"SUMMARY_BATCH_WAIT_MS: {SUMMARY_BATCH_WAIT_MS}")
+    print(f"SUMMARY_MAX_AGE_S: {SUMMARY_MAX_AGE_S}")
+    print(f"MEMORY_ENABLED: {MEMORY_ENABLED}")
+    print(f"MEMORY_RAW_TURNS: {MEMORY_RAW_TURNS}")
+    print(f"MEMORY_SUMMARY_TOKENS: {MEMORY_SUMMARY_TOKENS}")
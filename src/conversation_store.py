@@ -0,0 +1,345 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from .config import (
+    CONVERSATION_DB_PATH, CONVERSATION_DB_BATCH_MAX, CONVERSATION_DB_FLUSH_MS, CONVERSATION_DB_QUEUE_SIZE
+)
+
+# Durable store for sessions, exchanges and the archive of finalized
+# conversations (SQLite in WAL mode). Writes go through one writer thread
+# that commits them in batches; reads use per-thread connections, which WAL
+# lets run alongside the writer. Nothing is kept in process memory beyond
+# the bounded write queue.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id      TEXT PRIMARY KEY,
+    created_at      TEXT,
+    updated_at      TEXT,
+    file_name       TEXT,
+    file_hash       TEXT,
+    corpus_version  TEXT,
+    upload_timestamp TEXT,
+    conversation_id TEXT,
+    start_time      TEXT,
+    status          TEXT,
+    memory_summary  TEXT,
+    memory_covered_until TEXT
+);
+CREATE TABLE IF NOT EXISTS exchanges (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id TEXT NOT NULL,
+    session_id      TEXT NOT NULL,
+    user            TEXT NOT NULL,
+    assistant       TEXT NOT NULL,
+    timestamp       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS exchanges_by_conversation ON exchanges (conversation_id, id);
+CREATE TABLE IF NOT EXISTS conversations (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id TEXT NOT NULL UNIQUE,
+    session_id      TEXT NOT NULL,
+    file_name       TEXT,
+    file_hash       TEXT,
+    start_time      TEXT,
+    end_time        TEXT,
+    status          TEXT,
+    total_exchanges INTEGER,
+    duration        TEXT,
+    ai_summary      TEXT
+);
+CREATE INDEX IF NOT EXISTS conversations_by_session ON conversations (session_id, id);
+"""
+
+SESSION_COLUMNS = ("session_id", "created_at", "file_name", "file_hash", "corpus_version",
+                   "upload_timestamp", "conversation_id", "start_time", "status",
+                   "memory_summary", "memory_covered_until")
+# Columns added after the first release, created on databases that predate them
+ADDED_SESSION_COLUMNS = {"memory_summary": "TEXT", "memory_covered_until": "TEXT"}
+ARCHIVE_COLUMNS = ("conversation_id", "session_id", "file_name", "file_hash", "start_time", "end_time",
+                   "status", "total_exchanges", "duration", "ai_summary")
+
+# Exchanges loaded back into a resumed session (chat keeps the last 10 in memory)
+RESUME_HISTORY = 10
+MAX_PAGE_SIZE = 100
+
+
+class ConversationStore:
+    """
+    SQLite-backed store with batched, asynchronous writes.
+
+    Writes are queued (blocking once `queue_size` are pending) and a writer
+    thread commits up to `batch_max` of them per transaction, waiting at most
+    `flush_ms` after the first one. Reads see committed data; call flush()
+    to wait for queued writes.
+    """
+
+    def __init__(self, path: str = CONVERSATION_DB_PATH, batch_max: int = CONVERSATION_DB_BATCH_MAX,
+                 flush_ms: float = CONVERSATION_DB_FLUSH_MS, queue_size: int = CONVERSATION_DB_QUEUE_SIZE):
+        self.path = path
+        self.batch_max = max(1, batch_max)
+        self.flush_wait = max(0.0, flush_ms) / 1000
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._local = threading.local()
+        self._stats = {"writes": 0, "batches": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        self._migrate(conn)
+        conn.close()
+        threading.Thread(target=self._write_loop, name="conversation-store", daemon=True).start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _migrate(self, conn: sqlite3.Connection):
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(sessions)")}
+        with conn:
+            for column, column_type in ADDED_SESSION_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE sessions ADD COLUMN {column} {column_type}")
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # === Writes ===
+
+    def write(self, sql: str, params: tuple = ()):
+        """Queue one statement for the next batch"""
+        self._queue.put((sql, params))
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every write queued so far is committed"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _next_batch(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_wait
+        while len(batch) < self.batch_max:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = self._next_batch()
+            statements = [op for op in batch if not isinstance(op, threading.Event)]
+            try:
+                with conn:
+                    for sql, params in statements:
+                        conn.execute(sql, params)
+            except sqlite3.Error as e:
+                print(f"⚠️  Conversation store batch failed ({e}), retrying {len(statements)} statements one by one")
+                self._write_each(conn, statements)
+            with self._stats_lock:
+                self._stats["writes"] += len(statements)
+                self._stats["batches"] += 1
+            for op in batch:
+                if isinstance(op, threading.Event):
+                    op.set()
+
+    def _write_each(self, conn: sqlite3.Connection, statements: list):
+        """Commit statements in separate transactions, so one bad write does not take the batch with it"""
+        for sql, params in statements:
+            try:
+                with conn:
+                    conn.execute(sql, params)
+            except sqlite3.Error as e:
+                print(f"⚠️  Conversation store write dropped ({' '.join(sql.split()[:3])} ...): {e}")
+                with self._stats_lock:
+                    self._stats["errors"] += 1
+
+    # === Reads ===
+
+    def query(self, sql: str, params: tuple = ()) -> list[dict]:
+        return [dict(row) for row in self._reader().execute(sql, params).fetchall()]
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({
+            "path": self.path,
+            "queued": self._queue.qsize(),
+            "avg_batch": stats["writes"] / stats["batches"] if stats["batches"] else 0.0,
+            "size_bytes": sum(os.path.getsize(self.path + suffix) for suffix in ("", "-wal")
+                              if os.path.exists(self.path + suffix))
+        })
+        return stats
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def _get_store() -> ConversationStore:
+    # Opened on first use, so importing the API does not touch the database
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ConversationStore()
+    return _store
+
+
+def save_session(session: dict):
+    """Insert or update a session's corpus binding and conversation state."""
+    values = tuple(session.get(c) for c in SESSION_COLUMNS)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in SESSION_COLUMNS[2:])
+    _get_store().write(
+        f"INSERT INTO sessions ({', '.join(SESSION_COLUMNS)}, updated_at) "
+        f"VALUES ({', '.join('?' * len(SESSION_COLUMNS))}, datetime('now')) "
+        f"ON CONFLICT(session_id) DO UPDATE SET {updates}, updated_at = excluded.updated_at",
+        values
+    )
+
+
+def add_exchange(session: dict, exchange: dict):
+    """Append one question/answer exchange of the session's current conversation."""
+    _get_store().write(
+        "INSERT INTO exchanges (conversation_id, session_id, user, assistant, timestamp) VALUES (?, ?, ?, ?, ?)",
+        (session["conversation_id"], session["session_id"], exchange["user"], exchange["assistant"],
+         exchange["timestamp"])
+    )
+
+
+def archive_conversation(record: dict):
+    """Store (or update) the archive record of a finalized conversation."""
+    values = tuple(record.get(c) for c in ARCHIVE_COLUMNS)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in ARCHIVE_COLUMNS[1:])
+    _get_store().write(
+        f"INSERT INTO conversations ({', '.join(ARCHIVE_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(ARCHIVE_COLUMNS))}) "
+        f"ON CONFLICT(conversation_id) DO UPDATE SET {updates}",
+        values
+    )
+
+
+def set_summary(conversation_id: str, ai_summary: str):
+    """Fill in the AI summary of an archived conversation once it is generated."""
+    _get_store().write("UPDATE conversations SET ai_summary = ? WHERE conversation_id = ?",
+                       (ai_summary, conversation_id))
+
+
+def load_session(session_id: str) -> dict:
+    """
+    Load a stored session, with the newest exchanges of its conversation if it is active.
+    Exchanges up to "memory_covered_until" are flagged as folded into the rolling summary.
+
+    Returns:
+        dict: Stored session fields plus "conversation_history", or None if unknown
+    """
+    store = _get_store()
+    rows = store.query(f"SELECT {', '.join(SESSION_COLUMNS)} FROM sessions WHERE session_id = ?", (session_id,))
+    if not rows:
+        return None
+    session = rows[0]
+    history = []
+    if session["status"] == "active" and session["conversation_id"]:
+        history = store.query(
+            "SELECT user, assistant, timestamp FROM exchanges WHERE conversation_id = ? ORDER BY id DESC LIMIT ?",
+            (session["conversation_id"], RESUME_HISTORY)
+        )
+        history.reverse()
+        covered = session["memory_covered_until"]
+        for exchange in history:
+            if covered is not None and exchange["timestamp"] <= covered:
+                exchange["in_summary"] = True
+    session["conversation_history"] = history
+    return session
+
+
+def list_archive(session_id: str, limit: int = 20, before: int = None) -> dict:
+    """
+    One page of a session's finalized conversations, newest first.
+
+    Args:
+        session_id (str): Session whose conversations are listed
+        limit (int): Page size (capped at MAX_PAGE_SIZE)
+        before (int): Cursor from the previous page's "next_before"
+
+    Returns:
+        dict: "conversations", "next_before" (None on the last page) and "total_count"
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    clause, params = "WHERE session_id = ?", [session_id]
+    if before is not None:
+        clause += " AND id < ?"
+        params.append(before)
+
+    rows = _get_store().query(
+        f"SELECT id, {', '.join(ARCHIVE_COLUMNS)} FROM conversations {clause} ORDER BY id DESC LIMIT ?",
+        (*params, limit + 1)
+    )
+    page = rows[:limit]
+    return {
+        "conversations": page,
+        "next_before": page[-1]["id"] if len(rows) > limit else None,
+        "total_count": count_archived(session_id)
+    }
+
+
+def count_archived(session_id: str) -> int:
+    """Number of finalized conversations of a session."""
+    return _get_store().query("SELECT COUNT(*) AS n FROM conversations WHERE session_id = ?",
+                              (session_id,))[0]["n"]
+
+
+def owns_conversation(session_id: str, conversation_id: str) -> bool:
+    """Whether a conversation was started by a session (archived, or its current one)."""
+    rows = _get_store().query(
+        "SELECT 1 FROM conversations WHERE conversation_id = ? AND session_id = ? "
+        "UNION ALL SELECT 1 FROM sessions WHERE conversation_id = ? AND session_id = ? LIMIT 1",
+        (conversation_id, session_id, conversation_id, session_id)
+    )
+    return bool(rows)
+
+
+def list_exchanges(session_id: str, conversation_id: str, limit: int = 20, after: int = None) -> dict:
+    """
+    One page of a conversation's exchanges, oldest first. Only exchanges
+    recorded by `session_id` are returned, so other sessions' conversations read as empty.
+
+    Returns:
+        dict: "exchanges" and "next_after" (None on the last page)
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = _get_store().query(
+        "SELECT id, user, assistant, timestamp FROM exchanges "
+        "WHERE conversation_id = ? AND session_id = ? AND id > ? ORDER BY id LIMIT ?",
+        (conversation_id, session_id, after or 0, limit + 1)
+    )
+    page = rows[:limit]
+    return {"exchanges": page, "next_after": page[-1]["id"] if len(rows) > limit else None}
+
+
+def flush(timeout: float = None) -> bool:
+    """Wait until queued writes are committed (no-op if the store was never opened)."""
+    return _store.flush(timeout) if _store is not None else True
+
+
+def get_store_stats() -> dict:
+    """
+    Get conversation store statistics.
+
+    Returns:
+        dict: database path and size, queued writes, committed writes, batches and errors
+    """
+    return _get_store().stats()
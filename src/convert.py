@@ -1,15 +1,14 @@
 import re
-import fitz  # PyMuPDF
-from google import genai
-from .config import GEMINI_API_KEY, MODEL
+from . import llm
 
-# Initialize Gemini LLM client
-client = genai.Client(api_key=GEMINI_API_KEY)
 
-
-def pdf_to_txt(pdf_path: str, txt_path: str):
+def pdf_to_txt(pdf_path: str, txt_path: str, progress=None):
+    if progress:
+        progress("extract")
     raw_text = pdf_to_text(pdf_path)
     cleaned_text = clean_text(raw_text)
+    if progress:
+        progress("structure")
     person_name = extract_name(cleaned_text)
     if person_name == "Unknown Candidate":
         person_name = extract_name_llm(cleaned_text)
@@ -25,14 +24,11 @@ def extract_name_llm(text: str) -> str:
     If multiple names appear, choose the one clearly belonging to the candidate.
     Do not add extra text.
     """
-    response = client.models.generate_content(
-        model=MODEL,
-        contents=[prompt, text[:1200]]  # first part of CV contains the name
-    )
-    return response.text.strip()
+    return llm.generate([prompt, text[:1200]])  # first part of CV contains the name
 
 def pdf_to_text(pdf_path: str) -> str:
     """Extract raw text from PDF."""
+    import fitz  # PyMuPDF, imported on first use to keep app startup fast
     doc = fitz.open(pdf_path)
     raw_text = "\n".join(page.get_text("text") for page in doc)
     doc.close()
@@ -155,12 +151,9 @@ Raw CV Text:
 Please return a fully structured CV in markdown, following the system instructions.
 """
 
-    response = client.models.generate_content(
-        model=MODEL,
-        contents=[system_prompt, user_prompt]
-    )
+    structured_cv = llm.generate([system_prompt, user_prompt])
 
-    return response.text.strip() if response.text else "No structured CV generated."
+    return structured_cv if structured_cv else "No structured CV generated."
 
 
 # === Example Usage ===
@@ -1,10 +1,16 @@
 import os
 import json
 import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer
 from .chunking import chunk_resume_data
-from .config import RESUME_PATH, CHUNKS_PATH, INDEX_PATH, EMBEDDING_MODEL
+from .embedding_store import EmbeddingStore, chunk_hash
+from . import embedding_service
+from .chunk_store import write_chunk_store
+from .lexical import write_bm25_index
+from .artifacts import (
+    new_version_id, create_staging_dir, publish_version, INDEX_FILE, CHUNK_STORE_FILE, EMBEDDINGS_FILE,
+    BM25_FILE
+)
+from .config import RESUME_PATH, INDEX_ROOT, EMBEDDING_MODEL
 
 # File Load / Save Functions
 def save_chunks_to_file(chunks, chunks_file_path):
@@ -14,63 +20,130 @@ def save_chunks_to_file(chunks, chunks_file_path):
     print(f"Saved {len(chunks)} chunks to {chunks_file_path}")
 
 # Embedding & FAISS Index
-def create_and_save_embeddings(chunks, index_path, chunks_path, model_name=EMBEDDING_MODEL, batch_size=32):
+def create_and_save_embeddings(chunks, index_root=INDEX_ROOT, model_name=EMBEDDING_MODEL, batch_size=32,
+                               progress=None):
+    """
+    Embed chunks and publish the FAISS index, chunks and embeddings as a new version.
+    The index family (exact, HNSW or IVF) is chosen by corpus size, see index_factory.
+    Everything is written to a staging directory first and published with an
+    atomic pointer swap, so readers keep using the previous version until then.
+
+    Only chunks whose content hash is not yet in the embedding store for
+    `model_name` are encoded; the others reuse their stored vectors.
+
+    `progress`, if given, is called with the stage name ("embed", then "index").
+
+    Returns:
+        str: The published version id, or None if there was nothing to embed
+    """
     if not chunks:
         print("No chunks provided to embed. Exiting.")
-        return
-
-    print(f"Loading embedding model: {model_name}...")
-    model = SentenceTransformer(model_name)
-    print("Model loaded.")
-
-    print(f"Generating embeddings for {len(chunks)} chunks...")
-    embeddings = model.encode(chunks, batch_size=batch_size, show_progress_bar=True)
-    embeddings = np.array(embeddings).astype('float32')
-
-    # Normalize embeddings for cosine similarity
-    faiss.normalize_L2(embeddings)
-    print("Embeddings normalized for cosine similarity.")
+        return None
+
+    # Heavy build-time dependencies, imported here so importing this module stays cheap
+    import faiss
+    from .index_factory import build_index
+
+    if progress:
+        progress("embed")
+    hashes = [chunk_hash(c) for c in chunks]
+    store = EmbeddingStore(model_name)
+    vectors = store.get_many(hashes)
+
+    # Encode each new or changed chunk once, even if it appears several times
+    missing = list(dict.fromkeys(h for h in hashes if h not in vectors))
+    texts = {h: c for h, c in zip(hashes, chunks)}
+
+    # Use the shared embedding service when one is configured (vectors come back normalized)
+    encoded = embedding_service.try_encode([texts[h] for h in missing], model_name) if missing else None
+    if encoded is not None:
+        print(f"Encoded {len(missing)} new or changed chunks with the embedding service.")
+    elif missing:
+        print(f"Loading embedding model: {model_name}...")
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(model_name)
+        print("Model loaded.")
+
+        print(f"Generating embeddings for {len(missing)} new or changed chunks...")
+        encoded = model.encode([texts[h] for h in missing], batch_size=batch_size, show_progress_bar=True)
+        encoded = np.array(encoded).astype('float32')
+
+        # Normalize embeddings for cosine similarity
+        faiss.normalize_L2(encoded)
+        print("Embeddings normalized for cosine similarity.")
+
+    if missing:
+        store.add(missing, encoded)
+        vectors.update(zip(missing, encoded))
+
+    missing_set = set(missing)
+    reused = sum(1 for h in hashes if h not in missing_set)
+    encoded_count = len(hashes) - reused
+    print(f"Embedding report: {reused} chunks reused from the store, {encoded_count} encoded.")
+    embeddings = np.vstack([vectors[h] for h in hashes]).astype('float32')
 
     dimension = embeddings.shape[1]
     print(f"Embedding dimension: {dimension}")
 
+    if progress:
+        progress("index")
     print("Creating FAISS index...")
-    index = faiss.IndexFlatIP(dimension)  # IP = inner product for cosine similarity on normalized vectors
-    index.add(embeddings)
-    print(f"FAISS index created with {index.ntotal} vectors.")
+    index, index_info = build_index(embeddings)
+    print(f"FAISS {index_info['index_type']} index created with {index.ntotal} vectors.")
 
-    # Save FAISS index
-    os.makedirs(os.path.dirname(index_path), exist_ok=True)
-    faiss.write_index(index, index_path)
-    print(f"FAISS index saved to {index_path}")
-
-    # Save chunks
-    save_chunks_to_file(chunks, chunks_path)
+    version_id = new_version_id()
+    staging = create_staging_dir(version_id, index_root)
 
-    # Save embeddings as .npy for future use
-    embeddings_file = os.path.splitext(chunks_path)[0] + "_embeddings.npy"
-    np.save(embeddings_file, embeddings)
-    print(f"Embeddings saved to {embeddings_file}")
+    # Save FAISS index
+    faiss.write_index(index, os.path.join(staging, INDEX_FILE))
+
+    # Save chunks as a memory-mappable store
+    write_chunk_store(chunks, os.path.join(staging, CHUNK_STORE_FILE))
+
+    # Save embeddings as .npy; retrieval memory-maps them
+    np.save(os.path.join(staging, EMBEDDINGS_FILE), embeddings)
+
+    # Save the BM25 inverted index used by hybrid retrieval
+    write_bm25_index(chunks, os.path.join(staging, BM25_FILE))
+
+    publish_version(staging, version_id, {
+        "model_name": model_name,
+        "dimension": dimension,
+        "chunk_count": len(chunks),
+        "index_type": index_info["index_type"],
+        "index_params": index_info["index_params"],
+        "index_recall": index_info["recall"],
+        "quantization": index_info["quantization"],
+        "bytes_per_vector": index_info["bytes_per_vector"],
+        "recall_without_rerank": index_info.get("recall_without_rerank"),
+        "lexical_index": "bm25",
+        "chunks_reused": reused,
+        "chunks_encoded": encoded_count
+    }, root=index_root)
+    print(f"FAISS index, chunks, embeddings and BM25 index saved as version {version_id}")
 
     print("Embedding generation and saving complete!")
+    return version_id
 
 # Use Example
-def main():
-    if not os.path.exists(RESUME_PATH):
-        print(f"Error: Raw resume file not found at {RESUME_PATH}.")
-        return
+def main(resume_path=RESUME_PATH, progress=None):
+    if not os.path.exists(resume_path):
+        print(f"Error: Raw resume file not found at {resume_path}.")
+        return None
 
-    print(f"Loading raw resume text from {RESUME_PATH}...")
-    with open(RESUME_PATH, 'r', encoding='utf-8') as f:
+    print(f"Loading raw resume text from {resume_path}...")
+    with open(resume_path, 'r', encoding='utf-8') as f:
         raw_resume_text = f.read()
     print("Raw resume text loaded.")
 
+    if progress:
+        progress("chunk")
     print("Generating chunks using chunk_resume_data()...")
     chunks = chunk_resume_data(raw_resume_text)
     print(f"Chunking complete. Generated {len(chunks)} chunks.")
 
-    print("Creating embeddings and saving FAISS index...")
-    create_and_save_embeddings(chunks, INDEX_PATH, CHUNKS_PATH)
+    print("Creating embeddings and publishing a new index version...")
+    return create_and_save_embeddings(chunks, progress=progress)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,300 @@
+import os
+import sys
+import json
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+import numpy as np
+from .config import (
+    EMBEDDING_MODEL, EMBEDDING_SERVICE_SOCKET, EMBEDDING_SERVICE_MAX_BATCH, EMBEDDING_SERVICE_MAX_WAIT_MS,
+    EMBEDDING_SERVICE_TIMEOUT, EMBEDDING_SERVICE_RETRY_S
+)
+
+# Embedding service: one process owns the SentenceTransformer and serves
+# encode requests from every API worker over a Unix socket. Requests that
+# arrive together are encoded as one batch.
+#
+#   python -m src.embedding_service [socket_path]
+#
+# Wire format, both directions: !II (header length, payload length), a JSON
+# header, then the payload. Requests carry no payload; encode responses
+# carry the float32 matrix (row-major, shape in the header).
+
+FRAME = struct.Struct("!II")
+
+# UnixStreamServer does not exist on Windows; there the client simply stays disabled
+_UnixStreamServer = getattr(socketserver, "UnixStreamServer", socketserver.TCPServer)
+
+
+class EmbeddingServiceError(Exception):
+    """Raised when the embedding service cannot be reached or fails a request."""
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        block = sock.recv(size - len(data))
+        if not block:
+            raise ConnectionError("embedding service connection closed")
+        data.extend(block)
+    return bytes(data)
+
+
+def _send(sock: socket.socket, header: dict, payload: bytes = b""):
+    encoded = json.dumps(header).encode("utf-8")
+    sock.sendall(FRAME.pack(len(encoded), len(payload)) + encoded + payload)
+
+
+def _recv(sock: socket.socket) -> tuple:
+    header_size, payload_size = FRAME.unpack(_recv_exact(sock, FRAME.size))
+    header = json.loads(_recv_exact(sock, header_size))
+    return header, _recv_exact(sock, payload_size)
+
+
+# === Server ===
+
+class _Request:
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.vectors = None
+        self.error = None
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, _UnixStreamServer):
+    """
+    Unix socket server around one embedding model.
+
+    Connection threads enqueue requests; a single batcher thread waits up to
+    `max_wait_ms` after the first request for more (up to `max_batch` texts)
+    and encodes them all in one model call.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, model_name: str = EMBEDDING_MODEL,
+                 max_batch: int = EMBEDDING_SERVICE_MAX_BATCH, max_wait_ms: float = EMBEDDING_SERVICE_MAX_WAIT_MS):
+        from sentence_transformers import SentenceTransformer
+
+        print(f"📦 Loading embedding model '{model_name}'...")
+        self.model = SentenceTransformer(model_name)
+        self.model_name = model_name
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._stats = {"requests": 0, "texts": 0, "batches": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # stale socket from a previous run
+        super().__init__(socket_path, _Handler)
+        threading.Thread(target=self._batch_loop, name="embed-batcher", daemon=True).start()
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """Queue texts for the next batch and wait for their vectors"""
+        request = _Request(texts)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error:
+            raise EmbeddingServiceError(request.error)
+        return request.vectors
+
+    def _next_batch(self) -> list:
+        pending = [self._queue.get()]
+        count = len(pending[0].texts)
+        deadline = time.monotonic() + self.max_wait
+        while count < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(request)
+            count += len(request.texts)
+        return pending
+
+    def _batch_loop(self):
+        while True:
+            pending = self._next_batch()
+            texts = [t for r in pending for t in r.texts]
+            try:
+                vectors = np.array(self.model.encode(texts)).astype('float32')
+                vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+                offset = 0
+                for r in pending:
+                    r.vectors = vectors[offset:offset + len(r.texts)]
+                    offset += len(r.texts)
+            except Exception as e:
+                for r in pending:
+                    r.error = str(e)
+                with self._stats_lock:
+                    self._stats["errors"] += 1
+            with self._stats_lock:
+                self._stats["requests"] += len(pending)
+                self._stats["texts"] += len(texts)
+                self._stats["batches"] += 1
+            for r in pending:
+                r.done.set()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["avg_batch_texts"] = stats["texts"] / stats["batches"] if stats["batches"] else 0.0
+        stats.update({"model_name": self.model_name, "max_batch": self.max_batch,
+                      "max_wait_ms": self.max_wait * 1000})
+        return stats
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                header, _ = _recv(self.request)
+            except ConnectionError:
+                return
+            op = header.get("op")
+            if op == "encode":
+                if header.get("model") not in (None, self.server.model_name):
+                    _send(self.request, {"error": f"service runs '{self.server.model_name}'"})
+                    continue
+                try:
+                    vectors = self.server.encode(header["texts"])
+                except EmbeddingServiceError as e:
+                    _send(self.request, {"error": str(e)})
+                    continue
+                _send(self.request, {"shape": list(vectors.shape), "model": self.server.model_name},
+                      vectors.tobytes())
+            elif op == "stats":
+                _send(self.request, self.server.stats())
+            else:
+                _send(self.request, {"error": f"unknown op '{op}'"})
+
+
+# === Client ===
+
+class EmbeddingClient:
+    """
+    Client for EmbeddingServer. One connection per thread, reopened after errors.
+    Texts are sent at most `max_batch` per request, so a large ingestion neither
+    builds one huge frame nor holds a request open past the socket timeout.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = EMBEDDING_SERVICE_TIMEOUT,
+                 max_batch: int = EMBEDDING_SERVICE_MAX_BATCH):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.max_batch = max(1, max_batch)
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _call(self, header: dict) -> tuple:
+        try:
+            sock = self._connection()
+            _send(sock, header)
+            response, payload = _recv(sock)
+        except (OSError, ValueError) as e:
+            self._close()
+            raise EmbeddingServiceError(f"embedding service unavailable: {e}") from e
+        if "error" in response:
+            raise EmbeddingServiceError(response["error"])
+        return response, payload
+
+    def encode(self, texts: list[str], model_name: str = EMBEDDING_MODEL) -> np.ndarray:
+        """Normalized float32 embeddings of shape (len(texts), dim)"""
+        texts = list(texts)
+        parts = []
+        for start in range(0, max(len(texts), 1), self.max_batch):
+            response, payload = self._call(
+                {"op": "encode", "texts": texts[start:start + self.max_batch], "model": model_name}
+            )
+            parts.append(np.frombuffer(payload, dtype=np.float32).reshape(response["shape"]))
+        return np.vstack(parts) if len(parts) > 1 else parts[0].copy()
+
+    def stats(self) -> dict:
+        return self._call({"op": "stats"})[0]
+
+
+_client = None
+_down_until = 0.0
+_client_stats = {"remote_calls": 0, "fallbacks": 0}
+_client_lock = threading.Lock()
+
+
+def try_encode(texts: list[str], model_name: str = EMBEDDING_MODEL):
+    """
+    Encode through the embedding service if one is configured and reachable.
+
+    After a failure the service is skipped for EMBEDDING_SERVICE_RETRY_S seconds,
+    so callers fall back to in-process encoding without paying a timeout each time.
+
+    Returns:
+        np.ndarray: Normalized float32 embeddings, or None if the caller must encode itself
+    """
+    global _client, _down_until
+    if not EMBEDDING_SERVICE_SOCKET or not hasattr(socket, "AF_UNIX") or time.monotonic() < _down_until:
+        return None
+    with _client_lock:
+        if _client is None:
+            _client = EmbeddingClient(EMBEDDING_SERVICE_SOCKET)
+    try:
+        vectors = _client.encode(texts, model_name)
+        with _client_lock:
+            _client_stats["remote_calls"] += 1
+        return vectors
+    except EmbeddingServiceError as e:
+        with _client_lock:
+            _down_until = time.monotonic() + EMBEDDING_SERVICE_RETRY_S
+            _client_stats["fallbacks"] += 1
+        print(f"⚠️ {e}; encoding in-process for the next {EMBEDDING_SERVICE_RETRY_S:.0f}s")
+        return None
+
+
+def is_configured() -> bool:
+    return bool(EMBEDDING_SERVICE_SOCKET) and hasattr(socket, "AF_UNIX")
+
+
+def get_client_stats() -> dict:
+    """
+    Get client-side counters.
+
+    Returns:
+        dict: socket path, whether the service is currently used, remote calls and fallbacks
+    """
+    return {
+        "socket": EMBEDDING_SERVICE_SOCKET or None,
+        "active": is_configured() and time.monotonic() >= _down_until,
+        **_client_stats
+    }
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else EMBEDDING_SERVICE_SOCKET
+    if not path:
+        sys.exit("Usage: python -m src.embedding_service <socket_path> (or set EMBEDDING_SERVICE_SOCKET)")
+    server = EmbeddingServer(path)
+    print(f"✅ Embedding service listening on {path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,142 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from contextlib import contextmanager
+import numpy as np
+from .config import EMBEDDING_STORE_DIR
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; only threads of this process are serialized there
+    fcntl = None
+
+# Layout under EMBEDDING_STORE_DIR/<model slug>/:
+#   meta.json     -> model name and vector dimension
+#   vectors.f32   -> append-only float32 rows, one per stored chunk
+#   keys.txt      -> append-only chunk hashes, line i describes row i
+# Rows are written before their keys, so a crash can only leave unkeyed rows behind.
+# Threads of a process share a lock per directory; processes coordinate through
+# an flock on LOCK_FILE (shared for reads, exclusive for writes).
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.f32"
+KEYS_FILE = "keys.txt"
+LOCK_FILE = ".lock"         # flock()ed so processes sharing the directory do not interleave
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def chunk_hash(chunk: str) -> str:
+    """Content hash identifying a chunk independently of its position"""
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+
+def _store_lock(path: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(path, threading.Lock())
+
+
+class EmbeddingStore:
+    """
+    Persistent embeddings keyed by (model name, chunk hash).
+    Vectors are stored normalized, exactly as they go into the index.
+    """
+
+    def __init__(self, model_name: str, root: str = EMBEDDING_STORE_DIR):
+        self.model_name = model_name
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.path = os.path.join(root, slug)
+        self._lock = _store_lock(self.path)
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        """Hold the in-process lock and the cross-process file lock"""
+        with self._lock:
+            if fcntl is None or (not exclusive and not os.path.isdir(self.path)):
+                yield
+                return
+            os.makedirs(self.path, exist_ok=True)
+            with open(os.path.join(self.path, LOCK_FILE), "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _dimension(self):
+        try:
+            with open(os.path.join(self.path, META_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)["dimension"]
+        except FileNotFoundError:
+            return None
+
+    def _read_keys(self) -> list[str]:
+        try:
+            with open(os.path.join(self.path, KEYS_FILE), "r", encoding="utf-8") as f:
+                return f.read().split()
+        except FileNotFoundError:
+            return []
+
+    def _load(self) -> tuple:
+        """Return ({chunk hash: vector}, dimension) for everything stored"""
+        dimension = self._dimension()
+        vectors_path = os.path.join(self.path, VECTORS_FILE)
+        if dimension is None or not os.path.exists(vectors_path):
+            return {}, dimension
+
+        vectors = np.fromfile(vectors_path, dtype=np.float32)
+        vectors = vectors[: (len(vectors) // dimension) * dimension].reshape(-1, dimension)
+        keys = self._read_keys()
+
+        rows = min(len(keys), len(vectors))
+        return {key: vectors[i] for i, key in enumerate(keys[:rows])}, dimension
+
+    def get_many(self, hashes: list[str]) -> dict:
+        """
+        Look up stored vectors.
+
+        Returns:
+            dict: chunk hash -> vector, for the hashes that are stored
+        """
+        with self._locked(exclusive=False):
+            stored, _ = self._load()
+        return {h: stored[h] for h in hashes if h in stored}
+
+    def add(self, hashes: list[str], vectors: np.ndarray):
+        """Append vectors for new chunk hashes"""
+        if not hashes:
+            return
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+        with self._locked(exclusive=True):
+            dimension = self._dimension()
+            if dimension is None:
+                with open(os.path.join(self.path, META_FILE), "w", encoding="utf-8") as f:
+                    json.dump({"model_name": self.model_name, "dimension": vectors.shape[1]}, f)
+            elif dimension != vectors.shape[1]:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match store ({dimension})")
+
+            vectors_path = os.path.join(self.path, VECTORS_FILE)
+            keys_path = os.path.join(self.path, KEYS_FILE)
+
+            # Drop rows without a key left by an interrupted write, so rows and keys stay aligned
+            if os.path.exists(vectors_path):
+                row_bytes = vectors.shape[1] * 4
+                key_count = len(self._read_keys())
+                if os.path.getsize(vectors_path) > key_count * row_bytes:
+                    with open(vectors_path, "r+b") as f:
+                        f.truncate(key_count * row_bytes)
+
+            with open(vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(keys_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{h}\n" for h in hashes))
+
+    def stats(self) -> dict:
+        with self._locked(exclusive=False):
+            stored, dimension = self._load()
+        return {"model_name": self.model_name, "vectors": len(stored), "dimension": dimension}
@@ -1,5 +1,6 @@
-from .retrieval import retrieve
-from .chat import query_portfolio
+from .retrieval import retrieve_many
+from .chat import query_portfolio, start_new_conversation
+from .sessions import new_session
 
 # Define your test queries and expected results
 TEST_QUERIES = [
@@ -29,19 +30,29 @@ TEST_QUERIES = [
     }
 ]
 TOP_K=10
+
+
+def _evaluation_session() -> dict:
+    """Fresh session on the default corpus, so test queries do not share history"""
+    session = new_session()
+    start_new_conversation(session, "evaluation")
+    return session
+
+
 def evaluate_queries(queries):
     results = []
 
-    for test in queries:
+    # Retrieval for all queries in one batch
+    batch_retrieved = retrieve_many([test["query"] for test in queries], k=TOP_K)
+
+    for test, retrieved_chunks in zip(queries, batch_retrieved):
         query = test["query"]
         print(f"\n=== Evaluating Query: {query} ===\n")
         
-        # Retrieval
-        retrieved_chunks = retrieve(query, k=TOP_K)
         print(f"Retrieved {len(retrieved_chunks)} chunks.\n")
         
         # Generation
-        generated_answer = query_portfolio(query)
+        generated_answer = query_portfolio(query, _evaluation_session())
         print("Generated Answer Preview:\n", generated_answer[:400], "...\n")
         
         # Base eval result
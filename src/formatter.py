@@ -223,4 +223,123 @@ def create_professional_summary(raw_response: str) -> str:
     # Clean up extra newlines
     result = re.sub(r'\n{3,}', '\n\n', result)
     
-    return result.strip()
\ No newline at end of file
+    return result.strip()
+
+class StreamingFormatter:
+    """
+    Incremental version of create_professional_summary() for streamed answers.
+
+    feed() takes raw text pieces as they arrive and returns the newly
+    formatted text that can already be sent; finish() flushes the rest.
+    Concatenating every returned piece gives the same text as
+    create_professional_summary() on the full answer.
+
+    A line is emitted while still incomplete once it has more words than a
+    section header can have (a short line ending in ':' is a header, even if
+    it starts like a bullet); shorter lines wait for their end. Whitespace at
+    the edges of the output is held back, as the final strip() would drop it.
+    """
+
+    def __init__(self):
+        self._line = ""        # current (incomplete) line, with '**' removed
+        self._kind = None      # None (undecided), 'bullet' or 'text'
+        self._sent = 0         # characters of the current line's content already emitted
+        self._carry = ""       # trailing '*' that may be half of a '**'
+        self._in_para = False  # a regular-text paragraph is open
+        self._started = False  # an entry has been produced yet
+        self._emitted = False  # non-whitespace output has been returned yet
+        self._pending = ""     # trailing whitespace held back until more text follows
+
+    def feed(self, text: str) -> str:
+        text = self._carry + text
+        stripped = text.rstrip('*')
+        self._carry = text[len(stripped):]
+        text = stripped.replace('**', '')
+
+        output = []
+        lines = text.split('\n')
+        for complete in lines[:-1]:
+            self._line += complete
+            output.append(self._end_line())
+        self._line += lines[-1]
+        output.append(self._progress())
+        return self._release(''.join(output))
+
+    def finish(self) -> str:
+        self._line += self._carry.replace('**', '')
+        self._carry = ""
+        output = self._release(self._end_line())
+        self._pending = ""
+        return output
+
+    def _release(self, text: str) -> str:
+        """Drop leading whitespace of the answer and hold back trailing whitespace"""
+        if not self._emitted:
+            text = text.lstrip()
+            if not text:
+                return ''
+            self._emitted = True
+        body = text.rstrip()
+        if not body:
+            self._pending += text
+            return ''
+        output = self._pending + body
+        self._pending = text[len(body):]
+        return output
+
+    def _open(self, kind: str) -> str:
+        """Separator to emit before a new output entry"""
+        if kind == 'text' and self._in_para:
+            prefix = ' '
+        else:
+            prefix = '\n' if self._started else ''
+        self._started = True
+        self._in_para = kind == 'text'
+        return prefix
+
+    def _content(self, stripped: str) -> str:
+        if self._kind == 'bullet':
+            return re.sub(r'^[\*•]\s*', '', stripped)
+        return stripped
+
+    def _emit(self, content: str) -> str:
+        head = ''
+        if self._sent == 0:
+            head = self._open(self._kind) + ('  • ' if self._kind == 'bullet' else '')
+        delta = content[self._sent:]
+        self._sent = len(content)
+        return head + delta
+
+    def _progress(self) -> str:
+        stripped = self._line.strip()
+        if self._kind is None:
+            # Words are only ever added to a line, so more than 3 rules out a header
+            if len(stripped.split()) <= 3:
+                return ''
+            self._kind = 'bullet' if stripped.startswith('*') or stripped.startswith('•') else 'text'
+        return self._emit(self._content(stripped))
+
+    def _end_line(self) -> str:
+        stripped = self._line.strip()
+        self._line = ""
+        try:
+            if not stripped:
+                self._in_para = False
+                return ''
+
+            if self._kind is None:
+                if stripped.endswith(':') and len(stripped.split()) <= 3:
+                    prefix = self._open('header') + '\n'
+                    return prefix + stripped
+                if stripped.startswith('*') or stripped.startswith('•'):
+                    self._kind = 'bullet'
+                else:
+                    self._kind = 'text'
+
+            output = self._emit(self._content(stripped))
+            if self._kind == 'bullet':
+                self._in_para = False
+            return output
+        finally:
+            self._kind = None
+            self._sent = 0
@@ -0,0 +1,72 @@
+import os
+import re
+import subprocess
+import sys
+
+# Dev command: per-module import cost of the API, from Python's -X importtime.
+#
+#   python -m src.importtime                 # profile `import src.main`
+#   python -m src.importtime src.retrieval 15
+
+LINE_PATTERN = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_imports(module: str = "src.main") -> dict:
+    """
+    Import `module` in a fresh interpreter and collect per-module import times.
+
+    Returns:
+        dict: "modules" (name, self_us, cumulative_us, depth; in import order),
+              "total_us" (sum over top-level imports), "returncode" and "error"
+              (stderr tail if the import failed)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=REPO_ROOT
+    )
+    modules = []
+    other_lines = []
+    for line in result.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                "name": name,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(indent) - 1) // 2
+            })
+        else:
+            other_lines.append(line)
+
+    return {
+        "module": module,
+        "modules": modules,
+        "total_us": sum(m["cumulative_us"] for m in modules if m["depth"] == 0),
+        "returncode": result.returncode,
+        "error": "\n".join(other_lines[-5:]) if result.returncode else None
+    }
+
+
+def print_report(profile: dict, top: int = 20):
+    print(f"Import of {profile['module']}: {profile['total_us'] / 1000:.1f} ms total")
+    if profile["error"]:
+        print(f"⚠️  Import failed (exit {profile['returncode']}):\n{profile['error']}")
+
+    top_level = sorted((m for m in profile["modules"] if m["depth"] == 0),
+                       key=lambda m: m["cumulative_us"], reverse=True)
+    print(f"\nTop {top} top-level imports by cumulative time:")
+    for m in top_level[:top]:
+        print(f"  {m['cumulative_us'] / 1000:>9.1f} ms  {m['name']}")
+
+    by_self = sorted(profile["modules"], key=lambda m: m["self_us"], reverse=True)
+    print(f"\nTop {top} modules by own time:")
+    for m in by_self[:top]:
+        print(f"  {m['self_us'] / 1000:>9.1f} ms  {m['name']}")
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else "src.main"
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    print_report(profile_imports(target), count)
@@ -0,0 +1,200 @@
+import math
+import numpy as np
+import faiss
+from .config import (
+    ANN_INDEX_TYPE, ANN_FLAT_MAX, ANN_HNSW_MAX, ANN_TARGET_RECALL, HNSW_M, HNSW_EF_CONSTRUCTION, TOP_K,
+    INDEX_QUANTIZATION, PQ_M
+)
+from .vector_backend import FaissBackend, RerankBackend
+
+# Search-time parameters tried in order until the target recall is reached
+NPROBE_CANDIDATES = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+EF_SEARCH_CANDIDATES = [16, 32, 64, 128, 256, 512, 1024]
+RECALL_SAMPLE_SIZE = 200
+PQ_NBITS = 8
+PQ_MIN_TRAINING = 2 ** PQ_NBITS  # one training point per centroid at the very least
+
+
+def select_index_type(vector_count: int, requested: str = ANN_INDEX_TYPE) -> str:
+    """
+    Pick the index family for a corpus size.
+
+    Exact flat search up to ANN_FLAT_MAX vectors, HNSW up to ANN_HNSW_MAX,
+    IVF beyond (cheaper to hold and to build at that scale).
+    `requested` other than 'auto' forces a family.
+    """
+    if requested != "auto":
+        return requested
+    if vector_count <= ANN_FLAT_MAX:
+        return "flat"
+    if vector_count <= ANN_HNSW_MAX:
+        return "hnsw"
+    return "ivf"
+
+
+def apply_search_params(index, params: dict):
+    """Set the search-time knobs recorded in a manifest on a loaded index"""
+    if "nprobe" in params:
+        faiss.extract_index_ivf(index).nprobe = params["nprobe"]
+    if "efSearch" in params:
+        index.hnsw.efSearch = params["efSearch"]
+
+
+def _pq_subquantizers(dimension: int, requested: int = PQ_M) -> int:
+    """Largest sub-quantizer count <= requested that divides the dimension"""
+    return next(m for m in range(min(requested, dimension), 0, -1) if dimension % m == 0)
+
+
+def _make_index(index_type: str, quantization: str, dimension: int, vector_count: int):
+    """Empty (possibly untrained) faiss index and its build parameters"""
+    metric = faiss.METRIC_INNER_PRODUCT  # inner product = cosine similarity on normalized vectors
+    sq_8bit = faiss.ScalarQuantizer.QT_8bit
+
+    if index_type == "flat":
+        if quantization == "int8":
+            return faiss.IndexScalarQuantizer(dimension, sq_8bit, metric), {}
+        if quantization == "pq":
+            m = _pq_subquantizers(dimension)
+            return faiss.IndexPQ(dimension, m, PQ_NBITS, metric), {"pq_m": m}
+        return faiss.IndexFlatIP(dimension), {}
+
+    if index_type == "hnsw":
+        params = {"M": HNSW_M, "efConstruction": HNSW_EF_CONSTRUCTION}
+        if quantization == "int8":
+            index = faiss.IndexHNSWSQ(dimension, sq_8bit, HNSW_M, metric)
+        else:
+            index = faiss.IndexHNSWFlat(dimension, HNSW_M, metric)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        return index, params
+
+    if index_type == "ivf":
+        nlist = max(1, min(int(4 * math.sqrt(vector_count)), vector_count // 39))  # >= 39 training points per list
+        quantizer = faiss.IndexFlatIP(dimension)
+        if quantization == "int8":
+            index = faiss.IndexIVFScalarQuantizer(quantizer, dimension, nlist, sq_8bit, metric)
+            return index, {"nlist": nlist}
+        if quantization == "pq":
+            m = _pq_subquantizers(dimension)
+            return faiss.IndexIVFPQ(quantizer, dimension, nlist, m, PQ_NBITS, metric), {"nlist": nlist, "pq_m": m}
+        return faiss.IndexIVFFlat(quantizer, dimension, nlist, metric), {"nlist": nlist}
+
+    raise ValueError(f"Unknown index type '{index_type}'")
+
+
+def bytes_per_vector(dimension: int, quantization: str, params: dict) -> int:
+    """Size of one stored vector code (graph links and lists not included)"""
+    if quantization == "int8":
+        return dimension
+    if quantization == "pq":
+        return params["pq_m"] * PQ_NBITS // 8
+    return dimension * 4
+
+
+def _exact_neighbors(embeddings: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ embeddings.T
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def measure_recall(index, embeddings: np.ndarray, queries: np.ndarray, k: int = TOP_K,
+                   truth: np.ndarray = None) -> float:
+    """
+    recall@k of `index` against exact inner-product search.
+
+    Args:
+        index: faiss index holding `embeddings`
+        embeddings (np.ndarray): The indexed vectors, normalized float32
+        queries (np.ndarray): Query vectors, normalized float32
+        k (int): Cut-off
+        truth (np.ndarray): Precomputed exact neighbor ids, to avoid recomputing them
+
+    Returns:
+        float: Fraction of the exact top-k found in the index's top-k
+    """
+    k = min(k, len(embeddings))
+    if truth is None:
+        truth = _exact_neighbors(embeddings, queries, k)
+    _, found = index.search(queries, k)
+    hits = sum(len(set(t.tolist()) & set(f.tolist())) for t, f in zip(truth, found))
+    return hits / truth.size if truth.size else 1.0
+
+
+def _recall_queries(embeddings: np.ndarray) -> np.ndarray:
+    """Stored vectors with a little noise, as stand-ins for real queries"""
+    rng = np.random.default_rng(0)
+    sample = embeddings[rng.choice(len(embeddings), min(RECALL_SAMPLE_SIZE, len(embeddings)), replace=False)]
+    noisy = (sample + rng.normal(0, 0.05, sample.shape)).astype('float32')
+    faiss.normalize_L2(noisy)
+    return noisy
+
+
+def build_index(embeddings: np.ndarray, index_type: str = None, quantization: str = INDEX_QUANTIZATION,
+                target_recall: float = ANN_TARGET_RECALL):
+    """
+    Build the faiss index for a corpus and tune its search parameters.
+
+    For IVF and HNSW, nprobe / efSearch is raised until recall@TOP_K against
+    exact search reaches `target_recall` on a sample of the corpus. Quantized
+    indexes are tuned and measured with the exact float re-rank applied.
+
+    Args:
+        embeddings (np.ndarray): Normalized float32 vectors, shape (n, dim)
+        index_type (str): 'flat', 'hnsw' or 'ivf'; chosen by select_index_type() if None
+        quantization (str): 'none', 'int8' (scalar) or 'pq' (product quantization)
+        target_recall (float): Recall the tuning aims for
+
+    Returns:
+        tuple: (index, info) where info holds "index_type", "quantization", "index_params",
+               "bytes_per_vector", "recall" and, when quantized, "recall_without_rerank"
+    """
+    n, dimension = embeddings.shape
+    index_type = index_type or select_index_type(n)
+
+    if quantization == "pq" and (index_type == "hnsw" or n < PQ_MIN_TRAINING):
+        print(f"PQ needs a flat or IVF index and at least {PQ_MIN_TRAINING} vectors, using int8 instead.")
+        quantization = "int8"
+
+    index, params = _make_index(index_type, quantization, dimension, n)
+    if not index.is_trained:
+        index.train(embeddings)
+    index.add(embeddings)
+
+    quantized = quantization != "none"
+    searcher = RerankBackend(FaissBackend(index), embeddings) if quantized else index
+    info = {
+        "index_type": index_type,
+        "quantization": quantization,
+        "index_params": params,
+        "bytes_per_vector": bytes_per_vector(dimension, quantization, params),
+        "recall": 1.0
+    }
+    if index_type == "flat" and not quantized:
+        return index, info
+
+    queries = _recall_queries(embeddings)
+    truth = _exact_neighbors(embeddings, queries, min(TOP_K, n))
+    knob = {"hnsw": "efSearch", "ivf": "nprobe"}.get(index_type)
+    if knob is None:
+        candidates = [None]
+    elif knob == "efSearch":
+        candidates = EF_SEARCH_CANDIDATES
+    else:
+        candidates = [c for c in NPROBE_CANDIDATES if c < params["nlist"]] + [params["nlist"]]
+
+    for value in candidates:
+        if knob:
+            apply_search_params(index, {knob: value})
+        recall = measure_recall(searcher, embeddings, queries, truth=truth)
+        if recall >= target_recall:
+            break
+    if knob:
+        params[knob] = value
+        print(f"Tuned {index_type} index: {knob}={value} reaches recall@{TOP_K}={recall:.3f} "
+              f"(target {target_recall})")
+    info["recall"] = round(recall, 4)
+
+    if quantized:
+        info["recall_without_rerank"] = round(measure_recall(index, embeddings, queries, truth=truth), 4)
+        print(f"{quantization} codes: {info['bytes_per_vector']} bytes/vector "
+              f"(float32: {dimension * 4}), recall@{TOP_K} {info['recall_without_rerank']:.3f} raw, "
+              f"{info['recall']:.3f} after re-rank")
+    return index, info
@@ -0,0 +1,235 @@
+import os
+import re
+import json
+import shutil
+import threading
+import datetime
+import time
+from .artifacts import (
+    new_version_id, create_staging_dir, publish_version, version_dir, read_manifest, file_checksum, MANIFEST_NAME
+)
+from .config import INGEST_CACHE_DIR, INGEST_CACHE_MAX_MB, EMBEDDING_MODEL, RESUME_PATH
+
+# Layout under INGEST_CACHE_DIR:
+#   <file_hash>/resume.txt       -> structured CV text produced by pdf_to_txt
+#   <file_hash>/artifacts/       -> copy of the index version built from it
+#   <file_hash>/meta.json        -> file name, size and last-used time (for LRU eviction)
+RESUME_FILE = "resume.txt"
+ARTIFACTS_DIR = "artifacts"
+META_FILE = "meta.json"
+
+# Entries are keyed by the MD5 of the uploaded file; nothing else may become a path
+_HASH_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+
+def is_valid_hash(file_hash: str) -> bool:
+    """Check that a file hash is a lowercase hex MD5 digest"""
+    return isinstance(file_hash, str) and bool(_HASH_PATTERN.match(file_hash))
+
+
+def _entry_dir(file_hash: str) -> str:
+    if not is_valid_hash(file_hash):
+        raise ValueError(f"Invalid file hash: {file_hash!r}")
+    return os.path.join(INGEST_CACHE_DIR, file_hash)
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            total += os.path.getsize(os.path.join(dirpath, name))
+    return total
+
+
+def _read_meta(file_hash: str) -> dict:
+    try:
+        with open(os.path.join(_entry_dir(file_hash), META_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_meta(file_hash: str, meta: dict):
+    path = os.path.join(_entry_dir(file_hash), META_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def store(file_hash: str, file_name: str, version_id: str, resume_path: str = RESUME_PATH):
+    """
+    Cache the structured CV text and index version built for an uploaded file.
+
+    Args:
+        file_hash (str): Content hash of the uploaded file
+        file_name (str): Original file name (informational)
+        version_id (str): Published index version built from this file
+        resume_path (str): Structured CV text written by pdf_to_txt
+    """
+    if not version_id:
+        return
+
+    with _lock:
+        staging = os.path.join(INGEST_CACHE_DIR, f".staging-{file_hash}")
+        shutil.rmtree(staging, ignore_errors=True)
+        shutil.copytree(version_dir(version_id), os.path.join(staging, ARTIFACTS_DIR))
+        shutil.copy2(resume_path, os.path.join(staging, RESUME_FILE))
+
+        entry = _entry_dir(file_hash)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(staging, entry)
+
+        now = time.time()
+        _write_meta(file_hash, {
+            "file_hash": file_hash,
+            "file_name": file_name,
+            "model_name": read_manifest(version_id).get("model_name"),
+            "created_at": datetime.datetime.now().isoformat(),
+            "last_used": now,
+            "size_bytes": _dir_size(entry)
+        })
+        _stats["stores"] += 1
+        print(f"💾 Cached ingestion results for {file_name} ({file_hash[:8]})")
+
+        _evict_over_budget(keep=file_hash)
+
+
+def restore(file_hash: str, resume_path: str = RESUME_PATH) -> str:
+    """
+    Restore a previously ingested file without re-running PDF extraction,
+    LLM structuring or embedding.
+
+    Args:
+        file_hash (str): Content hash of the uploaded file
+        resume_path (str): Where to write the cached structured CV text
+
+    Returns:
+        str: Id of the index version published from the cache, or None on a miss
+    """
+    if not is_valid_hash(file_hash):
+        raise ValueError(f"Invalid file hash: {file_hash!r}")
+    with _lock:
+        meta = _read_meta(file_hash)
+        if meta is None:
+            _stats["misses"] += 1
+            return None
+
+        # Embeddings are only reusable with the model that produced them
+        if meta.get("model_name") != EMBEDDING_MODEL:
+            print(f"♻️  Cached ingestion for {file_hash[:8]} used another embedding model, dropping it")
+            shutil.rmtree(_entry_dir(file_hash), ignore_errors=True)
+            _stats["misses"] += 1
+            return None
+
+        entry = _entry_dir(file_hash)
+        artifacts = os.path.join(entry, ARTIFACTS_DIR)
+        with open(os.path.join(artifacts, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        version_id = new_version_id()
+        staging = create_staging_dir(version_id)
+        for name in manifest.get("files", {}):
+            shutil.copy2(os.path.join(artifacts, name), os.path.join(staging, name))
+
+        # Checksums are recomputed on publish, so a damaged copy must be caught here
+        damaged = [name for name, checksum in manifest.get("files", {}).items()
+                   if file_checksum(os.path.join(staging, name)) != checksum]
+        if damaged:
+            print(f"♻️  Cached ingestion for {file_hash[:8]} failed checksum verification "
+                  f"({', '.join(damaged)}), dropping it")
+            shutil.rmtree(staging, ignore_errors=True)
+            shutil.rmtree(entry, ignore_errors=True)
+            _stats["misses"] += 1
+            return None
+
+        tmp_resume = f"{resume_path}.tmp"
+        shutil.copy2(os.path.join(entry, RESUME_FILE), tmp_resume)
+        os.replace(tmp_resume, resume_path)
+
+        meta["last_used"] = time.time()
+        _write_meta(file_hash, meta)
+        _stats["hits"] += 1
+
+    restored_manifest = {k: v for k, v in manifest.items() if k not in ("version", "created_at", "files")}
+    restored_manifest["restored_from"] = manifest.get("version")
+    publish_version(staging, version_id, restored_manifest)
+    print(f"⚡ Restored {meta.get('file_name')} from ingestion cache (version {version_id})")
+    return version_id
+
+
+def _evict_over_budget(keep: str = None):
+    """Remove least-recently-used entries until the cache fits INGEST_CACHE_MAX_MB."""
+    budget = INGEST_CACHE_MAX_MB * 1024 * 1024
+    entries = list_entries()
+    total = sum(e["size_bytes"] for e in entries)
+    for entry in sorted(entries, key=lambda e: e["last_used"]):
+        if total <= budget:
+            break
+        if entry["file_hash"] == keep:
+            continue
+        shutil.rmtree(_entry_dir(entry["file_hash"]), ignore_errors=True)
+        total -= entry["size_bytes"]
+        _stats["evictions"] += 1
+        print(f"🧹 Evicted ingestion cache entry {entry['file_name']} ({entry['file_hash'][:8]})")
+
+
+def list_entries() -> list[dict]:
+    """
+    List cached ingestions.
+
+    Returns:
+        list[dict]: The metadata of every cache entry
+    """
+    if not os.path.isdir(INGEST_CACHE_DIR):
+        return []
+    entries = []
+    for name in os.listdir(INGEST_CACHE_DIR):
+        if not is_valid_hash(name):
+            continue
+        meta = _read_meta(name)
+        if meta is not None:
+            entries.append(meta)
+    return entries
+
+
+def purge(file_hash: str = None) -> int:
+    """
+    Delete one cache entry, or all of them when no hash is given.
+
+    Returns:
+        int: Number of entries removed
+
+    Raises:
+        ValueError: If file_hash is not an MD5 hex digest
+    """
+    if file_hash is not None and not is_valid_hash(file_hash):
+        raise ValueError(f"Invalid file hash: {file_hash!r}")
+    with _lock:
+        hashes = [file_hash] if file_hash else [e["file_hash"] for e in list_entries()]
+        removed = 0
+        for h in hashes:
+            if os.path.isdir(_entry_dir(h)):
+                shutil.rmtree(_entry_dir(h), ignore_errors=True)
+                removed += 1
+        print(f"🧹 Purged {removed} ingestion cache entries")
+        return removed
+
+
+def get_cache_stats() -> dict:
+    """
+    Get ingestion cache counters and occupancy.
+
+    Returns:
+        dict: hits, misses, stores, evictions, entry count, total and budget bytes
+    """
+    entries = list_entries()
+    return {
+        **_stats,
+        "entries": len(entries),
+        "total_bytes": sum(e["size_bytes"] for e in entries),
+        "budget_bytes": int(INGEST_CACHE_MAX_MB * 1024 * 1024)
+    }
@@ -0,0 +1,221 @@
+import os
+import queue
+import threading
+import datetime
+import traceback
+import uuid
+from collections import OrderedDict
+
+from .convert import pdf_to_txt
+from .embedding import main as embed_main
+from .retrieval import load_corpus
+from . import ingest_cache
+from .config import RESUME_PATH, INGEST_WORKERS, INGEST_QUEUE_SIZE, INGEST_JOB_HISTORY
+
+# Pipeline stages in execution order, used to report progress as a fraction
+STAGES = ["queued", "restore", "extract", "structure", "chunk", "embed", "index", "load", "done"]
+
+_jobs = OrderedDict()          # job_id -> job dict, oldest first
+_jobs_lock = threading.Lock()
+_queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+_workers = []
+_workers_lock = threading.Lock()
+
+
+class QueueFullError(Exception):
+    """Raised when the ingestion queue cannot accept another job."""
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat()
+
+
+def _set_stage(job: dict, stage: str):
+    with _jobs_lock:
+        job["stage"] = stage
+        job["progress"] = round(STAGES.index(stage) / (len(STAGES) - 1), 2)
+    print(f"⏳ Ingestion job {job['job_id']}: {stage}")
+
+
+def _run_job(job: dict):
+    """Run the whole ingestion pipeline for one uploaded CV."""
+    pdf_path = job["pdf_path"]
+    text_path = os.path.join(os.path.dirname(pdf_path), f".ingest-{job['job_id']}.txt")
+
+    def progress(stage: str):
+        _set_stage(job, stage)
+
+    try:
+        with _jobs_lock:
+            job["status"] = "running"
+            job["started_at"] = _now()
+
+        progress("restore")
+        version = ingest_cache.restore(job["file_hash"], text_path)
+        job["cache_hit"] = version is not None
+
+        if not version:
+            pdf_to_txt(pdf_path, text_path, progress=progress)
+            version = embed_main(text_path, progress=progress)
+            if not version:
+                raise RuntimeError("No chunks could be generated from the uploaded CV")
+            ingest_cache.store(job["file_hash"], job["file_name"], version, resume_path=text_path)
+
+        # Keep the "current resume" file in sync for tools that read it
+        os.replace(text_path, RESUME_PATH)
+
+        progress("load")
+        load_corpus(job["file_hash"], version, activate=False)
+
+        with _jobs_lock:
+            job["version"] = version
+            callbacks = list(job["on_complete"])
+
+        # The corpus is loaded: a failing callback is logged, the job still succeeded
+        for callback in callbacks:
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"⚠️  Completion callback of ingestion job {job['job_id']} failed: {e}")
+                traceback.print_exc()
+
+        progress("done")
+        with _jobs_lock:
+            job["status"] = "done"
+
+    except Exception as e:
+        print(f"❌ Ingestion job {job['job_id']} failed: {e}")
+        traceback.print_exc()
+        with _jobs_lock:
+            job["status"] = "failed"
+            job["error"] = str(e)
+
+    finally:
+        with _jobs_lock:
+            job["finished_at"] = _now()
+        for path in (pdf_path, text_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _worker_loop():
+    while True:
+        job = _queue.get()
+        try:
+            _run_job(job)
+        finally:
+            _queue.task_done()
+
+
+def _ensure_workers():
+    """Start the worker pool on first use."""
+    with _workers_lock:
+        while len(_workers) < INGEST_WORKERS:
+            worker = threading.Thread(target=_worker_loop, name=f"ingest-worker-{len(_workers)}", daemon=True)
+            worker.start()
+            _workers.append(worker)
+
+
+def submit_job(pdf_path: str, file_name: str, file_hash: str, on_complete=None) -> dict:
+    """
+    Queue an uploaded CV for background ingestion.
+    A job already queued or running for the same file hash is returned instead.
+
+    Args:
+        pdf_path (str): Uploaded PDF; removed once the job finishes
+        file_name (str): Original file name
+        file_hash (str): Content hash of the file, used as corpus id
+        on_complete (callable): Called with the job dict, from the worker thread,
+                                once the new corpus is resident. Callers that join
+                                an existing job for the same file are all called
+
+    Returns:
+        dict: Public view of the job
+
+    Raises:
+        QueueFullError: If INGEST_QUEUE_SIZE jobs are already waiting
+    """
+    _ensure_workers()
+
+    with _jobs_lock:
+        for existing in _jobs.values():
+            # Join a job for the same file unless it is already past notifying its callers
+            if existing["file_hash"] == file_hash and existing["status"] in ("queued", "running") \
+                    and existing["version"] is None:
+                if on_complete:
+                    existing["on_complete"].append(on_complete)
+                if os.path.exists(pdf_path):
+                    os.remove(pdf_path)
+                return _public_view(existing)
+
+        job = {
+            "job_id": uuid.uuid4().hex[:12],
+            "file_name": file_name,
+            "file_hash": file_hash,
+            "pdf_path": pdf_path,
+            "status": "queued",
+            "stage": "queued",
+            "progress": 0.0,
+            "cache_hit": None,
+            "version": None,
+            "error": None,
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "on_complete": [on_complete] if on_complete else []
+        }
+
+        try:
+            _queue.put_nowait(job)
+        except queue.Full:
+            raise QueueFullError(f"Ingestion queue is full ({INGEST_QUEUE_SIZE} jobs waiting)")
+
+        _jobs[job["job_id"]] = job
+        # Bound job history: drop the oldest finished jobs
+        while len(_jobs) > INGEST_JOB_HISTORY:
+            oldest = next((jid for jid, j in _jobs.items() if j["status"] in ("done", "failed")), None)
+            if oldest is None:
+                break
+            del _jobs[oldest]
+
+    print(f"📥 Queued ingestion job {job['job_id']} for {file_name}")
+    return _public_view(job)
+
+
+def _public_view(job: dict) -> dict:
+    return {k: v for k, v in job.items() if k not in ("on_complete", "pdf_path")}
+
+
+def get_job(job_id: str) -> dict:
+    """
+    Get the status of an ingestion job.
+
+    Returns:
+        dict: Job status, stage and progress, or None if unknown
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return _public_view(job) if job else None
+
+
+def list_jobs() -> list[dict]:
+    """List known ingestion jobs, oldest first."""
+    with _jobs_lock:
+        return [_public_view(job) for job in _jobs.values()]
+
+
+def get_queue_stats() -> dict:
+    """
+    Get ingestion pool statistics.
+
+    Returns:
+        dict: Worker count, queue depth and capacity, running job count
+    """
+    with _jobs_lock:
+        running = sum(1 for j in _jobs.values() if j["status"] == "running")
+    return {
+        "workers": len(_workers),
+        "queued": _queue.qsize(),
+        "queue_capacity": INGEST_QUEUE_SIZE,
+        "running": running
+    }
@@ -0,0 +1,156 @@
+import re
+from collections import Counter
+import numpy as np
+from .config import BM25_K1, BM25_B
+
+# Keeps tool names like "c++", "c#", "node.js" and "asp.net" as single terms
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[+#]+|(?:\.[a-z0-9]+)+)?")
+
+STOP_WORDS = frozenset("""
+a an and are as at be by did do does for from has have he her his how i in is it its me my
+of on or our she that the their them they this to was were what when where which who why
+will with you your about does did can could tell
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase terms of a text, without stop words"""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def write_bm25_index(chunks: list[str], path: str, k1: float = BM25_K1, b: float = BM25_B):
+    """
+    Build a BM25 inverted index over chunks and save it as .npz.
+
+    Postings are stored term by term (CSR layout) with the full BM25 weight
+    (idf and length normalization included) precomputed, so scoring a query
+    is a gather and a bincount.
+
+    Args:
+        chunks (list[str]): Chunk texts, in index order
+        path (str): Destination file
+        k1 (float): Term frequency saturation
+        b (float): Length normalization strength
+    """
+    docs = [Counter(tokenize(c)) for c in chunks]
+    lengths = np.array([sum(d.values()) for d in docs], dtype=np.float32)
+    avg_length = float(lengths.mean()) if len(docs) and lengths.mean() > 0 else 1.0
+
+    postings = {}
+    for doc_id, counts in enumerate(docs):
+        for term, tf in counts.items():
+            postings.setdefault(term, []).append((doc_id, tf))
+
+    terms = sorted(postings)
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    doc_ids, weights = [], []
+    for i, term in enumerate(terms):
+        ids, tfs = zip(*postings[term])
+        ids = np.array(ids, dtype=np.int32)
+        tfs = np.array(tfs, dtype=np.float32)
+        df = len(ids)
+        idf = np.log(1.0 + (len(docs) - df + 0.5) / (df + 0.5))
+        norm = k1 * (1.0 - b + b * lengths[ids] / avg_length)
+        doc_ids.append(ids)
+        weights.append((idf * tfs * (k1 + 1.0) / (tfs + norm)).astype(np.float32))
+        offsets[i + 1] = offsets[i] + df
+
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            terms=np.array(terms, dtype=str),
+            offsets=offsets,
+            doc_ids=np.concatenate(doc_ids) if doc_ids else np.zeros(0, dtype=np.int32),
+            weights=np.concatenate(weights) if weights else np.zeros(0, dtype=np.float32),
+            doc_count=np.array(len(docs), dtype=np.int64)
+        )
+    print(f"Saved BM25 index ({len(terms)} terms) to {path}")
+
+
+class BM25Index:
+    """BM25 inverted index written by write_bm25_index()."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with np.load(path, allow_pickle=False) as data:
+            self.terms = data["terms"]
+            self.offsets = data["offsets"]
+            self.doc_ids = data["doc_ids"]
+            self.weights = data["weights"]
+            self.doc_count = int(data["doc_count"])
+
+    def _term_ids(self, query: str) -> np.ndarray:
+        tokens = np.unique(np.array(tokenize(query), dtype=str))
+        if not len(tokens) or not len(self.terms):
+            return np.zeros(0, dtype=np.int64)
+        positions = np.searchsorted(self.terms, tokens)
+        positions[positions >= len(self.terms)] = 0
+        return positions[self.terms[positions] == tokens]
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every chunk for a query, shape (doc_count,)"""
+        term_ids = self._term_ids(query)
+        if not len(term_ids):
+            return np.zeros(self.doc_count, dtype=np.float32)
+        postings = np.concatenate([np.arange(self.offsets[t], self.offsets[t + 1]) for t in term_ids])
+        return np.bincount(
+            self.doc_ids[postings], weights=self.weights[postings], minlength=self.doc_count
+        ).astype(np.float32)
+
+    def search(self, queries: list[str], k: int):
+        """
+        Top-k chunks per query, in the same (scores, ids) layout as a faiss search.
+        Chunks that share no term with the query are returned as id -1.
+        """
+        k = min(k, self.doc_count)
+        scores = np.vstack([self.scores(q) for q in queries]) if queries else np.zeros((0, self.doc_count))
+        if k == 0:
+            return np.zeros((len(queries), 0), dtype=np.float32), np.zeros((len(queries), 0), dtype=np.int64)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top[top_scores <= 0] = -1
+        return top_scores, top
+
+    @property
+    def nbytes(self) -> int:
+        return self.terms.nbytes + self.offsets.nbytes + self.doc_ids.nbytes + self.weights.nbytes
+
+
+def reciprocal_rank_fusion(rankings: list[np.ndarray], doc_count: int, k: int, rrf_k: int = 60):
+    """
+    Fuse several ranked id lists per query with reciprocal rank fusion.
+
+    Args:
+        rankings (list[np.ndarray]): Id matrices of shape (n_queries, depth), best first;
+                                     -1 marks an empty slot
+        doc_count (int): Number of chunks in the corpus
+        k (int): Results to keep per query
+        rrf_k (int): Rank offset; larger values flatten the contribution of top ranks
+
+    Returns:
+        tuple: (scores, ids) arrays of shape (n_queries, k), ids -1 where fewer matched
+    """
+    n_queries = rankings[0].shape[0]
+    k = min(k, doc_count)
+    # One extra column collects the -1 slots and is ignored
+    fused = np.zeros((n_queries, doc_count + 1), dtype=np.float32)
+    rows = np.arange(n_queries)[:, None]
+    for ranked in rankings:
+        depth = ranked.shape[1]
+        ids = np.where(ranked < 0, doc_count, ranked)
+        # Ids are unique within a row, so plain fancy-index accumulation is exact
+        fused[rows, ids] += 1.0 / (rrf_k + np.arange(1, depth + 1, dtype=np.float32))
+    fused = fused[:, :doc_count]
+
+    if k == 0:
+        return np.zeros((n_queries, 0), dtype=np.float32), np.zeros((n_queries, 0), dtype=np.int64)
+    top = np.argpartition(-fused, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(fused, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    top[top_scores <= 0] = -1
+    return top_scores, top
@@ -0,0 +1,396 @@
+import asyncio
+import hashlib
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from .config import (
+    GEMINI_API_KEY, MODEL, LLM_BACKEND, LLM_TIMEOUT, LLM_MAX_RETRIES, LLM_MAX_CONCURRENCY,
+    LLM_BACKOFF_BASE, LLM_BACKOFF_MAX, LLM_LOCAL_LATENCY_MS
+)
+
+# HTTP status codes worth retrying (rate limiting and transient server errors)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """Raised when an LLM call fails after all retries or misses its deadline."""
+
+
+class GeminiBackend:
+    """
+    Google Gemini through google-genai. The client is created on first use;
+    its HTTP requests time out with the gateway deadline, so an abandoned
+    attempt gives its worker slot back instead of hanging on.
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key: str = GEMINI_API_KEY, timeout: float = LLM_TIMEOUT):
+        self._api_key = api_key
+        self.timeout = timeout
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from google import genai
+                    from google.genai import types
+                    self._client = genai.Client(
+                        api_key=self._api_key,
+                        http_options=types.HttpOptions(timeout=int(self.timeout * 1000))
+                    )
+        return self._client
+
+    def generate(self, contents, model: str) -> str:
+        response = self._get_client().models.generate_content(model=model, contents=contents)
+        return response.text or ""
+
+    def generate_stream(self, contents, model: str):
+        for chunk in self._get_client().models.generate_content_stream(model=model, contents=contents):
+            if chunk.text:
+                yield chunk.text
+
+
+class LocalBackend:
+    """
+    Deterministic offline stand-in for load tests and benchmarks.
+    The same contents always produce the same text; an optional fixed
+    latency (LLM_LOCAL_LATENCY_MS) simulates the network round trip.
+    """
+
+    name = "local"
+
+    def __init__(self, latency_ms: float = LLM_LOCAL_LATENCY_MS):
+        self.latency_ms = latency_ms
+
+    def generate(self, contents, model: str) -> str:
+        text = contents if isinstance(contents, str) else "\n".join(str(c) for c in contents)
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:8]
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        last_line = lines[-1][:200] if lines else ""
+        return f"[local:{model}:{digest}] {last_line}"
+
+    def generate_stream(self, contents, model: str):
+        text = self.generate(contents, model)
+        for piece in re.findall(r"\S+\s*", text):
+            yield piece
+
+
+_backend_factories = {
+    "gemini": GeminiBackend,
+    "local": LocalBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+# One pool bounds concurrent LLM calls for sync and async callers alike
+_executor = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix="llm")
+
+# "abandoned": attempts that missed their deadline but whose worker is still running
+_stats = {
+    "calls": 0, "successes": 0, "failures": 0, "retries": 0, "timeouts": 0, "in_flight": 0,
+    "abandoned": 0, "fail_fast": 0, "streams": 0, "stream_ttft_total_ms": 0.0
+}
+_stats_lock = threading.Lock()
+
+
+def register_backend(name: str, factory):
+    """
+    Make a backend selectable through LLM_BACKEND or set_backend().
+
+    Args:
+        name (str): Backend name
+        factory (callable): Returns an object with generate(contents, model) -> str
+    """
+    _backend_factories[name] = factory
+
+
+def set_backend(backend):
+    """Replace the active backend with a backend name or instance."""
+    global _backend
+    with _backend_lock:
+        _backend = _backend_factories[backend]() if isinstance(backend, str) else backend
+    print(f"🔌 LLM backend set to '{_backend.name}'")
+
+
+def get_backend():
+    """Get the active backend, creating the configured one on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if LLM_BACKEND not in _backend_factories:
+                    raise LLMError(f"Unknown LLM backend '{LLM_BACKEND}'")
+                _backend = _backend_factories[LLM_BACKEND]()
+    return _backend
+
+
+def warm_up():
+    """Create the configured backend and its client ahead of the first request."""
+    backend = get_backend()
+    if hasattr(backend, "_get_client"):
+        backend._get_client()
+
+
+def _bump(counter: str, delta: int = 1):
+    with _stats_lock:
+        _stats[counter] += delta
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (TimeoutError, FutureTimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return code in RETRYABLE_STATUS_CODES
+
+
+def _describe(error: Exception) -> str:
+    return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
+
+def _new_attempt() -> dict:
+    return {"finished": False, "abandoned": False}
+
+
+def _end_attempt(attempt: dict):
+    """Called by the worker when an attempt returns, frees its abandoned slot if it had one"""
+    with _stats_lock:
+        _stats["in_flight"] -= 1
+        attempt["finished"] = True
+        if attempt["abandoned"]:
+            _stats["abandoned"] -= 1
+
+
+def _abandon(attempt: dict):
+    """Record that the caller gave up on an attempt whose worker is still running"""
+    with _stats_lock:
+        if not attempt["finished"] and not attempt["abandoned"]:
+            attempt["abandoned"] = True
+            _stats["abandoned"] += 1
+
+
+def _slots_exhausted() -> bool:
+    """True while timed-out attempts hold every worker slot: a new attempt could only time out too"""
+    return _stats["abandoned"] >= LLM_MAX_CONCURRENCY
+
+
+def _exhausted_error() -> LLMError:
+    _bump("fail_fast")
+    return LLMError(f"LLM backend unresponsive: all {LLM_MAX_CONCURRENCY} slots are held by timed-out calls")
+
+
+def _call_backend(contents, model: str, attempt: dict) -> str:
+    _bump("in_flight")
+    try:
+        return get_backend().generate(contents, model)
+    finally:
+        _end_attempt(attempt)
+
+
+def generate(contents, model: str = MODEL, timeout: float = LLM_TIMEOUT,
+             max_retries: int = LLM_MAX_RETRIES) -> str:
+    """
+    Generate text with deadline, retries and the shared concurrency limit.
+
+    Args:
+        contents (str or list): Prompt, or list of prompt parts
+        model (str): Model name
+        timeout (float): Deadline in seconds for each attempt, including queueing
+        max_retries (int): Retries after the first attempt for transient errors
+
+    Returns:
+        str: Generated text, stripped
+
+    Raises:
+        LLMError: If every attempt failed, or at once while timed-out calls hold every slot
+    """
+    _bump("calls")
+    last_error = None
+
+    for attempt in range(max_retries + 1):
+        if _slots_exhausted():
+            _bump("failures")
+            raise _exhausted_error()
+        state = _new_attempt()
+        future = _executor.submit(_call_backend, contents, model, state)
+        try:
+            text = future.result(timeout=timeout)
+            _bump("successes")
+            return text.strip()
+        except FutureTimeoutError as e:
+            if not future.cancel():
+                _abandon(state)
+            _bump("timeouts")
+            last_error = e
+        except Exception as e:
+            last_error = e
+            if not _is_retryable(e):
+                break
+
+        if attempt < max_retries:
+            _bump("retries")
+            delay = _backoff_delay(attempt)
+            print(f"🔁 LLM call failed ({_describe(last_error)}), retrying in {delay:.2f}s...")
+            time.sleep(delay)
+
+    _bump("failures")
+    raise LLMError(f"LLM call failed after {attempt + 1} attempt(s): {_describe(last_error)}")
+
+
+async def agenerate(contents, model: str = MODEL, timeout: float = LLM_TIMEOUT,
+                    max_retries: int = LLM_MAX_RETRIES) -> str:
+    """
+    Async version of generate(); the event loop is never blocked.
+    Same deadline, retry and concurrency semantics.
+    """
+    _bump("calls")
+    last_error = None
+
+    for attempt in range(max_retries + 1):
+        if _slots_exhausted():
+            _bump("failures")
+            raise _exhausted_error()
+        state = _new_attempt()
+        future = _executor.submit(_call_backend, contents, model, state)
+        try:
+            text = await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+            _bump("successes")
+            return text.strip()
+        except asyncio.TimeoutError as e:
+            if not future.cancel():
+                _abandon(state)
+            _bump("timeouts")
+            last_error = e
+        except Exception as e:
+            last_error = e
+            if not _is_retryable(e):
+                break
+
+        if attempt < max_retries:
+            _bump("retries")
+            delay = _backoff_delay(attempt)
+            print(f"🔁 LLM call failed ({_describe(last_error)}), retrying in {delay:.2f}s...")
+            await asyncio.sleep(delay)
+
+    _bump("failures")
+    raise LLMError(f"LLM call failed after {attempt + 1} attempt(s): {_describe(last_error)}")
+
+
+async def astream(contents, model: str = MODEL, timeout: float = LLM_TIMEOUT,
+                  max_retries: int = LLM_MAX_RETRIES):
+    """
+    Async generator yielding text pieces as soon as the backend produces them.
+
+    `timeout` bounds the wait for each piece (so also time-to-first-token).
+    Failures are retried only until the first piece has been yielded.
+    Backends without generate_stream() yield their whole answer as one piece.
+    """
+    _bump("calls")
+    loop = asyncio.get_running_loop()
+    last_error = None
+    done = object()
+
+    for attempt in range(max_retries + 1):
+        if _slots_exhausted():
+            _bump("failures")
+            raise _exhausted_error()
+        pieces = asyncio.Queue()
+        stop = threading.Event()
+        state = _new_attempt()
+
+        # Bound per attempt: a late worker of an earlier attempt must not see the next one's queue
+        def produce(pieces=pieces, stop=stop, state=state):
+            _bump("in_flight")
+            try:
+                backend = get_backend()
+                if hasattr(backend, "generate_stream"):
+                    stream = backend.generate_stream(contents, model)
+                else:
+                    stream = [backend.generate(contents, model)]
+                for piece in stream:
+                    if stop.is_set():
+                        return
+                    if piece:
+                        loop.call_soon_threadsafe(pieces.put_nowait, piece)
+                loop.call_soon_threadsafe(pieces.put_nowait, done)
+            except Exception as e:
+                loop.call_soon_threadsafe(pieces.put_nowait, e)
+            finally:
+                _end_attempt(state)
+
+        started_at = time.monotonic()
+        loop.run_in_executor(_executor, produce)
+        yielded = False
+        try:
+            while True:
+                item = await asyncio.wait_for(pieces.get(), timeout=timeout)
+                if item is done:
+                    _bump("successes")
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                if not yielded:
+                    yielded = True
+                    with _stats_lock:
+                        _stats["streams"] += 1
+                        _stats["stream_ttft_total_ms"] += (time.monotonic() - started_at) * 1000
+                yield item
+        except asyncio.TimeoutError as e:
+            _abandon(state)
+            _bump("timeouts")
+            last_error = e
+        except Exception as e:
+            last_error = e
+            if not _is_retryable(e):
+                yielded = True  # not retryable: fail now
+        finally:
+            stop.set()
+
+        if yielded or attempt >= max_retries:
+            break
+        _bump("retries")
+        delay = _backoff_delay(attempt)
+        print(f"🔁 LLM stream failed ({_describe(last_error)}), retrying in {delay:.2f}s...")
+        await asyncio.sleep(delay)
+
+    _bump("failures")
+    raise LLMError(f"LLM stream failed after {attempt + 1} attempt(s): {_describe(last_error)}")
+
+
+def is_saturated() -> bool:
+    """True while every slot of the shared concurrency limit is taken."""
+    return _stats["in_flight"] >= LLM_MAX_CONCURRENCY
+
+
+def get_llm_stats() -> dict:
+    """
+    Get gateway counters.
+
+    Returns:
+        dict: backend, concurrency limit and call/retry/timeout/failure counters
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["stream_ttft_avg_ms"] = (
+        stats.pop("stream_ttft_total_ms") / stats["streams"] if stats["streams"] else None
+    )
+    stats.update({
+        "backend": _backend.name if _backend else LLM_BACKEND,
+        "max_concurrency": LLM_MAX_CONCURRENCY,
+        "timeout": LLM_TIMEOUT,
+        "max_retries": LLM_MAX_RETRIES
+    })
+    return stats
@@ -1,16 +1,26 @@
-from fastapi import FastAPI, UploadFile, Form, File
+from fastapi import FastAPI, UploadFile, Form, File, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+import asyncio
 import shutil
 import os
 import hashlib
 import datetime
-
-from .convert import pdf_to_txt
-from .embedding import main as embed_main
-from .chat import query_portfolio, finalize_conversation, start_new_conversation
-from .retrieval import _load_resources, reset_for_new_file, reload_resources
-from .config import RESUME_PATH, INDEX_PATH
+import json
+import uuid
+import functools
+
+from .chat import aquery_portfolio, astream_query_portfolio, finalize_conversation, start_new_conversation
+from .retrieval import retrieve_many, has_corpus, get_corpus_version, get_score_type, load_corpus
+from .sessions import SessionStore, SESSION_HEADER, SESSION_COOKIE, public_view
+from . import conversation_store
+from .warmup import start_warmup, is_ready, get_warmup_status
+from .artifacts import resolve_paths, register_version_pins
+from .ingestion import submit_job, get_job, list_jobs, get_queue_stats, QueueFullError
+from . import ingest_cache
+from .config import RESUME_PATH, TOP_K, BATCH_MAX_QUERIES, BATCH_MAX_K
 
 app = FastAPI(title="AI Portfolio Assistant")
 
@@ -20,18 +30,14 @@ app.add_middleware(
     allow_origins=["http://localhost:5173"],
     allow_methods=["*"],
     allow_headers=["*"],
+    allow_credentials=True,  # the session cookie
+    expose_headers=[SESSION_HEADER],
 )
 
-# === Track current session with file hash ===
-current_session = {
-    "file_name": None,
-    "file_hash": None,
-    "upload_timestamp": None,
-    "conversation_active": False
-}
 
-# === Store finalized conversations history ===
-conversation_archive = []
+class BatchRetrieveRequest(BaseModel):
+    queries: list[str]
+    k: int = Field(default=TOP_K, gt=0, le=BATCH_MAX_K)
 
 
 def get_file_hash(file_path: str) -> str:
@@ -43,36 +49,140 @@ def get_file_hash(file_path: str) -> str:
     return hash_md5.hexdigest()
 
 
-def archive_old_conversation():
+def end_conversation(session: dict):
     """
-    Archive the current conversation before starting a new one.
-    Stores it in conversation_archive for potential future reference.
+    Finalize and archive a session's active conversation. Returns at once;
+    the AI summary is filled in by the background summary worker.
+    
+    Returns:
+        dict: Finalization summary, or None if no conversation was active
     """
-    if current_session.get("conversation_active") and current_session.get("file_name"):
-        archived_conv = {
-            "file_name": current_session["file_name"],
-            "file_hash": current_session["file_hash"],
-            "start_time": current_session["upload_timestamp"],
-            "end_time": datetime.datetime.now().isoformat(),
-            "status": "finalized"
-        }
-        conversation_archive.append(archived_conv)
-        print(f"📦 Archived conversation for: {current_session['file_name']}")
-        print(f"📚 Total archived conversations: {len(conversation_archive)}")
+    with session["lock"]:
+        if session.get("status") != "active":
+            return None
+        print(f"🔚 Finalizing conversation for: {session['file_name']}")
+        summary = finalize_conversation(session)
+        session["last_finalized"] = summary
+    print(f"✅ Conversation finalized and archived")
+    return summary
 
 
-# === On startup: load portfolio base knowledge ===
-@app.on_event("startup")
-async def startup_event():
+def _retire_session(session: dict):
+    """Called by the session store for sessions evicted as idle or over capacity."""
+    end_conversation(session)
+
+
+def _load_session(session_id: str) -> dict:
+    """Resume a session from the conversation store, e.g. after a restart."""
     try:
-        _load_resources()
-        print("✅ Portfolio base data loaded.")
+        return conversation_store.load_session(session_id)
     except Exception as e:
-        print(f"⚠️ Could not preload portfolio data: {e}")
+        print(f"⚠️  Could not load session {session_id}: {e}")
+        return None
+
+
+# === Per-client sessions (X-Session-ID header or session_id cookie) ===
+sessions = SessionStore(on_evict=_retire_session, loader=_load_session)
+# Versions bound to live sessions are kept; stored ones are rebound on resume if pruned (see chat.py)
+register_version_pins(sessions.corpus_versions)
+
+
+def _session_for(request: Request, create: bool = True) -> dict:
+    """
+    The client's session. Sending it back with the response (cookie and
+    header) is left to the session middleware.
+    """
+    session_id = request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE)
+    session = sessions.get(session_id, create=create)
+    request.state.session = session
+    return session
+
+
+@app.middleware("http")
+async def attach_session_id(request: Request, call_next):
+    """Return the session id to clients whose request used a session."""
+    response = await call_next(request)
+    session = getattr(request.state, "session", None)
+    if session is not None:
+        response.headers[SESSION_HEADER] = session["session_id"]
+        if request.cookies.get(SESSION_COOKIE) != session["session_id"]:
+            response.set_cookie(SESSION_COOKIE, session["session_id"], httponly=True, samesite="lax")
+    return response
+
+
+def switch_session_to_file(session: dict, file_name: str, file_hash: str, version: str = None):
+    """
+    Finalize the session's conversation and start a fresh one bound to a resident corpus.
+    Other sessions keep their own conversations and corpora.
+    
+    Returns:
+        dict: Finalization summary of the previous conversation, or None
+    """
+    # Under the session's lock: ingestion workers switch sessions while requests use them
+    with session["lock"]:
+        # Step 1: FINALIZE the old conversation gracefully
+        finalization_summary = end_conversation(session)
+        if finalization_summary is None:
+            print(f"ℹ️  No active conversation to finalize")
+
+        # Step 2: START NEW conversation bound to the new file's corpus
+        version = version or get_corpus_version(file_hash)
+        print(f"\n✨ Starting NEW conversation for: {file_name}")
+        session["upload_timestamp"] = datetime.datetime.now().isoformat()
+        start_new_conversation(session, file_name, file_hash, version)
+    
+    print(f"{'='*60}")
+    print(f"✅ NEW SESSION READY")
+    print(f"{'='*60}\n")
+
+    return finalization_summary
+
+
+def _restore_cached_corpus(file_hash: str) -> str:
+    """
+    Load a CV ingested before straight from the ingestion cache.
+
+    Returns:
+        str: Index version now resident under file_hash, or None on a cache miss
+    """
+    version = ingest_cache.restore(file_hash)
+    if version is not None:
+        load_corpus(file_hash, version, activate=False)
+    return version
+
+
+def _on_ingestion_complete(session_id: str, job: dict):
+    """Called from an ingestion worker once the new corpus is resident."""
+    session = sessions.get(session_id, create=False)
+    if session is None:
+        print(f"ℹ️  Session {session_id} expired before {job['file_name']} was ingested")
+        return
+    switch_session_to_file(session, job["file_name"], job["file_hash"], job["version"])
+
+
+# === On startup: load portfolio base knowledge in the background ===
+@app.on_event("startup")
+async def startup_event():
+    # The model, corpus and LLM client load in a warm-up thread so the server
+    # accepts connections (and answers /live) right away; see /ready.
+    start_warmup()
+
+
+@app.get("/live")
+async def liveness():
+    """Liveness probe: the process is up and serving HTTP."""
+    return JSONResponse({"status": "alive"})
+
+
+@app.get("/ready")
+async def readiness():
+    """Readiness probe: 200 once warm-up has finished, 503 before."""
+    return JSONResponse(get_warmup_status(), status_code=200 if is_ready() else 503)
 
 
 @app.post("/chat")
 async def chat_with_cv(
+    request: Request,
     message: str = Form(...), 
     file: UploadFile = File(None),
     format_type: str = Form("clean")  # Options: 'clean', 'html', 'structured'
@@ -81,22 +191,26 @@ async def chat_with_cv(
     Handles chat with conversation lifecycle management:
     
     When NEW file uploaded:
-    1️⃣ FINALIZE current conversation with Gemini (graceful closure)
-    2️⃣ Archive old conversation metadata
-    3️⃣ Clean up old file data (FAISS, resume text)
-    4️⃣ Process new file (convert, embed)
-    5️⃣ START NEW conversation with Gemini (fresh session)
-    6️⃣ Process first query with new context
+    1️⃣ If its corpus is already resident, or in the ingestion cache, switch to it
+       at once: finalize + archive the old conversation, start a NEW one, answer the query
+    2️⃣ Otherwise queue a background ingestion job (extract, structure, chunk,
+       embed, index) and return its job id immediately (HTTP 202).
+       Chat keeps being served from the previous corpus; the session switches
+       over when the job completes (see /jobs/{job_id})
     
     When SAME file:
     - Continue existing conversation with history
+    
+    Conversations are per client session (X-Session-ID header or session_id
+    cookie): uploads and history of one client never affect another.
     """
+    session = _session_for(request)
     try:
         file_changed = False
         finalization_message = None
         
         if file:
-            pdf_path = f"data/{file.filename}"
+            pdf_path = f"data/upload_{uuid.uuid4().hex[:8]}_{file.filename}"
             os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
 
             # Save uploaded file
@@ -106,77 +220,59 @@ async def chat_with_cv(
             # Check if this is actually a NEW file
             new_file_hash = get_file_hash(pdf_path)
             
-            if new_file_hash != current_session.get("file_hash"):
-                file_changed = True
+            if new_file_hash != session.get("file_hash"):
                 print(f"\n{'='*60}")
                 print(f"📄 NEW FILE DETECTED: {file.filename}")
                 print(f"{'='*60}")
                 
-                # Step 1: FINALIZE the old conversation gracefully
-                if current_session.get("conversation_active"):
-                    old_file = current_session.get("file_name", "previous file")
-                    print(f"🔚 Finalizing conversation for: {old_file}")
-                    
-                    finalization_summary = finalize_conversation(old_file)
-                    finalization_message = finalization_summary
-                    
-                    # Archive the old conversation
-                    archive_old_conversation()
-                    
-                    print(f"✅ Conversation finalized and archived")
+                # A CV ingested before is restored from the ingestion cache in milliseconds
+                # (off the event loop), so it is answered right away like a resident one
+                resident = has_corpus(new_file_hash)
+                cached_version = None if resident else \
+                    await run_in_threadpool(_restore_cached_corpus, new_file_hash)
+
+                if resident or cached_version is not None:
+                    # This CV's index is in memory now: switch to it
+                    print(f"♻️  Corpus for {file.filename} is {'resident' if resident else 'restored'}, switching to it")
+                    os.remove(pdf_path)
+                    file_changed = True
+                    finalization_message = switch_session_to_file(session, file.filename, new_file_hash,
+                                                                  cached_version)
                 else:
-                    print(f"ℹ️  No active conversation to finalize")
-                
-                # Step 2: RESET retrieval system (unload old index & chunks)
-                print(f"\n🔄 Resetting retrieval system...")
-                reset_for_new_file()
-                
-                # Step 3: Clean up old file data
-                if os.path.exists(INDEX_PATH):
-                    os.remove(INDEX_PATH)
-                    print("🧹 Old FAISS index deleted")
-
-                if os.path.exists(RESUME_PATH):
-                    os.remove(RESUME_PATH)
-                    print("🧹 Old resume text deleted")
-
-                # Step 4: Process NEW file
-                print(f"\n🔄 Processing new file: {file.filename}")
-                pdf_to_txt(pdf_path, RESUME_PATH)
-                embed_main()
-                print("✅ New CV converted and indexed")
-                if os.path.exists(pdf_path):
-                 os.remove(pdf_path)   
-                # Step 5: RELOAD retrieval resources with new file data
-                print(f"\n📥 Loading new file data into retrieval system...")
-                reload_resources()
-                print("✅ New retrieval data loaded")
-
-                # Step 6: START NEW conversation session
-                print(f"\n✨ Starting NEW conversation for: {file.filename}")
-                start_new_conversation(file.filename)
-                
-                # Step 7: Update session tracking
-                current_session["file_name"] = file.filename
-                current_session["file_hash"] = new_file_hash
-                current_session["upload_timestamp"] = datetime.datetime.now().isoformat()
-                current_session["conversation_active"] = True
-                
-                print(f"{'='*60}")
-                print(f"✅ NEW SESSION READY")
-                print(f"{'='*60}\n")
+                    # Ingest in the background; the current corpus keeps serving
+                    try:
+                        job = submit_job(pdf_path, file.filename, new_file_hash,
+                                         on_complete=functools.partial(_on_ingestion_complete,
+                                                                       session["session_id"]))
+                    except QueueFullError as e:
+                        os.remove(pdf_path)
+                        return JSONResponse({"error": str(e)}, status_code=503)
+
+                    return JSONResponse({
+                        "reply": f"📄 {file.filename} is being processed. "
+                                 f"Ask your question again once it is ready.",
+                        "job_id": job["job_id"],
+                        "job": job,
+                        "new_session": False,
+                        "session_id": session["session_id"],
+                        "current_file": session.get("file_name")
+                    }, status_code=202)
                 
             else:
+                os.remove(pdf_path)
                 print(f"ℹ️  Continuing conversation with: {file.filename}")
 
         # Query Gemini
-        reply = query_portfolio(message, is_new_session=file_changed)
+        metadata = {}
+        reply = await aquery_portfolio(message, session, is_new_session=file_changed, metadata=metadata)
         
         # Build response
         response_data = {
             "reply": reply,
             "new_session": file_changed,
-            "current_file": current_session.get("file_name")
+            "session_id": session["session_id"],
+            "current_file": session.get("file_name"),
+            "prompt_tokens": metadata.get("prompt_tokens")
         }
         
         # Include finalization message if there was one
@@ -193,24 +289,117 @@ async def chat_with_cv(
         return JSONResponse({"error": str(e)}, status_code=500)
 
 
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: Request, message: str = Form(...)):
+    """
+    Streaming variant of /chat: the answer is sent as Server-Sent Events.
+    
+    Events:
+    - token: {"text": ...} formatted answer text, as soon as it is generated
+    - done:  {"reply": ..., "current_file": ..., "prompt_tokens": ...} once the answer is complete
+    - error: {"error": ...} if generation failed
+    
+    Uploads go through /chat; this endpoint answers in the client's session.
+    """
+    session = _session_for(request)
+
+    async def event_stream():
+        pieces = []
+        metadata = {}
+        try:
+            async for piece in astream_query_portfolio(message, session, metadata=metadata):
+                pieces.append(piece)
+                yield _sse_event("token", {"text": piece})
+            yield _sse_event("done", {
+                "reply": "".join(pieces),
+                "session_id": session["session_id"],
+                "current_file": session.get("file_name"),
+                "prompt_tokens": metadata.get("prompt_tokens")
+            })
+        except Exception as e:
+            print(f"❌ Error streaming response: {e}")
+            yield _sse_event("error", {"error": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/jobs/{job_id}")
+async def get_ingestion_job(job_id: str):
+    """
+    Get status, current stage and progress of an ingestion job
+    """
+    job = get_job(job_id)
+    if job is None:
+        return JSONResponse({"error": f"Unknown job: {job_id}"}, status_code=404)
+    return JSONResponse(job)
+
+
+@app.get("/jobs")
+async def get_ingestion_jobs():
+    """
+    List recent ingestion jobs and queue statistics
+    """
+    return JSONResponse({
+        "jobs": list_jobs(),
+        "queue": get_queue_stats()
+    })
+
+
+@app.post("/retrieve/batch")
+async def retrieve_batch(request: BatchRetrieveRequest):
+    """
+    Retrieve the top-k chunks for many questions in one round trip.
+    Queries are encoded and searched as a single batch, in a worker thread.
+    """
+    if len(request.queries) > BATCH_MAX_QUERIES:
+        return JSONResponse(
+            {"error": f"Too many queries ({len(request.queries)}), maximum is {BATCH_MAX_QUERIES}"},
+            status_code=400
+        )
+
+    try:
+        batch_results = await asyncio.to_thread(retrieve_many, request.queries, request.k)
+        return JSONResponse({
+            "results": [
+                {
+                    "query": query,
+                    "chunks": [{"text": text, "score": score} for text, score in results]
+                }
+                for query, results in zip(request.queries, batch_results)
+            ],
+            "total_queries": len(request.queries),
+            # 'cosine' similarity, or 'rrf' (rank fusion score: ranks results, not a similarity)
+            "score_type": get_score_type()
+        })
+    except Exception as e:
+        print(f"❌ Error in batch retrieval: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
 @app.post("/finalize")
-async def finalize_current_conversation():
+async def finalize_current_conversation(request: Request):
     """
-    Manually finalize the current conversation without uploading a new file.
+    Manually finalize the client's conversation without uploading a new file.
     Useful for explicitly ending a session.
     """
     try:
-        if not current_session.get("conversation_active"):
+        session = _session_for(request, create=False)
+        if session is None or session.get("status") != "active":
             return JSONResponse({
                 "message": "No active conversation to finalize",
                 "status": "no_action"
             })
         
-        file_name = current_session.get("file_name")
-        summary = finalize_conversation(file_name)
-        archive_old_conversation()
-        
-        current_session["conversation_active"] = False
+        file_name = session.get("file_name")
+        summary = end_conversation(session)
         
         return JSONResponse({
             "message": f"Conversation finalized for: {file_name}",
@@ -223,96 +412,153 @@ async def finalize_current_conversation():
 
 
 @app.get("/session")
-async def get_session():
+async def get_session(request: Request):
     """
-    Get current session information
+    Get the client's session information
     """
+    session = _session_for(request, create=False) or {}
     return JSONResponse({
-        "current_file": current_session.get("file_name"),
-        "file_hash": current_session.get("file_hash"),
-        "upload_timestamp": current_session.get("upload_timestamp"),
-        "conversation_active": current_session.get("conversation_active", False),
-        "has_active_session": current_session.get("file_name") is not None,
-        "archived_conversations_count": len(conversation_archive)
+        "session_id": session.get("session_id"),
+        "current_file": session.get("file_name"),
+        "file_hash": session.get("file_hash"),
+        "upload_timestamp": session.get("upload_timestamp"),
+        "conversation_active": session.get("status") == "active",
+        "has_active_session": session.get("file_name") is not None,
+        "last_finalized": session.get("last_finalized"),
+        "archived_conversations_count": (
+            conversation_store.count_archived(session["session_id"]) if session else 0
+        )
     })
 
 
 @app.get("/history")
-async def get_conversation_history():
+async def get_conversation_history(request: Request, limit: int = 20, before: int = None):
     """
-    Get archive of all finalized conversations
+    Get the archive of the client's finalized conversations, newest first, one page at a time.
+    Pass `next_before` from a page as `before` to get the next one.
     """
+    session = _session_for(request, create=False)
+    if session is None:
+        return JSONResponse({"archived_conversations": [], "next_before": None, "total_count": 0})
+    try:
+        page = conversation_store.list_archive(session["session_id"], limit, before)
+    except Exception as e:
+        print(f"❌ Error reading conversation archive: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
     return JSONResponse({
-        "archived_conversations": conversation_archive,
-        "total_count": len(conversation_archive)
+        "archived_conversations": page["conversations"],
+        "next_before": page["next_before"],
+        "total_count": page["total_count"]
     })
 
 
+@app.get("/history/{conversation_id}")
+async def get_conversation_exchanges(request: Request, conversation_id: str, limit: int = 20, after: int = None):
+    """
+    Get the exchanges of one of the client's conversations, oldest first, one page at a time.
+    Pass `next_after` from a page as `after` to get the next one.
+    """
+    session = _session_for(request, create=False)
+    if session is None:
+        return JSONResponse({"error": f"Unknown conversation: {conversation_id}"}, status_code=404)
+    try:
+        owned = session["conversation_id"] == conversation_id or \
+            conversation_store.owns_conversation(session["session_id"], conversation_id)
+        # Conversations of other sessions are indistinguishable from unknown ones
+        if not owned:
+            return JSONResponse({"error": f"Unknown conversation: {conversation_id}"}, status_code=404)
+        page = conversation_store.list_exchanges(session["session_id"], conversation_id, limit, after)
+    except Exception as e:
+        print(f"❌ Error reading conversation exchanges: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+    return JSONResponse({"conversation_id": conversation_id, **page})
+
+
 @app.get("/diagnostics")
-async def get_diagnostics():
+async def get_diagnostics(request: Request):
     """
     Get comprehensive system diagnostics including retrieval stats
     """
     from .retrieval import get_retrieval_stats
-    from .chat import get_session_status
+    from .chat import get_session_status, get_answer_cache_stats, get_coalescing_stats
+    from .llm import get_llm_stats
+    from .batching import get_batcher_stats
+    from .summaries import get_summary_stats
+    from .memory import get_memory_stats
     
     retrieval_stats = get_retrieval_stats()
-    chat_status = get_session_status()
+    session = _session_for(request, create=False)
     
     return JSONResponse({
-        "session": {
-            "current_file": current_session.get("file_name"),
-            "file_hash": current_session.get("file_hash"),
-            "conversation_active": current_session.get("conversation_active"),
-            "upload_timestamp": current_session.get("upload_timestamp")
-        },
-        "chat_state": chat_status,
+        "session": public_view(session) if session else None,
+        "chat_state": get_session_status(session) if session else None,
+        "sessions": sessions.stats(),
         "retrieval_system": retrieval_stats,
-        "archives": {
-            "total_finalized_conversations": len(conversation_archive)
-        },
+        "retrieval_batching": get_batcher_stats(),
+        "conversation_store": conversation_store.get_store_stats(),
+        "summaries": get_summary_stats(),
+        "conversation_memory": get_memory_stats(),
+        "ingestion": get_queue_stats(),
+        "llm": get_llm_stats(),
+        "answer_cache": get_answer_cache_stats(),
+        "request_coalescing": get_coalescing_stats(),
+        "warmup": get_warmup_status(),
         "files": {
-            "index_exists": os.path.exists(INDEX_PATH),
+            "index_exists": os.path.exists(resolve_paths()["index"]),
+            "index_version": resolve_paths()["version"],
             "resume_exists": os.path.exists(RESUME_PATH)
         }
     })
 
 
-@app.get("/history")
-async def get_conversation_history():
+@app.get("/admin/ingest-cache")
+async def get_ingest_cache():
     """
-    Get archive of all finalized conversations
+    Inspect the content-addressed ingestion cache
     """
     return JSONResponse({
-        "archived_conversations": conversation_archive,
-        "total_count": len(conversation_archive)
+        "stats": ingest_cache.get_cache_stats(),
+        "entries": ingest_cache.list_entries()
     })
 
 
+@app.delete("/admin/ingest-cache")
+async def purge_ingest_cache(file_hash: str = None):
+    """
+    Purge one ingestion cache entry (by file_hash) or the whole cache
+    """
+    if file_hash is not None and not ingest_cache.is_valid_hash(file_hash):
+        return JSONResponse({"error": "file_hash must be a 32-character lowercase hex MD5"}, status_code=400)
+    try:
+        removed = ingest_cache.purge(file_hash)
+        return JSONResponse({
+            "message": f"Purged {removed} ingestion cache entries",
+            "removed": removed
+        })
+    except Exception as e:
+        print(f"❌ Error purging ingestion cache: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
 @app.post("/clear-all")
-async def clear_all():
+async def clear_all(request: Request):
     """
-    Clear everything including archives
+    Clear the client's session (its conversation is finalized and archived)
     """
     try:
-        if current_session.get("conversation_active"):
-            finalize_conversation(current_session.get("file_name"))
-            archive_old_conversation()
+        session = _session_for(request, create=False)
+        if session is not None:
+            end_conversation(session)
+            sessions.close(session["session_id"])
+            request.state.session = None
         
-        current_session["file_name"] = None
-        current_session["file_hash"] = None
-        current_session["upload_timestamp"] = None
-        current_session["conversation_active"] = False
+        print("🧹 Session cleared")
         
-        # Optionally clear archives
-        # conversation_archive.clear()
-        
-        print("🧹 All sessions cleared")
-        
-        return JSONResponse({
-            "message": "All sessions cleared successfully",
-            "archived_count": len(conversation_archive)
+        response = JSONResponse({
+            "message": "Session cleared successfully"
         })
+        response.delete_cookie(SESSION_COOKIE)
+        return response
     except Exception as e:
         print(f"❌ Error clearing: {e}")
         return JSONResponse({"error": str(e)}, status_code=500)
@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+from . import llm
+from . import conversation_store
+from .prompt_gen import truncate_to_tokens
+from .config import MEMORY_ENABLED, MEMORY_RAW_TURNS, MEMORY_SUMMARY_TOKENS
+
+# Conversation memory: instead of replaying the last exchanges verbatim,
+# prompts carry a rolling summary of the older ones plus the newest
+# MEMORY_RAW_TURNS exchanges. After each answer, exchanges that dropped out
+# of the raw window are folded into the summary by a background worker, so
+# the summary never costs the user a wait.
+#
+# Session fields: "memory_summary" (str or None) and "memory_covered_until"
+# (timestamp of the newest folded exchange), both persisted with the session;
+# folded exchanges are flagged with "in_summary".
+
+ANSWER_TOKENS = 150  # per folded answer in the update prompt
+SATURATED_POLL_S = 0.2
+MAX_SATURATED_WAIT_S = 30
+
+
+def prompt_history(session: dict) -> tuple:
+    """
+    What a prompt should carry of the session's conversation.
+
+    Returns:
+        tuple: (rolling summary or None, exchanges to send verbatim). The
+               verbatim ones are the newest MEMORY_RAW_TURNS plus any older
+               exchange the summary does not cover yet.
+    """
+    history = session["conversation_history"]
+    if not MEMORY_ENABLED:
+        return None, history
+    raw_start = max(0, len(history) - MEMORY_RAW_TURNS)
+    raw = [ex for i, ex in enumerate(history) if i >= raw_start or not ex.get("in_summary")]
+    return session.get("memory_summary"), raw
+
+
+def _build_update_prompt(summary: str, exchanges: list, file_name: str) -> str:
+    parts = [
+        f"You maintain a running summary of a conversation about {file_name}.",
+        f"Update the summary with the new exchanges below, in at most {MEMORY_SUMMARY_TOKENS // 2} words.",
+        "Keep every person, company, project, role, date and skill that was named, and what the user "
+        "asked about each, so that later questions saying 'he', 'it' or 'that project' can be resolved.",
+        "Reply with the updated summary only.",
+        "",
+        f"Current summary:\n{summary or '(none yet)'}",
+        "",
+        "New exchanges:"
+    ]
+    for ex in exchanges:
+        parts.append(f"User: {ex['user']}")
+        parts.append(f"Assistant: {truncate_to_tokens(ex['assistant'], ANSWER_TOKENS)}")
+    return "\n".join(parts)
+
+
+class MemoryUpdater:
+    """
+    Background worker folding older exchanges into each session's summary.
+
+    Sessions are queued after an answer; a session already waiting is not
+    queued twice, and the worker folds whatever is pending for it at that
+    point. Updates wait while the LLM is saturated by user requests and are
+    skipped (picked up after the next answer) if that lasts too long.
+    """
+
+    def __init__(self):
+        self._pending = OrderedDict()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stats = {"scheduled": 0, "updates": 0, "exchanges_folded": 0, "skipped": 0, "failed": 0}
+
+    def _ensure_worker(self):
+        if self._thread is None:
+            with self._cond:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="memory-updater", daemon=True)
+                    self._thread.start()
+
+    def schedule(self, session: dict):
+        self._ensure_worker()
+        with self._cond:
+            if session["session_id"] not in self._pending:
+                self._pending[session["session_id"]] = session
+                self._stats["scheduled"] += 1
+                self._cond.notify()
+
+    def _next(self) -> dict:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            return self._pending.popitem(last=False)[1]
+
+    def _run(self):
+        while True:
+            session = self._next()
+            try:
+                self._update(session)
+            except Exception as e:
+                print(f"⚠️  Could not update conversation memory: {e}")
+                with self._cond:
+                    self._stats["failed"] += 1
+
+    def _update(self, session: dict):
+        conversation_id = session["conversation_id"]
+        history = list(session["conversation_history"])
+        to_fold = [ex for ex in history[:max(0, len(history) - MEMORY_RAW_TURNS)] if not ex.get("in_summary")]
+        if not to_fold:
+            return
+
+        # User requests come first
+        waited = 0.0
+        while llm.is_saturated():
+            if waited >= MAX_SATURATED_WAIT_S:
+                with self._cond:
+                    self._stats["skipped"] += 1
+                return
+            time.sleep(SATURATED_POLL_S)
+            waited += SATURATED_POLL_S
+
+        prompt = _build_update_prompt(session.get("memory_summary"), to_fold, session["file_name"])
+        summary = truncate_to_tokens(llm.generate(prompt, max_retries=0), MEMORY_SUMMARY_TOKENS)
+
+        # The session may have moved on to another conversation meanwhile
+        if session["conversation_id"] != conversation_id:
+            return
+        session["memory_summary"] = summary
+        session["memory_covered_until"] = to_fold[-1]["timestamp"]
+        for ex in to_fold:
+            ex["in_summary"] = True
+        conversation_store.save_session(session)
+        with self._cond:
+            self._stats["updates"] += 1
+            self._stats["exchanges_folded"] += len(to_fold)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {**self._stats, "pending": len(self._pending), "enabled": MEMORY_ENABLED,
+                    "raw_turns": MEMORY_RAW_TURNS, "summary_tokens": MEMORY_SUMMARY_TOKENS}
+
+
+_updater = MemoryUpdater()
+
+
+def schedule_update(session: dict):
+    """Fold the session's older exchanges into its summary in the background (after each answer)."""
+    if MEMORY_ENABLED and len(session["conversation_history"]) > MEMORY_RAW_TURNS:
+        _updater.schedule(session)
+
+
+def get_memory_stats() -> dict:
+    """
+    Get conversation memory statistics.
+
+    Returns:
+        dict: scheduled/applied updates, exchanges folded, skipped and failed updates, pending sessions
+    """
+    return _updater.stats()
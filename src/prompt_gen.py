@@ -1,15 +1,57 @@
-def build_prompt(query: str, retrieved_chunks: list, cv_person_name: str = "the candidate") -> str:
+from .config import PROMPT_CHARS_PER_TOKEN
+
+# Below this many tokens of remaining budget, a chunk is dropped rather than truncated
+MIN_TRUNCATED_CHUNK_TOKENS = 32
+
+
+def estimate_tokens(text: str) -> int:
     """
-    Builds a RAG prompt for querying a person's CV with structured responses.
+    Approximate the token count of a text (about PROMPT_CHARS_PER_TOKEN characters per token).
 
     Args:
-        query (str): User's question.
-        retrieved_chunks (list[str] or list[tuple[str, float]]): Chunks retrieved from FAISS or other sources.
-        cv_person_name (str): Name of the person whose CV is queried.
+        text (str): Any prompt text.
 
     Returns:
-        str: A full LLM prompt.
+        int: Estimated number of tokens.
+    """
+    return (len(text) + PROMPT_CHARS_PER_TOKEN - 1) // PROMPT_CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
     """
+    Cut a text to about `max_tokens` tokens, on a word boundary.
+
+    Args:
+        text (str): Text to shorten.
+        max_tokens (int): Token budget for the text.
+
+    Returns:
+        str: The text itself if it fits, else its shortened head followed by "…".
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    head = text[:max(0, max_tokens - 1) * PROMPT_CHARS_PER_TOKEN]
+    cut = head.rfind(" ")
+    if cut > len(head) // 2:
+        head = head[:cut]
+    return head.rstrip() + " …"
+
+
+def select_chunks(retrieved_chunks: list, max_tokens: int = None) -> tuple[list[str], int]:
+    """
+    Rank, deduplicate and trim retrieved chunks to a token budget.
+
+    Args:
+        retrieved_chunks (list[str] or list[tuple[str, float]]): Retrieved chunks; tuples are ranked by score.
+        max_tokens (int): Token budget for all chunks, or None for no limit.
+
+    Returns:
+        tuple[list[str], int]: The kept chunk texts (best first) and how many were dropped.
+    """
+    # Rank by score when scores are available (stable, so ties keep retrieval order)
+    if retrieved_chunks and all(isinstance(c, tuple) for c in retrieved_chunks):
+        retrieved_chunks = sorted(retrieved_chunks, key=lambda c: c[1], reverse=True)
+
     # Extract text if tuples are provided
     chunk_texts = [c[0] if isinstance(c, tuple) else c for c in retrieved_chunks]
 
@@ -21,6 +63,41 @@ def build_prompt(query: str, retrieved_chunks: list, cv_person_name: str = "the
             unique_chunks.append(chunk)
             seen.add(chunk)
 
+    if max_tokens is None:
+        return unique_chunks, 0
+
+    kept = []
+    remaining = max_tokens
+    for chunk in unique_chunks:
+        cost = estimate_tokens(chunk) + 1  # +1 for the "- " bullet and newline
+        if cost <= remaining:
+            kept.append(chunk)
+            remaining -= cost
+        elif remaining >= MIN_TRUNCATED_CHUNK_TOKENS:
+            kept.append(truncate_to_tokens(chunk, remaining - 1))
+            remaining = 0
+        else:
+            break
+    return kept, len(unique_chunks) - len(kept)
+
+
+def build_prompt(query: str, retrieved_chunks: list, cv_person_name: str = "the candidate",
+                 max_context_tokens: int = None, usage: dict = None) -> str:
+    """
+    Builds a RAG prompt for querying a person's CV with structured responses.
+
+    Args:
+        query (str): User's question.
+        retrieved_chunks (list[str] or list[tuple[str, float]]): Chunks retrieved from FAISS or other sources.
+        cv_person_name (str): Name of the person whose CV is queried.
+        max_context_tokens (int): Token budget for the retrieved context, or None for no limit.
+        usage (dict): If given, filled with the estimated token spend per section.
+
+    Returns:
+        str: A full LLM prompt.
+    """
+    unique_chunks, dropped = select_chunks(retrieved_chunks, max_context_tokens)
+
     # Categorize chunks
     categories = {"Experience": [], "Projects": [], "Skills & Education": [], "Other": []}
     for chunk in unique_chunks:
@@ -78,4 +155,13 @@ A:
 
 ### FINAL ANSWER:"""
 
+    if usage is not None:
+        usage.update({
+            "instructions": estimate_tokens(system_prompt) + estimate_tokens(examples),
+            "context": estimate_tokens(context_text),
+            "query": estimate_tokens(query),
+            "chunks_used": len(unique_chunks),
+            "chunks_dropped": dropped
+        })
+
     return full_prompt
@@ -1,85 +1,403 @@
 import os
 import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer
-from .config import EMBEDDING_MODEL, INDEX_PATH, CHUNKS_PATH, TOP_K
+from .cache import LRUCache
+from .chunk_store import ChunkStore
+from .lexical import BM25Index, reciprocal_rank_fusion
+from .artifacts import resolve_paths, read_manifest, verify_version, register_version_pins, CURRENT_POINTER
+from .vector_backend import open_backend, select_backend
+from . import embedding_service
+from .config import (
+    EMBEDDING_MODEL, INDEX_ROOT, TOP_K, QUERY_CACHE_SIZE, QUERY_CACHE_TTL,
+    CORPUS_MEMORY_BUDGET_MB, CORPUS_MAX_COUNT, RETRIEVAL_MODE, HYBRID_CANDIDATES, RRF_K
+)
+
+DEFAULT_CORPUS_ID = "default"
 
 # Global resources (lazy-loaded and resetable)
 _model = None
-_index = None
-_chunks = None
-_current_file_hash = None
-_resources_loaded = False
+_model_name = None
+_model_lock = threading.Lock()
+
+# Registry of resident corpora keyed by corpus id (the CV file hash), oldest use first.
+# Writers (load, swap, evict) hold _registry_lock. _active is the snapshot
+# retrieve() uses by default; it is replaced with a single assignment, so
+# readers never need the lock to see a consistent corpus.
+_corpora = OrderedDict()
+_active = None
+_registry_lock = threading.RLock()
+
+# mtime of the published-version pointer last seen by _refresh_default_corpus()
+_pointer_mtime = None
 
+# Query embeddings keyed by (model name, normalized query); survives file resets
+_query_cache = LRUCache(max_size=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL)
+
+
+def _ensure_model(local: bool = False):
+    """
+    Load the embedding model once; it is shared by every corpus.
+    sentence_transformers (and torch) are only imported here, not at module import.
 
-def _load_resources(force_reload: bool = False):
+    When an embedding service is configured the model lives in that process
+    and is only loaded here with `local=True`, as the fallback.
+    """
+    global _model, _model_name
+
+    with _model_lock:
+        # Query cache keys carry the model name, so entries of another model are never served
+        _model_name = EMBEDDING_MODEL
+
+        if _model is None and (local or not embedding_service.is_configured()):
+            from sentence_transformers import SentenceTransformer
+
+            print(f"📦 Loading embedding model '{EMBEDDING_MODEL}'...")
+            _model = SentenceTransformer(EMBEDDING_MODEL)
+            print("✅ Model loaded.")
+
+
+def _model_ready() -> bool:
+    return _model is not None or (_model_name == EMBEDDING_MODEL and embedding_service.is_configured())
+
+
+def _read_corpus(paths: dict):
+    """
+    Open an index version's vectors, chunks and BM25 index.
+    Vectors go through the backend chosen by vector_backend.select_backend():
+    small exact builds are searched with NumPy over the memory-mapped
+    embeddings, everything else (and the legacy layout) with faiss.
+    The BM25 index is None for builds made before hybrid retrieval.
+
+    Returns:
+        tuple: (index, chunks, lexical, index_info)
+    """
+    manifest = read_manifest(paths["version"]) if paths["version"] is not None else {}
+    # A damaged build is refused rather than served
+    if paths["version"] is not None and not verify_version(paths["version"]):
+        raise RuntimeError(f"❌ Index version {paths['version']} failed checksum verification")
+    index_info = {
+        "index_type": manifest.get("index_type", "flat"),
+        "index_params": manifest.get("index_params", {}),
+        "recall": manifest.get("index_recall", 1.0),
+        "quantization": manifest.get("quantization", "none"),
+        "bytes_per_vector": manifest.get("bytes_per_vector"),
+        "recall_without_rerank": manifest.get("recall_without_rerank"),
+        "vector_count": manifest.get("chunk_count")
+    }
+    if index_info["index_type"] == "IndexFlatIP":  # builds made before index selection
+        index_info["index_type"] = "flat"
+
+    backend = select_backend(paths, index_info, index_info["vector_count"])
+    source = paths["embeddings"] if backend == "numpy" else paths["index"]
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"❌ Vector index not found at {source}")
+
+    index = open_backend(paths, index_info, backend)
+    index_info["backend"] = index.name
+    print(f"✅ {index_info['index_type']} index opened with the {index.name} backend "
+          f"({index.ntotal} vectors, params: {index_info['index_params']}).")
+
+    chunks_path = paths["chunks"]
+    if not os.path.exists(chunks_path):
+        raise FileNotFoundError(f"❌ Chunks file not found at {chunks_path}")
+
+    if chunks_path.endswith(".json"):
+        print(f"📄 Loading chunks from {chunks_path}...")
+        with open(chunks_path, 'r', encoding='utf-8') as f:
+            chunks = json.load(f)
+    else:
+        print(f"📄 Mapping chunk store {chunks_path}...")
+        chunks = ChunkStore(chunks_path)
+    print(f"✅ Loaded {len(chunks)} chunks.")
+
+    # Validate consistency
+    if index.ntotal != len(chunks):
+        print(f"⚠️  WARNING: Index has {index.ntotal} vectors but {len(chunks)} chunks loaded!")
+    else:
+        print(f"✅ Index and chunks are consistent ({index.ntotal} items)")
+
+    lexical = None
+    if paths["lexical"] and os.path.exists(paths["lexical"]):
+        lexical = BM25Index(paths["lexical"])
+        print(f"✅ BM25 index loaded ({len(lexical.terms)} terms).")
+
+    return index, chunks, lexical, index_info
+
+
+class _ReaderGate:
+    """Reader count and lifecycle flags of one snapshot"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.readers = 0
+        self.retired = False
+        self.closed = False
+
+
+@dataclass(frozen=True)
+class CorpusSnapshot:
+    """
+    Immutable view of one resident corpus version.
+
+    A search holds its snapshot from start to end (see _reading()), so a
+    concurrent swap, unload or eviction never changes the index, chunks or
+    BM25 index under it. Snapshots dropped from the registry are retired;
+    their memory-mapped files are closed once the last reader has left.
+    """
+    corpus_id: str
+    index: object
+    chunks: object
+    lexical: object = None
+    version: str = None
+    index_info: dict = field(default_factory=dict)
+    nbytes: int = 0
+    _gate: _ReaderGate = field(default_factory=_ReaderGate, repr=False, compare=False)
+
+    @property
+    def file_hash(self) -> str:
+        """Identity of the loaded index, for change detection"""
+        return f"{self.index.ntotal}_{id(self.index)}"
+
+    def acquire(self) -> bool:
+        """Register a reader; False if the snapshot is already closed"""
+        with self._gate.lock:
+            if self._gate.closed:
+                return False
+            self._gate.readers += 1
+            return True
+
+    def release(self):
+        with self._gate.lock:
+            self._gate.readers -= 1
+            close = self._gate.retired and self._gate.readers == 0 and not self._gate.closed
+            self._gate.closed = self._gate.closed or close
+        if close:
+            self._close()
+
+    def retire(self):
+        """Mark as no longer reachable from the registry; closes now if unread"""
+        with self._gate.lock:
+            self._gate.retired = True
+            close = self._gate.readers == 0 and not self._gate.closed
+            self._gate.closed = self._gate.closed or close
+        if close:
+            self._close()
+
+    def _close(self):
+        if hasattr(self.chunks, "close"):
+            self.chunks.close()
+        print(f"🧹 Released corpus '{self.corpus_id}' (version {self.version})")
+
+
+def _estimate_corpus_bytes(index, chunks, lexical=None, index_info: dict = None) -> int:
+    """Approximate size of a corpus (vector codes, chunk text, BM25 postings), mapped or resident."""
+    per_vector = (index_info or {}).get("bytes_per_vector") or index.d * 4
+    vector_bytes = index.ntotal * per_vector
+    lexical_bytes = lexical.nbytes if lexical is not None else 0
+    if hasattr(chunks, "nbytes"):
+        return vector_bytes + chunks.nbytes + lexical_bytes
+    chunk_bytes = sum(len(c.encode('utf-8')) + 49 for c in chunks)  # 49 = str object overhead
+    return vector_bytes + chunk_bytes + lexical_bytes
+
+
+def _register_corpus(corpus_id: str, index, chunks: list, version: str = None, lexical=None,
+                     index_info: dict = None, activate: bool = False):
+    """
+    Add (or replace) a corpus in the registry, then evict to stay within budget.
+    Replacing the active corpus swaps the active snapshot to the new version;
+    searches still running on the old one finish there. With `activate`, the
+    new snapshot becomes active in the same critical section.
+    """
+    global _active
+
+    snapshot = CorpusSnapshot(
+        corpus_id=corpus_id,
+        index=index,
+        chunks=chunks,
+        lexical=lexical,
+        version=version,
+        index_info=index_info or {"index_type": "flat", "index_params": {}, "recall": 1.0,
+                                  "quantization": "none"},
+        nbytes=_estimate_corpus_bytes(index, chunks, lexical, index_info)
+    )
+    with _registry_lock:
+        previous = _corpora.get(corpus_id)
+        _corpora[corpus_id] = snapshot
+        _corpora.move_to_end(corpus_id)
+        if activate or (previous is not None and _active is previous):
+            _active = snapshot
+        _evict_over_budget(keep=corpus_id)
+    if previous is not None:
+        previous.retire()
+
+
+def _evict_over_budget(keep: str = None):
+    """Evict least-recently-used corpora until the registry fits its budget."""
+    budget = CORPUS_MEMORY_BUDGET_MB * 1024 * 1024
+    with _registry_lock:
+        active_id = _active.corpus_id if _active is not None else None
+        while len(_corpora) > 1:
+            total = sum(snapshot.nbytes for snapshot in _corpora.values())
+            if total <= budget and len(_corpora) <= CORPUS_MAX_COUNT:
+                break
+            victim = next((cid for cid in _corpora if cid not in (keep, active_id)), None)
+            if victim is None:
+                break
+            _corpora.pop(victim).retire()
+            print(f"♻️  Evicted corpus '{victim}' from memory (LRU)")
+
+
+def _activate_corpus(corpus_id: str):
+    """Make a resident corpus the active snapshot."""
+    global _active
+
+    with _registry_lock:
+        _corpora.move_to_end(corpus_id)
+        _active = _corpora[corpus_id]
+
+
+def _load_resources(force_reload: bool = False, corpus_id: str = None, version: str = None):
     """
     Lazy-load the model, FAISS index, and chunks.
     
     Args:
         force_reload (bool): If True, force reload all resources even if already loaded.
                             Used when a new file is uploaded.
+        corpus_id (str): Registry key for the corpus. Defaults to the active corpus.
+        version (str): Index version to read if the corpus is not resident.
+                       Defaults to the published version.
     """
-    global _model, _index, _chunks, _resources_loaded, _current_file_hash
+    active = _active
+    corpus_id = corpus_id or (active.corpus_id if active is not None else DEFAULT_CORPUS_ID)
 
-    # If force reload, clear everything first
+    # A forced reload reads the files again; the resident copy keeps serving until the swap
     if force_reload:
         print("🔄 Force reloading resources for new file...")
-        unload_resources()
     
     # Load embedding model (only once, reused across files)
-    if _model is None:
-        print(f"📦 Loading embedding model '{EMBEDDING_MODEL}'...")
-        _model = SentenceTransformer(EMBEDDING_MODEL)
-        print("✅ Model loaded.")
-
-    # Load FAISS index (file-specific)
-    if _index is None or force_reload:
-        if not os.path.exists(INDEX_PATH):
-            raise FileNotFoundError(f"❌ FAISS index not found at {INDEX_PATH}")
-        
-        print(f"📊 Loading FAISS index from {INDEX_PATH}...")
-        _index = faiss.read_index(INDEX_PATH)
-        print(f"✅ FAISS index loaded ({_index.ntotal} vectors).")
-
-    # Load chunks (file-specific)
-    if _chunks is None or force_reload:
-        if not os.path.exists(CHUNKS_PATH):
-            raise FileNotFoundError(f"❌ Chunks file not found at {CHUNKS_PATH}")
-        
-        print(f"📄 Loading chunks from {CHUNKS_PATH}...")
-        with open(CHUNKS_PATH, 'r', encoding='utf-8') as f:
-            _chunks = json.load(f)
-        print(f"✅ Loaded {len(_chunks)} chunks.")
+    _ensure_model()
 
-    # Validate consistency
-    if _index.ntotal != len(_chunks):
-        print(f"⚠️  WARNING: Index has {_index.ntotal} vectors but {len(_chunks)} chunks loaded!")
-    else:
-        print(f"✅ Index and chunks are consistent ({_index.ntotal} items)")
+    # Load FAISS index and chunks (file-specific)
+    with _registry_lock:
+        resident = corpus_id in _corpora and not force_reload
+        if resident:
+            _activate_corpus(corpus_id)
+    if not resident:
+        paths = resolve_paths(version)
+        index, chunks, lexical, index_info = _read_corpus(paths)
+        _register_corpus(corpus_id, index, chunks, paths["version"], lexical, index_info, activate=True)
+    
+    print(f"✅ All resources loaded successfully (corpus: {corpus_id})")
 
-    # Calculate file hash for tracking
-    _current_file_hash = _calculate_index_hash()
-    _resources_loaded = True
+
+def load_corpus(corpus_id: str, version: str = None, activate: bool = True):
+    """
+    Load an index version from disk into the registry under `corpus_id`.
+    The previously active corpus keeps serving until the swap at the end.
+    
+    Args:
+        corpus_id (str): Registry key, normally the CV file hash
+        version (str): Index version to load, defaults to the published one
+        activate (bool): If True, make it the corpus used by default in retrieve()
+    """
+    _ensure_model()
+    paths = resolve_paths(version)
+    index, chunks, lexical, index_info = _read_corpus(paths)
+    _register_corpus(corpus_id, index, chunks, paths["version"], lexical, index_info, activate=activate)
+    print(f"✅ Corpus '{corpus_id}' registered ({index.ntotal} vectors)")
+
+
+def _resident_versions() -> list:
+    with _registry_lock:
+        return [snapshot.version for snapshot in _corpora.values()]
+
+
+# A resident corpus can be evicted and reloaded later, so its version stays on disk
+register_version_pins(_resident_versions)
+
+
+def has_corpus(corpus_id: str) -> bool:
+    """Check whether a corpus is resident in memory."""
+    with _registry_lock:
+        return corpus_id in _corpora
+
+
+def activate_corpus(corpus_id: str) -> bool:
+    """
+    Switch the default corpus to an already-resident one.
     
-    print(f"✅ All resources loaded successfully")
+    Returns:
+        bool: True if the corpus was resident and is now active
+    """
+    with _registry_lock:
+        if corpus_id not in _corpora:
+            return False
+        _activate_corpus(corpus_id)
+    print(f"🔀 Switched to resident corpus '{corpus_id}'")
+    return True
+
+
+def evict_corpus(corpus_id: str) -> bool:
+    """
+    Drop a corpus from memory. The active corpus is deactivated first.
+    
+    Returns:
+        bool: True if the corpus was resident
+    """
+    with _registry_lock:
+        if _active is not None and corpus_id == _active.corpus_id:
+            unload_resources()
+        snapshot = _corpora.pop(corpus_id, None)
+    if snapshot is None:
+        return False
+    snapshot.retire()
+    return True
+
+
+def list_corpora() -> list[dict]:
+    """
+    List resident corpora, most recently used last.
+    
+    Returns:
+        list[dict]: corpus_id, vector count, chunk count, lexical index flag, version,
+                    index type, quantization, estimated bytes and active flag
+    """
+    with _registry_lock:
+        active = _active
+        return [
+            {
+                "corpus_id": cid,
+                "vector_count": snapshot.index.ntotal,
+                "chunk_count": len(snapshot.chunks),
+                "lexical_index": snapshot.lexical is not None,
+                "version": snapshot.version,
+                "index_type": snapshot.index_info["index_type"],
+                "quantization": snapshot.index_info.get("quantization", "none"),
+                "estimated_bytes": snapshot.nbytes,
+                "active": snapshot is active
+            }
+            for cid, snapshot in _corpora.items()
+        ]
 
 
 def unload_resources():
     """
-    Unload all resources to free memory and prepare for new file.
-    This is called when a new file is uploaded to ensure clean state.
+    Deactivate the current corpus and prepare for a new file.
+    Resident corpora stay in the registry so switching back is a lookup;
+    they are released by LRU eviction or evict_corpus().
     """
-    global _index, _chunks, _current_file_hash, _resources_loaded
+    global _active
     
     print("🧹 Unloading current resources...")
     
-    # Keep the model (it's file-agnostic), but clear file-specific data
-    _index = None
-    _chunks = None
-    _current_file_hash = None
-    _resources_loaded = False
+    # Keep the model (it's file-agnostic), but clear file-specific data.
+    # Searches already running keep their snapshot until they finish.
+    with _registry_lock:
+        _active = None
     
     print("✅ Resources unloaded (model retained for reuse)")
 
@@ -87,10 +405,8 @@ def unload_resources():
 def reset_for_new_file():
     """
     Reset retrieval system for a new file upload.
-    Clears cached index and chunks, forces reload on next retrieval.
+    Deactivates the current corpus, forces reload on next retrieval.
     """
-    global _index, _chunks, _current_file_hash, _resources_loaded
-    
     print("\n" + "="*60)
     print("🔄 RESETTING RETRIEVAL SYSTEM FOR NEW FILE")
     print("="*60)
@@ -102,49 +418,264 @@ def reset_for_new_file():
     print("="*60 + "\n")
 
 
-def _calculate_index_hash() -> str:
-    """Calculate hash of current index for change detection"""
-    if _index is None:
+def _normalize_query(query: str) -> str:
+    """Normalize query text for cache lookups (case and whitespace insensitive)"""
+    return " ".join(query.lower().split())
+
+
+def _encode_queries(queries: list[str]) -> np.ndarray:
+    """
+    Encode queries into normalized float32 embeddings of shape (n, dim).
+    Cached queries are reused; the rest are encoded in one batched call.
+    """
+    keys = [(_model_name, _normalize_query(q)) for q in queries]
+    embeddings = [_query_cache.get(key) for key in keys]
+
+    missing = [i for i, emb in enumerate(embeddings) if emb is None]
+    if missing:
+        texts = [queries[i] for i in missing]
+        encoded = embedding_service.try_encode(texts, _model_name)
+        if encoded is None:
+            _ensure_model(local=True)
+            encoded = np.array(_model.encode(texts)).astype('float32')
+            encoded /= np.maximum(np.linalg.norm(encoded, axis=1, keepdims=True), 1e-12)  # for cosine similarity
+        for row, i in enumerate(missing):
+            embedding = encoded[row:row + 1].copy()
+            embedding.setflags(write=False)
+            _query_cache.put(keys[i], embedding)
+            embeddings[i] = embedding
+
+    return np.vstack(embeddings)
+
+
+def _encode_query(query: str) -> np.ndarray:
+    """
+    Encode a query into a normalized float32 embedding of shape (1, dim).
+    Results are cached per (embedding model, normalized query).
+    """
+    return _encode_queries([query])
+
+
+def _refresh_default_corpus():
+    """
+    Swap the default corpus to a newly published index version, if any.
+    Only a stat() of the pointer file is paid when nothing changed.
+    """
+    global _pointer_mtime
+
+    try:
+        mtime = os.stat(os.path.join(INDEX_ROOT, CURRENT_POINTER)).st_mtime_ns
+    except FileNotFoundError:
+        return
+    if mtime == _pointer_mtime:
+        return
+    _pointer_mtime = mtime
+
+    published = resolve_paths()["version"]
+    with _registry_lock:
+        snapshot = _corpora.get(DEFAULT_CORPUS_ID)
+        if snapshot is None or snapshot.version == published:
+            return
+    # Replacing the registry entry also swaps the active snapshot if it is the default corpus
+    print(f"🔁 New index version {published} published, swapping default corpus...")
+    load_corpus(DEFAULT_CORPUS_ID, published, activate=False)
+
+
+def _resolve_corpus(corpus_id: str = None) -> CorpusSnapshot:
+    """
+    Return the snapshot of a corpus, loading the active one if needed.
+    Raises KeyError if an explicit corpus_id is not resident.
+    """
+    active = _active
+    if corpus_id is None or (active is not None and corpus_id == active.corpus_id):
+        # Ensure resources are loaded
+        if active is None:
+            print("📥 Resources not loaded, loading now...")
+            _load_resources()
+        elif active.corpus_id == DEFAULT_CORPUS_ID:
+            _refresh_default_corpus()
+        active = _active
+        if active is None:
+            raise KeyError("No corpus is active")
+        return active
+
+    with _registry_lock:
+        snapshot = _corpora.get(corpus_id)
+        if snapshot is None:
+            raise KeyError(f"Corpus '{corpus_id}' is not loaded")
+        _corpora.move_to_end(corpus_id)
+        return snapshot
+
+
+@contextmanager
+def _reading(corpus_id: str = None):
+    """Hold a corpus snapshot for the duration of a search."""
+    while True:
+        snapshot = _resolve_corpus(corpus_id)
+        # Fails only if the snapshot was retired and closed after we read it; the next read sees its successor
+        if snapshot.acquire():
+            break
+    try:
+        yield snapshot
+    finally:
+        snapshot.release()
+
+
+def encode_query(query: str) -> np.ndarray:
+    """
+    Normalized embedding of a query as a 1-D vector.
+    Shares the query embedding cache with retrieve().
+    """
+    _ensure_model()
+    return _encode_query(query)[0]
+
+
+def _peek_corpus(corpus_id: str = None) -> CorpusSnapshot:
+    if corpus_id is None:
+        return _active
+    with _registry_lock:
+        return _corpora.get(corpus_id)
+
+
+def get_corpus_version(corpus_id: str = None) -> str:
+    """Index version of a resident corpus (the active one by default), or None."""
+    snapshot = _peek_corpus(corpus_id)
+    return snapshot.version if snapshot is not None else None
+
+
+def get_corpus_key(corpus_id: str = None) -> str:
+    """
+    Identify a resident corpus and its index version, for per-corpus caches.
+    
+    Args:
+        corpus_id (str): Registry key, defaults to the active corpus
+    
+    Returns:
+        str: "<corpus_id>@<version>", or None if the corpus is not resident
+    """
+    snapshot = _peek_corpus(corpus_id)
+    if snapshot is None:
         return None
-    return f"{_index.ntotal}_{id(_index)}"
+    return f"{snapshot.corpus_id}@{snapshot.version}"
+
+
+def get_active_corpus_key() -> str:
+    """Same as get_corpus_key() for the active corpus."""
+    return get_corpus_key()
+
+
+def _collect_results(chunks: list, distances: np.ndarray, indices: np.ndarray) -> list[tuple[str, float]]:
+    """Map one row of search output to (chunk_text, score) tuples; -1 marks an empty slot"""
+    results = []
+    for i, idx in enumerate(indices):
+        if idx == -1:
+            continue
+        if 0 <= idx < len(chunks):
+            results.append((chunks[idx], float(distances[i])))
+        else:
+            print(f"⚠️  Warning: Index {idx} is out of bounds (max: {len(chunks)-1})")
+    return results
+
+
+def _effective_mode(snapshot: CorpusSnapshot, mode: str) -> str:
+    """Corpora without a BM25 index are always searched dense"""
+    mode = mode or RETRIEVAL_MODE
+    return "hybrid" if mode == "hybrid" and snapshot.lexical is not None else "dense"
+
+
+def get_score_type(corpus_id: str = None, mode: str = None) -> str:
+    """
+    What the scores returned by retrieve()/retrieve_many() mean for a corpus and mode.
+
+    Returns:
+        str: 'cosine' (dense: cosine similarity, -1..1) or 'rrf' (hybrid: reciprocal
+             rank fusion score, at most 2 / (RRF_K + 1); only comparable within one query)
+    """
+    snapshot = _peek_corpus(corpus_id)
+    if snapshot is None:
+        return "rrf" if (mode or RETRIEVAL_MODE) == "hybrid" else "cosine"
+    return "rrf" if _effective_mode(snapshot, mode) == "hybrid" else "cosine"
+
+
+def _search(snapshot: CorpusSnapshot, queries: list[str], query_embeddings: np.ndarray,
+            k: int, mode: str) -> list[list[tuple[str, float]]]:
+    """
+    Search a corpus snapshot for a batch of queries.
+    'dense' ranks by cosine similarity; 'hybrid' fuses the dense and BM25 rankings
+    with reciprocal rank fusion (scores are then RRF scores, not similarities).
+    Corpora without a BM25 index are always searched dense.
+    """
+    index, chunks, lexical = snapshot.index, snapshot.chunks, snapshot.lexical
+    if _effective_mode(snapshot, mode) == "hybrid":
+        depth = max(k, HYBRID_CANDIDATES)
+        _, dense_ids = index.search(query_embeddings, depth)
+        _, lexical_ids = lexical.search(queries, depth)
+        distances, indices = reciprocal_rank_fusion([dense_ids, lexical_ids], len(chunks), k, RRF_K)
+    else:
+        distances, indices = index.search(query_embeddings, k)
+    return [_collect_results(chunks, distances[row], indices[row]) for row in range(len(queries))]
 
 
-def retrieve(query: str, k: int = TOP_K) -> list[tuple[str, float]]:
+def retrieve(query: str, k: int = TOP_K, corpus_id: str = None, mode: str = None) -> list[tuple[str, float]]:
     """
-    Retrieve the top-k most relevant chunks for a query using cosine similarity.
-    Returns a list of (chunk_text, similarity_score) tuples.
+    Retrieve the top-k most relevant chunks for a query.
+    Returns a list of (chunk_text, score) tuples, best first. In 'dense' mode the
+    score is the cosine similarity; in 'hybrid' mode (the default) it is the
+    reciprocal rank fusion score (about 0.03 at best with RRF_K=60), which ranks
+    but must not be thresholded as a similarity. See get_score_type().
     
     Automatically loads resources if not already loaded.
     
     Args:
         query (str): The search query
         k (int): Number of top results to return
+        corpus_id (str): Resident corpus to search. Defaults to the active corpus.
+        mode (str): 'hybrid' or 'dense'. Defaults to RETRIEVAL_MODE.
         
     Returns:
-        list[tuple[str, float]]: List of (chunk_text, similarity_score) tuples
+        list[tuple[str, float]]: List of (chunk_text, score) tuples
     """
-    # Ensure resources are loaded
-    if not _resources_loaded:
-        print("📥 Resources not loaded, loading now...")
-        _load_resources()
+    with _reading(corpus_id) as snapshot:
+        # Compute query embedding (served from cache for repeated questions)
+        query_embedding = _encode_query(query)
 
-    # Compute query embedding
-    query_embedding = np.array(_model.encode([query])).astype('float32')
-    faiss.normalize_L2(query_embedding)  # normalize for cosine similarity
+        # Inner product on normalized vectors = cosine similarity, optionally fused with BM25
+        mode = _effective_mode(snapshot, mode)
+        results = _search(snapshot, [query], query_embedding, k, mode)[0]
 
-    # Search in FAISS (inner product on normalized vectors = cosine similarity)
-    distances, indices = _index.search(query_embedding, k)
+    score_type = "RRF" if mode == "hybrid" else "cosine"
+    print(f"🔍 Retrieved {len(results)} chunks ({score_type} scores: {[f'{s:.3f}' for _, s in results[:3]]}...)")
+    
+    return results
 
-    results = []
-    for i, idx in enumerate(indices[0]):
-        if 0 <= idx < len(_chunks):
-            similarity_score = float(distances[0][i])
-            results.append((_chunks[idx], similarity_score))
-        else:
-            print(f"⚠️  Warning: Index {idx} is out of bounds (max: {len(_chunks)-1})")
 
-    print(f"🔍 Retrieved {len(results)} chunks (similarity scores: {[f'{s:.3f}' for _, s in results[:3]]}...)")
+def retrieve_many(queries: list[str], k: int = TOP_K, corpus_id: str = None,
+                  mode: str = None) -> list[list[tuple[str, float]]]:
+    """
+    Retrieve the top-k chunks for several queries at once.
+    All queries are encoded in one batch and searched with a single matrix search.
+    Scores mean the same as in retrieve(): cosine similarity in 'dense' mode,
+    reciprocal rank fusion score in 'hybrid' mode.
     
+    Args:
+        queries (list[str]): The search queries
+        k (int): Number of top results to return per query
+        corpus_id (str): Resident corpus to search. Defaults to the active corpus.
+        mode (str): 'hybrid' or 'dense'. Defaults to RETRIEVAL_MODE.
+        
+    Returns:
+        list[list[tuple[str, float]]]: One list of (chunk_text, score)
+                                       tuples per query, in input order
+    """
+    if not queries:
+        return []
+
+    with _reading(corpus_id) as snapshot:
+        query_embeddings = _encode_queries(queries)
+        results = _search(snapshot, queries, query_embeddings, k, mode)
+
+    print(f"🔍 Retrieved chunks for {len(queries)} queries in one batch")
+
     return results
 
 
@@ -155,15 +686,24 @@ def get_retrieval_stats() -> dict:
     Returns:
         dict: Statistics including loaded status, vector count, chunk count
     """
+    active = _active
     stats = {
-        "resources_loaded": _resources_loaded,
-        "model_loaded": _model is not None,
-        "index_loaded": _index is not None,
-        "chunks_loaded": _chunks is not None,
-        "vector_count": _index.ntotal if _index else 0,
-        "chunk_count": len(_chunks) if _chunks else 0,
-        "file_hash": _current_file_hash,
-        "consistent": (_index.ntotal == len(_chunks)) if (_index and _chunks) else None
+        "resources_loaded": active is not None,
+        "model_loaded": _model_ready(),
+        "embedding_service": embedding_service.get_client_stats(),
+        "index_loaded": active is not None,
+        "chunks_loaded": active is not None,
+        "vector_count": active.index.ntotal if active else 0,
+        "chunk_count": len(active.chunks) if active else 0,
+        "file_hash": active.file_hash if active else None,
+        "consistent": (active.index.ntotal == len(active.chunks)) if active else None,
+        "query_cache": _query_cache.stats(),
+        "retrieval_mode": RETRIEVAL_MODE if active and active.lexical is not None else "dense",
+        "active_corpus": active.corpus_id if active else None,
+        "index_version": active.version if active else None,
+        "index": active.index_info if active else None,
+        "corpora": list_corpora(),
+        "corpus_memory_budget_bytes": CORPUS_MEMORY_BUDGET_MB * 1024 * 1024
     }
     return stats
 
@@ -184,7 +724,7 @@ def is_resources_loaded() -> bool:
     Returns:
         bool: True if resources are loaded and ready
     """
-    return _resources_loaded and _model is not None and _index is not None and _chunks is not None
+    return _active is not None and _model_ready()
 
 
 # Initialization helper
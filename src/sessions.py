@@ -0,0 +1,186 @@
+import re
+import threading
+import time
+import uuid
+import datetime
+from collections import OrderedDict
+from .config import SESSION_MAX_COUNT, SESSION_IDLE_TIMEOUT
+
+# Per-client conversation sessions. A client is identified by the
+# X-Session-ID header or, failing that, the session_id cookie; each session
+# has its own history, corpus binding and lifecycle.
+SESSION_HEADER = "X-Session-ID"
+SESSION_COOKIE = "session_id"
+
+# Client-supplied ids are only accepted in this shape; anything else gets a fresh id
+_SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+def new_session(session_id: str = None) -> dict:
+    """
+    Create an empty session (no file, conversation inactive).
+
+    Returns:
+        dict: Session state
+    """
+    return {
+        "session_id": session_id or uuid.uuid4().hex,
+        # Held while the conversation or corpus binding changes (requests and ingestion workers)
+        "lock": threading.RLock(),
+        "created_at": datetime.datetime.now().isoformat(),
+        "last_seen": time.monotonic(),
+        # Corpus binding: file hash = corpus id; None answers on the default corpus
+        "file_name": None,
+        "file_hash": None,
+        "corpus_version": None,
+        "upload_timestamp": None,
+        # Conversation lifecycle
+        "conversation_id": None,
+        "conversation_history": [],
+        "start_time": None,
+        "status": "inactive",  # inactive, active, finalized
+        "memory_summary": None,  # rolling summary of older exchanges, see memory.py
+        "memory_covered_until": None  # timestamp of the newest exchange in the summary
+    }
+
+
+def public_view(session: dict) -> dict:
+    """JSON-friendly view of a session, without the message history."""
+    view = {k: v for k, v in session.items() if k not in ("conversation_history", "last_seen", "lock")}
+    view["exchanges"] = len(session["conversation_history"])
+    view["idle_seconds"] = round(time.monotonic() - session["last_seen"], 1)
+    return view
+
+
+class SessionStore:
+    """
+    Bounded in-memory session table.
+
+    Sessions idle for more than `idle_timeout` seconds are evicted, and beyond
+    `max_sessions` the least recently used one is. Evicted sessions are handed
+    to `on_evict` on a background thread (e.g. to finalize and archive their
+    conversation) so the request that triggered the sweep is not held up.
+    An id that is not in the table is looked up with `loader` (e.g. from a
+    durable store) before a new session is issued.
+    """
+
+    def __init__(self, max_sessions: int = SESSION_MAX_COUNT, idle_timeout: float = SESSION_IDLE_TIMEOUT,
+                 on_evict=None, loader=None):
+        self.max_sessions = max(1, max_sessions)
+        self.idle_timeout = idle_timeout
+        self.on_evict = on_evict
+        self.loader = loader
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"created": 0, "resumed": 0, "evicted_idle": 0, "evicted_capacity": 0, "closed": 0}
+
+    def get(self, session_id: str = None, create: bool = True) -> dict:
+        """
+        Look up a session and mark it as used.
+
+        Args:
+            session_id (str): Id sent by the client, if any
+            create (bool): Create a session when the id is unknown or invalid
+
+        Returns:
+            dict: The session, or None if it does not exist and create is False
+        """
+        if session_id and not _SESSION_ID_PATTERN.match(session_id):
+            session_id = None
+        with self._lock:
+            known = session_id in self._sessions
+        # Loaded outside the lock; the table is re-checked below
+        stored = self.loader(session_id) if session_id and not known and self.loader else None
+
+        now = time.monotonic()
+        with self._lock:
+            evicted = self._sweep(now)
+            session = self._sessions.get(session_id) if session_id else None
+            if session is None and stored is not None:
+                session = {**new_session(session_id), **stored}
+                self._sessions[session_id] = session
+                self._stats["resumed"] += 1
+                evicted += self._evict_over_capacity()
+            if session is not None:
+                session["last_seen"] = now
+                self._sessions.move_to_end(session_id)
+            elif create:
+                # Ids the server does not know are reissued rather than adopted
+                session = new_session()
+                self._sessions[session["session_id"]] = session
+                self._stats["created"] += 1
+                evicted += self._evict_over_capacity()
+        self._retire(evicted)
+        return session
+
+    def close(self, session_id: str) -> dict:
+        """
+        Remove a session from the table (without calling on_evict).
+
+        Returns:
+            dict: The removed session, or None
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._stats["closed"] += 1
+        return session
+
+    def _sweep(self, now: float) -> list:
+        # Least recently used first, so the idle ones are at the front
+        evicted = []
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session["last_seen"] <= self.idle_timeout:
+                break
+            evicted.append(self._sessions.popitem(last=False)[1])
+            self._stats["evicted_idle"] += 1
+        return evicted
+
+    def _evict_over_capacity(self) -> list:
+        evicted = []
+        while len(self._sessions) > self.max_sessions:
+            evicted.append(self._sessions.popitem(last=False)[1])
+            self._stats["evicted_capacity"] += 1
+        return evicted
+
+    def _retire(self, evicted: list):
+        if not evicted:
+            return
+        print(f"⏳ Evicting {len(evicted)} session(s)")
+        if self.on_evict is None:
+            return
+
+        def run():
+            for session in evicted:
+                try:
+                    self.on_evict(session)
+                except Exception as e:
+                    print(f"⚠️  Could not retire session {session['session_id']}: {e}")
+
+        threading.Thread(target=run, name="session-evict", daemon=True).start()
+
+    def sessions(self) -> list[dict]:
+        """Public views of all sessions, least recently used first."""
+        with self._lock:
+            self._retire(self._sweep(time.monotonic()))
+            return [public_view(s) for s in self._sessions.values()]
+
+    def corpus_versions(self) -> set:
+        """Index versions the sessions in the table are bound to."""
+        with self._lock:
+            return {s["corpus_version"] for s in self._sessions.values() if s["corpus_version"]}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> dict:
+        with self._lock:
+            active = sum(1 for s in self._sessions.values() if s["status"] == "active")
+            return {
+                "sessions": len(self._sessions),
+                "active_conversations": active,
+                "max_sessions": self.max_sessions,
+                "idle_timeout_s": self.idle_timeout,
+                **self._stats
+            }
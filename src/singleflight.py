@@ -0,0 +1,91 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class CoalescedCallCancelled(Exception):
+    """Raised to callers that joined a call whose leading request was cancelled."""
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls with the same key.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is in flight wait for its result (or exception) instead
+    of running it again. Works across threads (do) and asyncio tasks (ado).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "leaders": 0, "coalesced": 0, "in_flight": 0}
+
+    def _join(self, key) -> tuple:
+        with self._lock:
+            self._stats["calls"] += 1
+            future = self._calls.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self._stats["leaders"] += 1
+            self._stats["in_flight"] += 1
+            return future, True
+
+    def _finish(self, key, future: Future, result=None, error: BaseException = None):
+        with self._lock:
+            del self._calls[key]
+            self._stats["in_flight"] -= 1
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn, *args) -> tuple:
+        """
+        Run fn(*args) once for all concurrent callers with the same key.
+
+        Returns:
+            tuple: (result, shared) where shared is True if another caller ran it
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result, False
+
+    async def ado(self, key, coro_fn, *args) -> tuple:
+        """Async version of do(); coro_fn(*args) is awaited by the leader only."""
+        future, leader = self._join(key)
+        if not leader:
+            # Shielded: a waiter whose client goes away must not cancel the shared future
+            return await asyncio.shield(asyncio.wrap_future(future)), True
+        result, error = None, None
+        try:
+            result = await coro_fn(*args)
+        except Exception as e:
+            error = e
+            raise
+        except BaseException:
+            # Cancelled (the leader's client went away) or interrupted: the waiters
+            # get an error rather than the leader's cancellation or interrupt
+            error = CoalescedCallCancelled("coalesced request was cancelled")
+            raise
+        finally:
+            # Always runs, so no key is left behind with waiters blocked on it
+            self._finish(key, future, result, error)
+        return result, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["coalesced_rate"] = stats["coalesced"] / stats["calls"] if stats["calls"] else 0.0
+        return stats
@@ -0,0 +1,195 @@
+import queue
+import re
+import threading
+import time
+from . import llm
+from . import conversation_store
+from .prompt_gen import truncate_to_tokens
+from .config import SUMMARY_QUEUE_SIZE, SUMMARY_BATCH_MAX, SUMMARY_BATCH_WAIT_MS, SUMMARY_MAX_AGE_S
+
+# Background summaries of finalized conversations. Finalization only queues
+# the conversation; a worker summarizes queued conversations several at a
+# time in one LLM call and writes the result to the archive. Summaries are
+# best-effort: they yield to user traffic and are dropped under load.
+
+SKIPPED_SUMMARY = "Summary skipped (service busy)"
+FAILED_SUMMARY = "Summary generation failed"
+QUESTION_TOKENS = 60
+SATURATED_POLL_S = 0.2
+
+_LINE_PATTERN = re.compile(r"^\s*(\d+)[.):]\s*(.+?)\s*$")
+
+
+def _build_prompt(jobs: list) -> str:
+    parts = [
+        f"Below are {len(jobs)} finished conversations between users and a portfolio assistant.",
+        "Summarize what was discussed in each one in a single sentence.",
+        f"Reply with exactly {len(jobs)} lines, formatted as '<number>. <summary>', and nothing else.",
+        ""
+    ]
+    for number, job in enumerate(jobs, 1):
+        parts.append(f"Conversation {number} (about {job['file_name']}, "
+                     f"{job['summary']['total_exchanges']} exchanges over {job['summary']['duration']}):")
+        parts.extend(f"- {truncate_to_tokens(q, QUESTION_TOKENS)}" for q in job["questions"])
+        parts.append("")
+    return "\n".join(parts)
+
+
+def _parse_summaries(text: str, count: int) -> list:
+    found = {}
+    for line in text.splitlines():
+        match = _LINE_PATTERN.match(line)
+        if match and 1 <= int(match.group(1)) <= count:
+            found.setdefault(int(match.group(1)), match.group(2))
+    return [found.get(number) for number in range(1, count + 1)]
+
+
+class SummaryQueue:
+    """
+    Bounded queue of conversations waiting for an AI summary.
+
+    The worker waits up to `batch_wait_ms` after the first conversation to
+    gather up to `max_batch`, then summarizes them in one LLM call. Work is
+    shed when the queue is full, and conversations that waited longer than
+    `max_age_s` (e.g. while the LLM was saturated by user requests) are
+    dropped instead of summarized.
+    """
+
+    def __init__(self, max_batch: int = SUMMARY_BATCH_MAX, batch_wait_ms: float = SUMMARY_BATCH_WAIT_MS,
+                 queue_size: int = SUMMARY_QUEUE_SIZE, max_age_s: float = SUMMARY_MAX_AGE_S):
+        self.max_batch = max(1, max_batch)
+        self.batch_wait = max(0.0, batch_wait_ms) / 1000
+        self.max_age = max_age_s
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {"queued": 0, "summarized": 0, "llm_calls": 0, "shed_full": 0, "shed_stale": 0, "failed": 0}
+
+    def _ensure_worker(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="summary-worker", daemon=True)
+                    self._thread.start()
+
+    def _bump(self, counter: str, delta: int = 1):
+        with self._lock:
+            self._stats[counter] += delta
+
+    def submit(self, summary: dict, file_name: str, questions: list) -> bool:
+        """
+        Queue a finalized conversation. `summary` (the finalization summary)
+        gets its "ai_summary" and "summary_status" filled in when done.
+
+        Returns:
+            bool: False if the conversation was shed because the queue is full
+        """
+        self._ensure_worker()
+        job = {"summary": summary, "file_name": file_name, "questions": questions,
+               "enqueued_at": time.monotonic()}
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self._bump("shed_full")
+            self._finish(job, SKIPPED_SUMMARY, "skipped")
+            return False
+        self._bump("queued")
+        return True
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _drop_stale(self, batch: list) -> list:
+        now = time.monotonic()
+        fresh = []
+        for job in batch:
+            if now - job["enqueued_at"] > self.max_age:
+                self._bump("shed_stale")
+                self._finish(job, SKIPPED_SUMMARY, "skipped")
+            else:
+                fresh.append(job)
+        return fresh
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # User requests come first: wait for a free LLM slot, dropping what gets too old meanwhile
+            while batch and llm.is_saturated():
+                time.sleep(SATURATED_POLL_S)
+                batch = self._drop_stale(batch)
+            batch = self._drop_stale(batch)
+            if not batch:
+                continue
+
+            self._bump("llm_calls")
+            try:
+                results = _parse_summaries(llm.generate(_build_prompt(batch), max_retries=0), len(batch))
+            except Exception as e:
+                print(f"⚠️  Could not generate conversation summaries: {e}")
+                results = [None] * len(batch)
+
+            for job, text in zip(batch, results):
+                if text:
+                    self._bump("summarized")
+                    self._finish(job, text, "ready")
+                else:
+                    self._bump("failed")
+                    self._finish(job, FAILED_SUMMARY, "failed")
+
+    def _finish(self, job: dict, text: str, status: str):
+        summary = job["summary"]
+        summary["ai_summary"] = text
+        summary["summary_status"] = status
+        try:
+            conversation_store.set_summary(summary["conversation_id"], text)
+        except Exception as e:
+            print(f"⚠️  Could not store summary of {summary['conversation_id']}: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        answered = stats["summarized"] + stats["failed"]
+        stats.update({
+            "pending": self._queue.qsize(),
+            "max_batch": self.max_batch,
+            "batch_wait_ms": self.batch_wait * 1000,
+            "max_age_s": self.max_age,
+            "avg_batch": answered / stats["llm_calls"] if stats["llm_calls"] else 0.0
+        })
+        return stats
+
+
+_summaries = SummaryQueue()
+
+
+def submit_summary(summary: dict, file_name: str, questions: list) -> bool:
+    """
+    Queue a finalized conversation for a background AI summary.
+
+    Args:
+        summary (dict): Finalization summary; "ai_summary" and "summary_status" are filled in later
+        file_name (str): File the conversation was about
+        questions (list): The user's questions, oldest first
+
+    Returns:
+        bool: False if it was shed because the queue is full
+    """
+    return _summaries.submit(summary, file_name, questions)
+
+
+def get_summary_stats() -> dict:
+    """
+    Get background summary statistics.
+
+    Returns:
+        dict: pending count, LLM calls, summaries per call and shed/failed counters
+    """
+    return _summaries.stats()
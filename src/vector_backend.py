@@ -0,0 +1,211 @@
+import os
+import time
+import numpy as np
+from .config import NUMPY_BACKEND_MAX_VECTORS, RERANK_FACTOR
+
+# Vector search backends. Every backend exposes the small surface retrieval
+# needs from a faiss index: ntotal, d and search(queries, k) -> (scores, ids),
+# with ids -1 for empty slots. faiss itself is only imported when a corpus
+# actually needs one of its indexes.
+
+
+class VectorBackend:
+    """Interface of a vector search backend over normalized float32 vectors."""
+
+    name = "base"
+    ntotal = 0
+    d = 0
+
+    def search(self, queries: np.ndarray, k: int):
+        """
+        Top-k inner-product search.
+
+        Args:
+            queries (np.ndarray): Normalized float32 queries, shape (n, d)
+            k (int): Results per query
+
+        Returns:
+            tuple: (scores, ids) arrays of shape (n, <=k), best first
+        """
+        raise NotImplementedError
+
+
+def _top_k(scores: np.ndarray, k: int):
+    """Sorted top-k of each row with argpartition (O(N) per row instead of a full sort)"""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.zeros((len(scores), 0), dtype=np.float32), np.zeros((len(scores), 0), dtype=np.int64)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(top_scores, order, axis=1), np.take_along_axis(top, order, axis=1)
+
+
+class NumpyBackend(VectorBackend):
+    """
+    Exact search as one matrix product over a (usually memory-mapped) matrix.
+    For the small corpora this project mostly serves, this beats a round
+    trip through faiss and does not need faiss installed at all.
+    """
+
+    name = "numpy"
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+        self.ntotal, self.d = vectors.shape
+
+    @classmethod
+    def from_file(cls, embeddings_path: str):
+        return cls(np.load(embeddings_path, mmap_mode='r'))
+
+    def search(self, queries: np.ndarray, k: int):
+        return _top_k(queries @ self.vectors.T, k)
+
+
+class FaissBackend(VectorBackend):
+    """A faiss index (flat, HNSW or IVF; float or quantized codes)."""
+
+    name = "faiss"
+
+    def __init__(self, index):
+        self.index = index
+        self.ntotal = index.ntotal
+        self.d = index.d
+
+    @classmethod
+    def from_file(cls, index_path: str, params: dict = None):
+        import faiss
+        from .index_factory import apply_search_params
+
+        index = faiss.read_index(index_path)
+        apply_search_params(index, params or {})
+        return cls(index)
+
+    def search(self, queries: np.ndarray, k: int):
+        return self.index.search(queries, k)
+
+
+class RerankBackend(VectorBackend):
+    """
+    Quantized backend whose candidates are re-scored with the exact float vectors.
+
+    The quantized codes stay resident; the float vectors are typically a
+    memory-mapped .npy, so only the rows of the candidates are paged in.
+    """
+
+    name = "rerank"
+
+    def __init__(self, backend, vectors: np.ndarray, rerank_factor: int = RERANK_FACTOR):
+        self.backend = backend
+        self.vectors = vectors
+        self.rerank_factor = max(1, rerank_factor)
+        self.ntotal = backend.ntotal
+        self.d = backend.d
+
+    def search(self, queries: np.ndarray, k: int):
+        k = min(k, self.ntotal)
+        if k == 0:
+            return np.zeros((len(queries), 0), dtype=np.float32), np.zeros((len(queries), 0), dtype=np.int64)
+        _, candidates = self.backend.search(queries, k * self.rerank_factor)
+        valid = candidates >= 0
+        rows = self.vectors[np.where(valid, candidates, 0)]  # (n, candidates, d)
+        scores = np.einsum('ncd,nd->nc', rows, queries)
+        scores[~valid] = -np.inf
+
+        order = np.argsort(-scores, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, order, axis=1)
+        top = np.take_along_axis(candidates, order, axis=1)
+        top[~np.isfinite(top_scores)] = -1
+        return top_scores, top
+
+
+_backend_factories = {}
+
+
+def register_vector_backend(name: str, factory):
+    """
+    Make a backend selectable by open_backend().
+
+    Args:
+        name (str): Backend name
+        factory (callable): factory(paths, index_info) -> VectorBackend
+    """
+    _backend_factories[name] = factory
+
+
+def _open_numpy(paths: dict, index_info: dict) -> VectorBackend:
+    return NumpyBackend.from_file(paths["embeddings"])
+
+
+def _open_faiss(paths: dict, index_info: dict) -> VectorBackend:
+    backend = FaissBackend.from_file(paths["index"], index_info.get("index_params"))
+    if index_info.get("quantization", "none") != "none":
+        return RerankBackend(backend, np.load(paths["embeddings"], mmap_mode='r'))
+    return backend
+
+
+register_vector_backend("numpy", _open_numpy)
+register_vector_backend("faiss", _open_faiss)
+
+
+def select_backend(paths: dict, index_info: dict, vector_count: int = None) -> str:
+    """
+    NumPy for exact, unquantized builds up to NUMPY_BACKEND_MAX_VECTORS whose
+    embeddings file exists; faiss otherwise.
+    """
+    if (index_info.get("index_type", "flat") != "flat"
+            or index_info.get("quantization", "none") != "none"
+            or paths["version"] is None
+            or not os.path.exists(paths["embeddings"])):
+        return "faiss"
+    if vector_count is None:
+        vector_count = np.load(paths["embeddings"], mmap_mode='r').shape[0]
+    return "numpy" if vector_count <= NUMPY_BACKEND_MAX_VECTORS else "faiss"
+
+
+def open_backend(paths: dict, index_info: dict, name: str = None) -> VectorBackend:
+    """
+    Open the vectors of an index version with the given or selected backend.
+
+    Args:
+        paths (dict): Output of artifacts.resolve_paths()
+        index_info (dict): index_type, index_params and quantization of the build
+        name (str): Backend name; chosen by select_backend() if None
+    """
+    name = name or select_backend(paths, index_info, index_info.get("vector_count"))
+    return _backend_factories[name](paths, index_info)
+
+
+def benchmark(sizes=(50, 1000, 20000), dimension: int = 384, k: int = 10,
+              queries: int = 200) -> list[dict]:
+    """
+    Micro-benchmark single-query search latency of the NumPy and faiss flat backends.
+
+    Returns:
+        list[dict]: One row per corpus size with mean microseconds per query per backend
+    """
+    import faiss
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for size in sizes:
+        vectors = rng.standard_normal((size, dimension)).astype('float32')
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        probe = vectors[rng.integers(0, size, queries)]
+
+        index = faiss.IndexFlatIP(dimension)
+        index.add(vectors)
+        row = {"vectors": size}
+        for backend in (NumpyBackend(vectors), FaissBackend(index)):
+            started = time.perf_counter()
+            for q in probe:
+                backend.search(q[None, :], k)
+            row[f"{backend.name}_us"] = round((time.perf_counter() - started) / queries * 1e6, 1)
+        rows.append(row)
+    return rows
+
+
+if __name__ == "__main__":
+    for row in benchmark():
+        print(f"{row['vectors']:>7} vectors: numpy {row['numpy_us']:>9.1f} µs/query, "
+              f"faiss {row['faiss_us']:>9.1f} µs/query")
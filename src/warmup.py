@@ -0,0 +1,85 @@
+import threading
+import time
+import datetime
+from . import llm
+from .retrieval import _load_resources
+
+# Background warm-up run at startup. The process is "live" as soon as it
+# serves HTTP; it is "ready" once the warm-up has finished, so a load
+# balancer can hold traffic back while the model and corpus load.
+_state = {
+    "status": "pending",  # pending -> warming -> ready
+    "started_at": None,
+    "finished_at": None,
+    "steps": {}
+}
+_lock = threading.Lock()
+_thread = None
+
+
+def _warm_llm():
+    llm.warm_up()
+
+
+def _warm_retrieval():
+    _load_resources()
+
+
+# Name -> callable, run in order. A failing step is recorded, not fatal:
+# e.g. a fresh deployment has no corpus yet but can still take uploads.
+WARMUP_STEPS = [
+    ("retrieval", _warm_retrieval),
+    ("llm", _warm_llm),
+]
+
+
+def _run():
+    for name, step in WARMUP_STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+            result = {"ok": True}
+        except Exception as e:
+            print(f"⚠️ Warm-up step '{name}' failed: {e}")
+            result = {"ok": False, "error": str(e)}
+        result["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        with _lock:
+            _state["steps"][name] = result
+
+    with _lock:
+        _state["status"] = "ready"
+        _state["finished_at"] = datetime.datetime.now().isoformat()
+    print("✅ Warm-up complete, service is ready.")
+
+
+def start_warmup() -> bool:
+    """
+    Start the warm-up thread (once).
+
+    Returns:
+        bool: True if this call started it
+    """
+    global _thread
+    with _lock:
+        if _thread is not None:
+            return False
+        _state["status"] = "warming"
+        _state["started_at"] = datetime.datetime.now().isoformat()
+        _thread = threading.Thread(target=_run, name="warmup", daemon=True)
+        _thread.start()
+    return True
+
+
+def is_ready() -> bool:
+    return _state["status"] == "ready"
+
+
+def get_warmup_status() -> dict:
+    """
+    Get warm-up progress.
+
+    Returns:
+        dict: status, start/finish timestamps and per-step result and duration
+    """
+    with _lock:
+        return {**_state, "steps": {name: dict(r) for name, r in _state["steps"].items()}}
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from src.formatter import StreamingFormatter, create_professional_summary
+
+SAMPLES = [
+    "",
+    "   ",
+    "Hello",
+    "Skills:",
+    "**Skills:**\n* Python\n* SQL",
+    "* Skills:\n* Python, FastAPI and Docker\n*",
+    "John has five years of experience.\nHe worked at Acme.\n\nEducation:\nMSc Computer Science",
+    "  * leading bullet with several words\n\n\n\nSummary:\n\n",
+    "Experience:\n• Built a retrieval service serving 2k requests/s\n•\n",
+    "text line one two three four\ncontinues here\n*\n* \n",
+    "Short line\n**bold** words in a longer sentence\n***\n*** odd stars ***",
+    "Projects:\r\n* Portfolio assistant:\r\n  two short words\r\n",
+    "a b c:\nd e f g:\n* x y:\n* x y z w:",
+]
+
+ALPHABET = ["*", "**", "•", " ", "  ", "\n", "\n\n", "\r\n", ":", "\t", "Skills:", "word", "a", "b c d e", "-"]
+
+
+def _stream(text: str, rng: random.Random) -> str:
+    formatter = StreamingFormatter()
+    output = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 6)
+        output.append(formatter.feed(text[position:position + size]))
+        position += size
+    output.append(formatter.finish())
+    return "".join(output)
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_matches_batch_formatter(text):
+    rng = random.Random(0)
+    expected = create_professional_summary(text)
+    for _ in range(20):
+        assert _stream(text, rng) == expected
+
+
+def test_matches_batch_formatter_on_random_input():
+    rng = random.Random(1234)
+    for _ in range(3000):
+        text = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 30)))
+        assert _stream(text, rng) == create_professional_summary(text), repr(text)
+
+
+def test_emits_long_lines_before_they_end():
+    formatter = StreamingFormatter()
+    assert formatter.feed("* Built a retrieval service") == "• Built a retrieval service"
+    assert formatter.feed(" in Python") == " in Python"
+    assert formatter.feed("\nSkills:") == ""
+    assert formatter.finish() == "\n\nSkills:"